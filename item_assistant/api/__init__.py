@@ -1,9 +1,9 @@
 """API module initialization"""
 
-from .auth import AuthManager, get_auth_manager, verify_auth
-from .server import app, start_server
+from .auth import AuthManager, get_auth_manager, verify_auth, verify_websocket
+from .server import app, start_server, start_server_async
 
 __all__ = [
-    'AuthManager', 'get_auth_manager', 'verify_auth',
-    'app', 'start_server',
+    'AuthManager', 'get_auth_manager', 'verify_auth', 'verify_websocket',
+    'app', 'start_server', 'start_server_async',
 ]
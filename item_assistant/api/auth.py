@@ -3,7 +3,7 @@ Authentication middleware
 Token-based authentication for API endpoints.
 """
 
-from fastapi import Header, HTTPException, status
+from fastapi import Header, HTTPException, WebSocket, status
 from typing import Optional
 
 from item_assistant.config import get_config
@@ -82,6 +82,33 @@ async def verify_auth(authorization: Optional[str] = Header(None)):
     return True
 
 
+async def verify_websocket(websocket: WebSocket) -> bool:
+    """
+    Check a WebSocket handshake's token before accepting it
+    
+    Browsers can't set headers on a WebSocket, so the token may also be
+    given as a ?token= query parameter.
+    
+    Args:
+        websocket: Connection that has not been accepted yet
+    
+    Returns:
+        True if authorized; otherwise the connection is closed with 1008
+    """
+    auth_manager = get_auth_manager()
+    authorization = websocket.headers.get("authorization")
+    token = websocket.query_params.get("token")
+    if token and not authorization:
+        authorization = f"Bearer {token}"
+    
+    if not auth_manager.verify_token(authorization):
+        logger.warning(f"Unauthorized WebSocket connection attempt")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return False
+    
+    return True
+
+
 # Global auth manager instance
 _auth_manager_instance = None
 
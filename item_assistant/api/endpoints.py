@@ -3,15 +3,22 @@ API Endpoints
 HTTP and WebSocket endpoints for remote control.
 """
 
-from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
+import asyncio
 import json
+import uuid
 from datetime import datetime
 
-from item_assistant.api.auth import verify_auth
-from item_assistant.logging import get_log_manager
+from item_assistant.api.auth import verify_auth, verify_websocket
+from item_assistant.config import get_config
+from item_assistant.logging import get_log_manager, get_metrics, get_tracer
+from item_assistant.core.conversation_memory import get_conversation_memory
 from item_assistant.core.orchestrator import get_orchestrator
+from item_assistant.core.status_collector import get_status_collector
+from item_assistant.ui.state import get_ui_state_manager
 
 logger = get_log_manager().get_logger()
 log_manager = get_log_manager()
@@ -25,6 +32,7 @@ class CommandRequest(BaseModel):
     command: str
     source: str = "api"
     language: Optional[str] = None
+    session_id: Optional[str] = None  # Reuse across requests for follow-up questions
 
 
 class CommandResponse(BaseModel):
@@ -34,11 +42,31 @@ class CommandResponse(BaseModel):
     timestamp: str
 
 
+class BatchCommandRequest(BaseModel):
+    commands: List[str]
+    source: str = "api"
+    sequential: bool = False
+    stop_on_error: bool = False
+
+
+class BatchCommandResponse(BaseModel):
+    success: bool
+    message: str
+    steps: List[dict]
+    elapsed_ms: float
+    timestamp: str
+
+
 class StatusResponse(BaseModel):
     status: str
     uptime: float
     voice_enabled: bool
     llm_available: dict
+    queue: dict = {}
+    last_command: Optional[dict] = None
+    audio: dict = {}
+    models: dict = {}
+    collected_at: Optional[float] = None
     timestamp: str
 
 
@@ -60,7 +88,10 @@ async def execute_command(request: CommandRequest):
     
     # Get orchestrator and execute
     orchestrator = get_orchestrator()
-    result = await orchestrator.process_command(request.command, source=request.source)
+    # Clients only share a conversation if they send the same session_id
+    session_id = f"api:{request.session_id}" if request.session_id else None
+    result = await orchestrator.process_command(request.command, source=request.source,
+                                                session_id=session_id)
     
     return CommandResponse(
         success=result.get("success", False),
@@ -70,21 +101,121 @@ async def execute_command(request: CommandRequest):
     )
 
 
-@router.get("/api/status", response_model=StatusResponse, dependencies=[Depends(verify_auth)])
-async def get_status():
-    """Get system status"""
+@router.post("/api/commands/batch", response_model=BatchCommandResponse, dependencies=[Depends(verify_auth)])
+async def execute_batch(request: BatchCommandRequest):
+    """
+    Execute several commands in one round-trip
+    
+    Compound commands ("open chrome, search X, then mute") are split into
+    steps; independent steps run concurrently.
+    
+    Args:
+        request: Batch command request
+    
+    Returns:
+        Per-step results
+    """
+    logger.info(f"API batch received: {len(request.commands)} commands")
+    
     orchestrator = get_orchestrator()
-    status_data = orchestrator.get_status()
+    result = await orchestrator.process_batch(
+        request.commands,
+        source=request.source,
+        sequential=request.sequential,
+        stop_on_error=request.stop_on_error
+    )
+    
+    return BatchCommandResponse(
+        success=result.get("success", False),
+        message=result.get("message", ""),
+        steps=result.get("steps", []),
+        elapsed_ms=result.get("elapsed_ms", 0.0),
+        timestamp=datetime.now().isoformat()
+    )
+
+
+@router.get("/api/status", response_model=StatusResponse, dependencies=[Depends(verify_auth)])
+async def get_status(request: Request, response: Response):
+    """
+    Get system status
+    
+    Served from the status collector's snapshot, so polling never waits on
+    providers. Supports If-None-Match: an unchanged snapshot returns 304.
+    """
+    status_data, etag = get_status_collector().get_snapshot()
     
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag and etag in (tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return StatusResponse(
         status="online",
         uptime=status_data.get("uptime", 0),
         voice_enabled=status_data.get("voice_enabled", False),
         llm_available=status_data.get("llm_available", {}),
+        queue=status_data.get("queue", {}),
+        last_command=status_data.get("last_command"),
+        audio=status_data.get("audio", {}),
+        models=status_data.get("models", {}),
+        collected_at=status_data.get("collected_at"),
         timestamp=datetime.now().isoformat()
     )
 
 
+@router.get("/metrics", dependencies=[Depends(verify_auth)])
+async def get_metrics_text():
+    """Pipeline stage, command and LLM metrics in the Prometheus text format"""
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/api/traces/recent", dependencies=[Depends(verify_auth)])
+async def get_recent_traces(limit: int = 20):
+    """
+    Get recently finished command traces
+    
+    Args:
+        limit: Maximum number of traces (newest first)
+    
+    Returns:
+        Traces with per-stage spans and timings
+    """
+    return {"traces": get_tracer().recent(limit)}
+
+
+@router.get("/api/events", dependencies=[Depends(verify_auth)])
+async def stream_events(request: Request):
+    """
+    Server-Sent Events feed of assistant state changes and action results
+    
+    The first event is the current state. A comment line is sent when idle
+    so proxies keep the connection open.
+    """
+    config = get_config()
+    queue_size = config.get("api.events.queue_size", 100)
+    heartbeat = config.get("api.events.heartbeat_seconds", 15)
+    state_manager = get_ui_state_manager()
+    subscription = state_manager.subscribe(maxsize=queue_size)
+    
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=heartbeat)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            state_manager.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/api/logs", dependencies=[Depends(verify_auth)])
 async def get_logs(lines: int = 100):
     """
@@ -116,44 +247,140 @@ async def trigger_wol():
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for real-time bidirectional communication
+    
+    Clients send {"command", "source", "request_id"} messages and may have
+    several commands in flight at once. Every event sent back carries the
+    request_id it belongs to: "accepted", "intent", "action_started",
+    "chunk" (partial LLM output), "error", and finally "response". Send
+    {"type": "cancel", "request_id"} to abort a command.
+    
+    Each connection is its own conversation for follow-up questions.
+    
+    Authenticates with the same token as the HTTP API, as an
+    Authorization header or a ?token= query parameter.
     """
+    if not await verify_websocket(websocket):
+        return
     await websocket.accept()
     logger.info("WebSocket connection established")
     
+    config = get_config()
+    max_in_flight = config.get("api.websocket.max_in_flight", 8)
+    orchestrator = get_orchestrator()
+    session_id = f"ws:{uuid.uuid4().hex[:12]}"
+    
+    # All sends go through one queue so events from concurrent commands
+    # never interleave mid-frame
+    outbox: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    in_flight: Dict[str, asyncio.Task] = {}
+    
+    def send(event: str, request_id: Optional[str], **payload):
+        message = {"type": event, "request_id": request_id, **payload,
+                   "timestamp": datetime.now().isoformat()}
+        loop.call_soon_threadsafe(outbox.put_nowait, message)
+    
+    async def sender():
+        while True:
+            await websocket.send_json(await outbox.get())
+    
+    async def run_command(request_id: str, command: str, source: str):
+        try:
+            result = await orchestrator.process_command(
+                command,
+                source=source,
+                on_event=lambda event, payload: send(event, request_id, **payload),
+                session_id=session_id
+            )
+            send("response", request_id,
+                 success=result.get("success", False),
+                 message=result.get("message", ""),
+                 result=result.get("data"))
+        except asyncio.CancelledError:
+            send("cancelled", request_id)
+            raise
+        except Exception as e:
+            logger.error(f"WebSocket command failed: {e}")
+            send("error", request_id, error=str(e))
+        finally:
+            in_flight.pop(request_id, None)
+    
+    sender_task = asyncio.create_task(sender())
+    
     try:
         # Send welcome message
-        await websocket.send_json({
-            "type": "connected",
-            "message": "Connected to Item AI Assistant",
-            "timestamp": datetime.now().isoformat()
-        })
-        
-        orchestrator = get_orchestrator()
+        send("connected", None, message="Connected to Item AI Assistant")
         
         while True:
             # Receive message
             data = await websocket.receive_text()
-            message = json.loads(data)
+            try:
+                message = json.loads(data)
+            except json.JSONDecodeError:
+                send("error", None, error="Invalid JSON")
+                continue
+            
+            request_id = str(message.get("request_id") or uuid.uuid4().hex[:8])
+            message_type = message.get("type", "command")
+            
+            if message_type == "cancel":
+                task = in_flight.get(request_id)
+                if task:
+                    task.cancel()
+                continue
+            
+            if message_type == "ping":
+                send("pong", request_id)
+                continue
             
             command = message.get("command", "")
             source = message.get("source", "websocket")
             
-            log_manager.log_command(command, source)
-            
-            # Process command
-            result = await orchestrator.process_command(command, source=source)
+            if request_id in in_flight:
+                send("error", request_id, error="Duplicate request_id")
+                continue
+            if len(in_flight) >= max_in_flight:
+                send("error", request_id, error=f"Too many commands in flight (max {max_in_flight})")
+                continue
             
-            # Send response
-            await websocket.send_json({
-                "type": "response",
-                "success": result.get("success", False),
-                "message": result.get("message", ""),
-                "result": result.get("data"),
-                "timestamp": datetime.now().isoformat()
-            })
+            send("accepted", request_id, command=command)
+            in_flight[request_id] = asyncio.create_task(run_command(request_id, command, source))
     
     except WebSocketDisconnect:
         logger.info("WebSocket connection closed")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         await websocket.close()
+    finally:
+        for task in list(in_flight.values()):
+            task.cancel()
+        sender_task.cancel()
+        get_conversation_memory().release(session_id)
+
+
+@router.websocket("/ws/events")
+async def websocket_events(websocket: WebSocket):
+    """
+    WebSocket feed of assistant state changes and action results
+    (same events as /api/events)
+    
+    Authenticates with the same token as the HTTP API, as an
+    Authorization header or a ?token= query parameter.
+    """
+    if not await verify_websocket(websocket):
+        return
+    await websocket.accept()
+    
+    config = get_config()
+    state_manager = get_ui_state_manager()
+    subscription = state_manager.subscribe(maxsize=config.get("api.events.queue_size", 100))
+    
+    try:
+        while True:
+            await websocket.send_json(await subscription.get())
+    except WebSocketDisconnect:
+        logger.info("Event WebSocket closed")
+    except Exception as e:
+        logger.error(f"Event WebSocket error: {e}")
+    finally:
+        state_manager.unsubscribe(subscription)
@@ -10,6 +10,7 @@ import uvicorn
 from item_assistant.config import get_config
 from item_assistant.logging import get_logger
 from item_assistant.api.endpoints import router
+from item_assistant.core.status_collector import get_status_collector
 
 logger = get_logger()
 
@@ -40,12 +41,16 @@ async def startup_event():
     logger.info("=" * 80)
     logger.info("Item AI Assistant API Server Starting")
     logger.info("=" * 80)
+    
+    # Status polls are answered from the collector's snapshot
+    get_status_collector().start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler"""
     logger.info("API Server Shutting Down")
+    get_status_collector().stop()
 
 
 @app.get("/")
@@ -64,9 +69,33 @@ async def health_check():
     return {"status": "healthy"}
 
 
+async def start_server_async(host: str = "0.0.0.0", port: int = 8765):
+    """
+    Run the API server on the current event loop
+    
+    Used to host the API on the shared runtime loop, so request handlers
+    and voice commands share async clients and caches.
+    
+    Args:
+        host: Host to bind to
+        port: Port to bind to
+    """
+    config = get_config()
+    
+    # Get port from config if not specified
+    if port == 8765:
+        port = config.get("network.api_port", 8765)
+    
+    logger.info(f"Starting API server on {host}:{port}")
+    
+    # uvicorn only installs signal handlers on the main thread
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="info"))
+    await server.serve()
+
+
 def start_server(host: str = "0.0.0.0", port: int = 8765):
     """
-    Start the API server
+    Start the API server on its own event loop (blocking; for standalone use)
     
     Args:
         host: Host to bind to
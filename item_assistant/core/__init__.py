@@ -1,9 +1,17 @@
 """Core module initialization"""
 
+from .runtime import Runtime, get_runtime
+from .action_dispatcher import ActionDispatcher, get_action_dispatcher
+from .conversation_memory import ConversationMemory, get_conversation_memory
 from .action_executor import ActionExecutor, get_action_executor
 from .orchestrator import Orchestrator, get_orchestrator
+from .status_collector import StatusCollector, get_status_collector
 
 __all__ = [
+    'Runtime', 'get_runtime',
+    'ActionDispatcher', 'get_action_dispatcher',
+    'ConversationMemory', 'get_conversation_memory',
     'ActionExecutor', 'get_action_executor',
     'Orchestrator', 'get_orchestrator',
+    'StatusCollector', 'get_status_collector',
 ]
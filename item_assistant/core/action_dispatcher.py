@@ -0,0 +1,108 @@
+"""
+Action Dispatcher
+Runs blocking desktop handlers on bounded, per-category thread pools.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger, get_tracer
+
+logger = get_logger()
+
+
+class ActionDispatcher:
+    """Dispatches blocking action handlers to category thread pools"""
+    
+    # Default worker limits per category. UI automation and the shared
+    # Selenium driver are not safe to drive concurrently, so they get one
+    # worker each; I/O-bound work (process launch, files, shell) can overlap.
+    DEFAULT_CONCURRENCY = {
+        "ui": 1,
+        "browser": 1,
+        "system": 2,
+        "io": 4,
+    }
+    
+    def __init__(self):
+        """Initialize action dispatcher"""
+        self.config = get_config()
+        
+        limits = dict(self.DEFAULT_CONCURRENCY)
+        limits.update(self.config.get("actions.concurrency", {}) or {})
+        self.limits = limits
+        
+        self.pools: Dict[str, ThreadPoolExecutor] = {
+            category: ThreadPoolExecutor(max_workers=max(1, int(workers)),
+                                         thread_name_prefix=f"action-{category}")
+            for category, workers in limits.items()
+        }
+        
+        # category -> number of submitted but unfinished handlers
+        self.in_flight: Dict[str, int] = {category: 0 for category in limits}
+        self.lock = threading.Lock()
+        
+        logger.info(f"Action dispatcher initialized (concurrency: {limits})")
+    
+    async def run(self, category: str, handler: Callable[..., Any], *args) -> Any:
+        """
+        Run a blocking handler on its category's pool
+        
+        Args:
+            category: Pool category ("ui", "browser", "system", "io")
+            handler: Blocking callable
+            *args: Arguments for the handler
+        
+        Returns:
+            The handler's return value
+        """
+        pool = self.pools.get(category)
+        if pool is None:
+            logger.warning(f"Unknown action category '{category}', using 'io'")
+            category, pool = "io", self.pools["io"]
+        
+        with self.lock:
+            self.in_flight[category] += 1
+        
+        try:
+            loop = asyncio.get_running_loop()
+            # Executors don't carry context over; wrap so handler logs keep the trace id
+            call = get_tracer().wrap(functools.partial(handler, *args))
+            return await loop.run_in_executor(pool, call)
+        finally:
+            with self.lock:
+                self.in_flight[category] -= 1
+    
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get per-category load
+        
+        Returns:
+            Dictionary of category to {"workers", "in_flight"}
+        """
+        with self.lock:
+            return {
+                category: {"workers": self.limits[category], "in_flight": self.in_flight[category]}
+                for category in self.pools
+            }
+    
+    def shutdown(self, wait: bool = False):
+        """Stop all pools"""
+        for pool in self.pools.values():
+            pool.shutdown(wait=wait)
+
+
+# Global action dispatcher instance
+_action_dispatcher_instance = None
+
+
+def get_action_dispatcher() -> ActionDispatcher:
+    """Get the global action dispatcher instance"""
+    global _action_dispatcher_instance
+    if _action_dispatcher_instance is None:
+        _action_dispatcher_instance = ActionDispatcher()
+    return _action_dispatcher_instance
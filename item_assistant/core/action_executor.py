@@ -3,7 +3,7 @@ Action Executor
 Executes parsed actions and workflows.
 """
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Callable
 from datetime import datetime
 
 from item_assistant.logging import get_logger, get_log_manager
@@ -15,8 +15,10 @@ from item_assistant.desktop import (
     get_system_controller,
     get_file_manager
 )
-from item_assistant.llm import get_llm_router
+from item_assistant.llm import get_llm_router, get_semantic_cache
 from item_assistant.voice import get_tts
+from item_assistant.core.action_dispatcher import get_action_dispatcher
+from item_assistant.core.conversation_memory import get_conversation_memory
 
 logger = get_logger()
 log_manager = get_log_manager()
@@ -25,6 +27,24 @@ log_manager = get_log_manager()
 class ActionExecutor:
     """Executes actions based on parsed intents"""
     
+    # Dispatcher category of each intent, as used in execute(). Intents
+    # answered by the LLM or inline are "llm"/"inline". Batch execution uses
+    # this to decide which steps may run side by side.
+    INTENT_CATEGORIES = {
+        "open_app": "io", "close_app": "io", "run_command": "io",
+        "create_file": "io", "list_directory": "io",
+        "search_web": "browser", "open_url": "browser", "navigate_youtube": "browser",
+        "type_text": "ui", "click": "ui", "minimize_window": "ui",
+        "maximize_window": "ui", "close_window": "ui",
+        "get_clipboard": "ui", "set_clipboard": "ui",
+        "system_shutdown": "system", "system_restart": "system", "system_sleep": "system",
+        "system_lock": "system", "system_logout": "system", "set_volume": "system",
+        "mute_volume": "system", "unmute_volume": "system", "set_brightness": "system",
+        "get_system_info": "system",
+        "generate_code": "llm", "general_query": "llm",
+        "get_time": "inline",
+    }
+    
     def __init__(self):
         """Initialize action executor"""
         # Get controller instances
@@ -35,16 +55,27 @@ class ActionExecutor:
         self.system_controller = get_system_controller()
         self.file_manager = get_file_manager()
         self.llm_router = get_llm_router()
+        self.semantic_cache = get_semantic_cache()
+        self.conversation_memory = get_conversation_memory()
         self.tts = get_tts()
         
+        # Blocking desktop handlers run on bounded per-category thread pools
+        self.dispatcher = get_action_dispatcher()
+        
         logger.info("Action executor initialized")
     
-    async def execute(self, intent: Dict) -> Dict:
+    async def execute(self, intent: Dict,
+                      on_chunk: Optional[Callable[[str], None]] = None,
+                      session_id: Optional[str] = None) -> Dict:
         """
         Execute an action based on intent
         
         Args:
             intent: Parsed intent dictionary
+            on_chunk: Optional callback receiving LLM text fragments as they
+                are generated (used by intents that answer via the LLM)
+            session_id: Conversation the command belongs to (enables
+                follow-up questions for general queries)
         
         Returns:
             Execution result
@@ -54,97 +85,98 @@ class ActionExecutor:
         
         logger.info(f"Executing intent: {intent_type}")
         
-        # Route to appropriate handler
+        # Route to appropriate handler. Blocking desktop handlers are
+        # dispatched to thread pools so the event loop stays responsive.
         if intent_type == "open_app":
-            return self._handle_open_app(entities)
+            return await self.dispatcher.run("io", self._handle_open_app, entities)
         
         elif intent_type == "close_app":
-            return self._handle_close_app(entities)
+            return await self.dispatcher.run("io", self._handle_close_app, entities)
         
         elif intent_type == "search_web":
-            return self._handle_search_web(entities)
+            return await self.dispatcher.run("browser", self._handle_search_web, entities)
         
         elif intent_type == "open_url":
-            return self._handle_open_url(entities)
+            return await self.dispatcher.run("browser", self._handle_open_url, entities)
         
         elif intent_type == "navigate_youtube":
-            return self._handle_navigate_youtube(entities)
+            return await self.dispatcher.run("browser", self._handle_navigate_youtube, entities)
         
         elif intent_type == "type_text":
-            return self._handle_type_text(entities)
+            return await self.dispatcher.run("ui", self._handle_type_text, entities)
         
         elif intent_type == "click":
-            return self._handle_click(entities)
+            return await self.dispatcher.run("ui", self._handle_click, entities)
         
         elif intent_type == "run_command":
-            return self._handle_run_command(entities)
+            return await self.dispatcher.run("io", self._handle_run_command, entities)
         
         elif intent_type == "generate_code":
-            return self._handle_generate_code(entities)
+            return await self._handle_generate_code(entities)
         
         elif intent_type == "get_time":
             return self._handle_get_time()
         
         elif intent_type == "general_query":
-            return self._handle_general_query(entities)
+            return await self._handle_general_query(entities, on_chunk, session_id)
         
         # System control intents
         elif intent_type == "system_shutdown":
-            return self._handle_system_shutdown(entities)
+            return await self.dispatcher.run("system", self._handle_system_shutdown, entities)
         
         elif intent_type == "system_restart":
-            return self._handle_system_restart(entities)
+            return await self.dispatcher.run("system", self._handle_system_restart, entities)
         
         elif intent_type == "system_sleep":
-            return self._handle_system_sleep()
+            return await self.dispatcher.run("system", self._handle_system_sleep)
         
         elif intent_type == "system_lock":
-            return self._handle_system_lock()
+            return await self.dispatcher.run("system", self._handle_system_lock)
         
         elif intent_type == "system_logout":
-            return self._handle_system_logout()
+            return await self.dispatcher.run("system", self._handle_system_logout)
         
         # Volume control
         elif intent_type == "set_volume":
-            return self._handle_set_volume(entities)
+            return await self.dispatcher.run("system", self._handle_set_volume, entities)
         
         elif intent_type == "mute_volume":
-            return self._handle_mute()
+            return await self.dispatcher.run("system", self._handle_mute)
         
         elif intent_type == "unmute_volume":
-            return self._handle_unmute()
+            return await self.dispatcher.run("system", self._handle_unmute)
         
         # Brightness control
         elif intent_type == "set_brightness":
-            return self._handle_set_brightness(entities)
+            return await self.dispatcher.run("system", self._handle_set_brightness, entities)
         
         # Window management
         elif intent_type == "minimize_window":
-            return self._handle_minimize_window()
+            return await self.dispatcher.run("ui", self._handle_minimize_window)
         
         elif intent_type == "maximize_window":
-            return self._handle_maximize_window()
+            return await self.dispatcher.run("ui", self._handle_maximize_window)
         
         elif intent_type == "close_window":
-            return self._handle_close_window()
+            return await self.dispatcher.run("ui", self._handle_close_window)
         
         # Clipboard
         elif intent_type == "get_clipboard":
-            return self._handle_get_clipboard()
+            return await self.dispatcher.run("ui", self._handle_get_clipboard)
         
         elif intent_type == "set_clipboard":
-            return self._handle_set_clipboard(entities)
+            return await self.dispatcher.run("ui", self._handle_set_clipboard, entities)
         
         # File operations
         elif intent_type == "create_file":
-            return self._handle_create_file(entities)
+            return await self.dispatcher.run("io", self._handle_create_file, entities)
         
         elif intent_type == "list_directory":
-            return self._handle_list_directory(entities)
+            return await self.dispatcher.run("io", self._handle_list_directory, entities)
         
         # System info
         elif intent_type == "get_system_info":
-            return self._handle_get_system_info()
+            return await self.dispatcher.run("system", self._handle_get_system_info)
         
         else:
             return {
@@ -222,7 +254,7 @@ class ActionExecutor:
         result = self.shell_executor.run_command(command)
         return result
     
-    def _handle_generate_code(self, entities: Dict) -> Dict:
+    async def _handle_generate_code(self, entities: Dict) -> Dict:
         """Handle code generation"""
         prompt = entities.get("prompt", "")
         language = entities.get("language")
@@ -230,7 +262,7 @@ class ActionExecutor:
         if not prompt:
             return {"success": False, "message": "No code prompt provided"}
         
-        result = self.llm_router.generate_code(prompt, language)
+        result = await self.llm_router.generate_code_async(prompt, language)
         
         if result.get("success"):
             return {
@@ -261,21 +293,62 @@ class ActionExecutor:
             }
         }
     
-    def _handle_general_query(self, entities: Dict) -> Dict:
-        """Handle general query using LLM"""
+    async def _handle_general_query(self, entities: Dict,
+                              on_chunk: Optional[Callable[[str], None]] = None,
+                              session_id: Optional[str] = None) -> Dict:
+        """Handle general query using LLM, streaming the answer if requested"""
         query = entities.get("query", "")
         
         if not query:
             return {"success": False, "message": "No query provided"}
         
-        result = self.llm_router.generate(query, task_type="quick_command")
+        # Follow-up questions depend on earlier turns, so only standalone
+        # questions can be answered from (or stored in) the semantic cache
+        history = session_id is not None and self.conversation_memory.has_history(session_id)
+        
+        embedding = None
+        if not history:
+            # Near-duplicate questions are answered from the semantic cache
+            embedding = await self.semantic_cache.embed_async(query)
+            cached = self.semantic_cache.lookup(embedding)
+            if cached:
+                if session_id is not None:
+                    self.conversation_memory.add_exchange(session_id, query, cached["answer"])
+                if on_chunk:
+                    on_chunk(cached["answer"])
+                return {
+                    "success": True,
+                    "message": cached["answer"],
+                    "data": {"response": cached["answer"], "cached": True},
+                    "streamed": bool(on_chunk)
+                }
+        
+        if history:
+            messages = self.conversation_memory.build_messages(session_id, query)
+            if on_chunk:
+                result = await self.llm_router.chat_stream_async(messages, on_chunk,
+                                                                 task_type="quick_command",
+                                                                 session_id=session_id)
+            else:
+                result = await self.llm_router.chat_async(messages, task_type="quick_command",
+                                                          session_id=session_id)
+        elif on_chunk:
+            result = await self.llm_router.generate_stream_async(query, on_chunk,
+                                                                 task_type="quick_command")
+        else:
+            result = await self.llm_router.generate_async(query, task_type="quick_command")
         
         if result.get("success"):
             response_text = result.get("text", "")
+            if not history:
+                self.semantic_cache.store(query, response_text, embedding)
+            if session_id is not None:
+                self.conversation_memory.add_exchange(session_id, query, response_text)
             return {
                 "success": True,
                 "message": response_text,
-                "data": {"response": response_text}
+                "data": {"response": response_text},
+                "streamed": result.get("streamed", False)
             }
         else:
             return {
@@ -0,0 +1,358 @@
+"""
+Conversation Memory
+Per-session chat history with SQLite persistence and token-budgeted context windows.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+from item_assistant.llm import get_llm_router
+from item_assistant.core.runtime import get_runtime
+
+logger = get_logger()
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a user and a voice assistant.
+
+Current summary:
+{summary}
+
+New conversation lines:
+{lines}
+
+Write the updated summary in at most {words} words. Keep names, facts, preferences and open questions; drop small talk. Reply with the summary only."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+class ConversationSession:
+    """In-memory state of one conversation"""
+    
+    def __init__(self, max_turns: int):
+        self.turns: Deque[Dict] = deque(maxlen=max_turns)
+        self.summary = ""
+        self.summarized_upto = 0  # id of the last turn folded into the summary
+        self.last_activity = 0.0
+        self.summarizing = False
+
+
+class ConversationMemory:
+    """Keeps recent turns verbatim and folds older ones into a summary"""
+    
+    def __init__(self):
+        """Initialize conversation memory"""
+        self.config = get_config()
+        self.llm_router = get_llm_router()
+        
+        self.enabled = self.config.get("conversation.enabled", True)
+        self.max_turns = self.config.get("conversation.max_turns_in_memory", 50)
+        self.token_budget = self.config.get("conversation.token_budget", 1500)
+        self.summary_words = self.config.get("conversation.summary_max_words", 120)
+        self.session_timeout = self.config.get("conversation.session_timeout_minutes", 30) * 60
+        self.system_prompt = self.config.get(
+            "conversation.system_prompt",
+            "You are Item, a concise voice assistant. Answer in a few sentences."
+        )
+        
+        data_dir = Path(self.config.get("system.data_directory", "."))
+        self.db_path = data_dir / self.config.get("conversation.database", "conversations.db")
+        
+        self.sessions: Dict[str, ConversationSession] = {}
+        self.lock = threading.Lock()
+        self.db_lock = threading.Lock()
+        self.background_tasks = set()
+        self.db: Optional[sqlite3.Connection] = None
+        
+        if self.enabled:
+            self._open_db()
+        
+        logger.info(f"Conversation memory initialized (budget: {self.token_budget} tokens, enabled: {self.enabled})")
+    
+    def _open_db(self):
+        """Open the SQLite store, creating tables if needed"""
+        try:
+            self.db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self.db.executescript("""
+                CREATE TABLE IF NOT EXISTS turns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_turns_session ON turns (session_id, id);
+                CREATE TABLE IF NOT EXISTS summaries (
+                    session_id TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    upto_turn_id INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+            """)
+            self.db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error opening conversation database: {e}")
+            self.db = None
+    
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run a statement against the store, returning any rows"""
+        if self.db is None:
+            return []
+        with self.db_lock:
+            try:
+                cursor = self.db.execute(sql, params)
+                rows = cursor.fetchall()
+                self.db.commit()
+                return rows
+            except sqlite3.Error as e:
+                logger.error(f"Conversation database error: {e}")
+                return []
+    
+    def _get_session(self, session_id: str) -> ConversationSession:
+        """Get a session, loading it from disk or starting over after a timeout"""
+        now = time.time()
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is not None and now - session.last_activity <= self.session_timeout:
+                return session
+            expired = session is not None
+            
+            session = ConversationSession(self.max_turns)
+            session.last_activity = now
+            self.sessions[session_id] = session
+        
+        if expired:
+            # The conversation went quiet; don't pin the old provider session either
+            self.llm_router.end_session(session_id)
+        
+        # Only resume what happened within the timeout window
+        cutoff = now - self.session_timeout
+        for summary, upto, updated_at in self._execute(
+                "SELECT summary, upto_turn_id, updated_at FROM summaries WHERE session_id = ?",
+                (session_id,)):
+            if updated_at >= cutoff:
+                session.summary, session.summarized_upto = summary, upto
+        
+        rows = self._execute(
+            "SELECT id, role, content, created_at FROM turns "
+            "WHERE session_id = ? AND id > ? AND created_at >= ? ORDER BY id DESC LIMIT ?",
+            (session_id, session.summarized_upto, cutoff, self.max_turns)
+        )
+        with self.lock:
+            for turn_id, role, content, created_at in reversed(rows):
+                session.turns.append({"id": turn_id, "role": role, "content": content,
+                                      "tokens": estimate_tokens(content)})
+            if rows:
+                session.last_activity = rows[0][3]
+        return session
+    
+    def has_history(self, session_id: str) -> bool:
+        """
+        Check whether a session has context worth sending
+        
+        Args:
+            session_id: Session identifier (e.g. command source)
+        
+        Returns:
+            True if the session has recent turns or a summary
+        """
+        if not self.enabled:
+            return False
+        session = self._get_session(session_id)
+        return bool(session.turns or session.summary)
+    
+    def _window(self, session: ConversationSession, budget: int) -> List[Dict]:
+        """Newest turns that fit in the budget, oldest first"""
+        window = []
+        for turn in reversed(session.turns):
+            if window and turn["tokens"] > budget:
+                break
+            window.append(turn)
+            budget -= turn["tokens"]
+        window.reverse()
+        # Providers expect the history to open with a user message
+        if window and window[0]["role"] == "assistant":
+            window.pop(0)
+        return window
+    
+    def build_messages(self, session_id: str, user_text: str) -> List[Dict[str, str]]:
+        """
+        Build the message list for the next turn
+        
+        Args:
+            session_id: Session identifier
+            user_text: The new user message
+        
+        Returns:
+            System message (with summary), recent turns verbatim, then the new message
+        """
+        system = self.system_prompt
+        if not self.enabled:
+            return [{"role": "system", "content": system}, {"role": "user", "content": user_text}]
+        
+        session = self._get_session(session_id)
+        with self.lock:
+            if session.summary:
+                system += f"\n\nSummary of the earlier conversation:\n{session.summary}"
+            budget = self.token_budget - estimate_tokens(system) - estimate_tokens(user_text)
+            window = self._window(session, max(budget, 0))
+        
+        messages = [{"role": "system", "content": system}]
+        messages.extend({"role": turn["role"], "content": turn["content"]} for turn in window)
+        messages.append({"role": "user", "content": user_text})
+        return messages
+    
+    def add_exchange(self, session_id: str, user_text: str, assistant_text: str):
+        """
+        Record a user message and the assistant's answer
+        
+        Args:
+            session_id: Session identifier
+            user_text: User message
+            assistant_text: Assistant answer
+        """
+        if not self.enabled:
+            return
+        
+        session = self._get_session(session_id)
+        now = time.time()
+        for role, content in (("user", user_text), ("assistant", assistant_text)):
+            turn_id = None
+            if self.db is not None:
+                with self.db_lock:
+                    try:
+                        cursor = self.db.execute(
+                            "INSERT INTO turns (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                            (session_id, role, content, now)
+                        )
+                        self.db.commit()
+                        turn_id = cursor.lastrowid
+                    except sqlite3.Error as e:
+                        logger.error(f"Conversation database error: {e}")
+            with self.lock:
+                if turn_id is None:
+                    turn_id = (session.turns[-1]["id"] + 1) if session.turns else session.summarized_upto + 1
+                session.turns.append({"id": turn_id, "role": role, "content": content,
+                                      "tokens": estimate_tokens(content)})
+                session.last_activity = now
+        
+        self._maybe_summarize(session_id, session)
+    
+    def _overflow(self, session: ConversationSession) -> List[Dict]:
+        """Turns that no longer fit the verbatim window and aren't summarized yet"""
+        budget = self.token_budget - estimate_tokens(self.system_prompt) - estimate_tokens(session.summary)
+        window = self._window(session, max(budget // 2, 0))
+        first_kept = window[0]["id"] if window else float("inf")
+        return [t for t in session.turns if session.summarized_upto < t["id"] < first_kept]
+    
+    def _maybe_summarize(self, session_id: str, session: ConversationSession):
+        """Fold overflowing turns into the summary in the background"""
+        with self.lock:
+            # Summarize once the verbatim turns use half the budget, so the
+            # window always has room for the next exchange
+            overflow = self._overflow(session)
+            if not overflow or session.summarizing:
+                return
+            session.summarizing = True
+        
+        try:
+            task = asyncio.get_running_loop().create_task(self._summarize(session_id, session, overflow))
+            self.background_tasks.add(task)
+            task.add_done_callback(self.background_tasks.discard)
+        except RuntimeError:
+            # Called from a plain thread; summarize on the shared loop
+            get_runtime().submit(self._summarize(session_id, session, overflow))
+    
+    async def _summarize(self, session_id: str, session: ConversationSession, overflow: List[Dict]):
+        """Summarize overflow turns into the session summary"""
+        try:
+            lines = "\n".join(f"{turn['role'].capitalize()}: {turn['content']}" for turn in overflow)
+            prompt = SUMMARY_PROMPT.format(summary=session.summary or "(none)", lines=lines,
+                                           words=self.summary_words)
+            result = await self.llm_router.generate_async(prompt, task_type="summarization",
+                                                          max_tokens=self.summary_words * 2,
+                                                          temperature=0.2)
+            if not result.get("success"):
+                logger.warning(f"Conversation summary failed: {result.get('error')}")
+                return
+            
+            upto = overflow[-1]["id"]
+            with self.lock:
+                session.summary = result.get("text", "").strip()
+                session.summarized_upto = upto
+                while session.turns and session.turns[0]["id"] <= upto:
+                    session.turns.popleft()
+            
+            self._execute(
+                "INSERT OR REPLACE INTO summaries (session_id, summary, upto_turn_id, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, session.summary, upto, time.time())
+            )
+            logger.info(f"Summarized {len(overflow)} turns of session '{session_id}'")
+        finally:
+            session.summarizing = False
+    
+    def clear(self, session_id: str):
+        """
+        Forget a session's context (history stays on disk)
+        
+        Args:
+            session_id: Session identifier
+        """
+        with self.lock:
+            self.sessions.pop(session_id, None)
+        self._execute(
+            "INSERT OR REPLACE INTO summaries (session_id, summary, upto_turn_id, updated_at) "
+            "SELECT ?, '', COALESCE(MAX(id), 0), ? FROM turns WHERE session_id = ?",
+            (session_id, time.time(), session_id)
+        )
+        self.llm_router.end_session(session_id)
+    
+    def release(self, session_id: str):
+        """
+        Drop a finished session (e.g. a closed connection) from memory;
+        its history stays on disk
+        
+        Args:
+            session_id: Session identifier
+        """
+        with self.lock:
+            self.sessions.pop(session_id, None)
+        self.llm_router.end_session(session_id)
+    
+    def stats(self) -> Dict:
+        """
+        Get per-session context sizes
+        
+        Returns:
+            Dictionary of session id to turn count, token estimate and summary flag
+        """
+        with self.lock:
+            return {
+                session_id: {
+                    "turns": len(session.turns),
+                    "tokens": sum(turn["tokens"] for turn in session.turns),
+                    "summarized": bool(session.summary)
+                }
+                for session_id, session in self.sessions.items()
+            }
+
+
+# Global conversation memory instance
+_conversation_memory_instance = None
+
+
+def get_conversation_memory() -> ConversationMemory:
+    """Get the global conversation memory instance"""
+    global _conversation_memory_instance
+    if _conversation_memory_instance is None:
+        _conversation_memory_instance = ConversationMemory()
+    return _conversation_memory_instance
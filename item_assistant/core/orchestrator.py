@@ -3,18 +3,21 @@ Orchestrator
 Main coordination logic for the Item AI Assistant.
 """
 
+import asyncio
 import time
-from typing import Dict, Optional
+from typing import Dict, Optional, List, Callable
 from datetime import datetime
 
 from item_assistant.config import get_config
-from item_assistant.logging import get_logger, get_log_manager
-from item_assistant.llm import get_intent_parser, get_local_llm, get_online_llm
+from item_assistant.logging import get_logger, get_log_manager, get_metrics, get_tracer
+from item_assistant.llm import get_intent_parser, get_health_monitor, get_model_manager
 from item_assistant.voice import get_tts
-from item_assistant.core.action_executor import get_action_executor
+from item_assistant.ui.state import get_ui_state_manager
+from item_assistant.core.action_executor import get_action_executor, ActionExecutor
 
 logger = get_logger()
 log_manager = get_log_manager()
+metrics = get_metrics()
 
 
 class Orchestrator:
@@ -26,18 +29,29 @@ class Orchestrator:
         self.intent_parser = get_intent_parser()
         self.action_executor = get_action_executor()
         self.tts = get_tts()
+        self.ui_state = get_ui_state_manager()
         
         self.start_time = time.time()
         
+        # Read by the status collector
+        self.in_flight = 0
+        self.last_command: Optional[Dict] = None
+        
         logger.info("Orchestrator initialized")
     
-    async def process_command(self, command: str, source: str = "laptop") -> Dict:
+    async def process_command(self, command: str, source: str = "laptop",
+                              on_event: Optional[Callable[[str, Dict], None]] = None,
+                              session_id: Optional[str] = None) -> Dict:
         """
         Process a user command
         
         Args:
             command: User command text
             source: Source of command ("laptop", "phone", "api")
+            on_event: Optional progress callback, called as on_event(type, payload)
+                with "intent", "action_started", "chunk" and "error" events
+            session_id: Conversation the command continues (one per client or
+                connection); without one the command is standalone
         
         Returns:
             Result dictionary
@@ -45,9 +59,42 @@ class Orchestrator:
         logger.info(f"Processing command from {source}: {command}")
         log_manager.log_command(command, source)
         
+        started = time.time()
+        self.in_flight += 1
+        result = None
+        try:
+            with get_tracer().span("process_command", source=source) as span:
+                result = await self._process_command(command, source, on_event, session_id)
+                if span is not None:
+                    span.set_attribute("success", result.get("success", False))
+            return result
+        finally:
+            self.in_flight -= 1
+            metrics.commands.inc(source=source, status="success" if result and result.get("success") else "error")
+            self.last_command = {
+                "source": source,
+                "success": bool(result and result.get("success")),
+                "elapsed_ms": round((time.time() - started) * 1000, 1),
+                "finished_at": time.time()
+            }
+    
+    async def _process_command(self, command: str, source: str,
+                               on_event: Optional[Callable[[str, Dict], None]],
+                               session_id: Optional[str]) -> Dict:
+        """Parse, execute and respond to one command (see process_command)"""
+        emit = on_event or (lambda event, payload: None)
+        
         try:
             # Step 1: Parse intent
-            intent = self.intent_parser.parse(command)
+            with metrics.stage("intent_parse") as labels:
+                intent = await self.intent_parser.parse_async(command)
+                labels.update(provider=intent.get("source", ""), intent=intent.get("intent", ""))
+            emit("intent", {
+                "intent": intent.get("intent"),
+                "entities": intent.get("entities", {}),
+                "confidence": intent.get("confidence"),
+                "source": intent.get("source")
+            })
             
             if intent.get("intent") == "unknown":
                 message = "Sorry, I didn't understand that command."
@@ -57,17 +104,43 @@ class Orchestrator:
                     "message": message
                 }
             
-            # Step 2: Execute action
-            result = await self.action_executor.execute(intent)
+            # Step 2: Execute action, speaking streamed answers sentence by
+            # sentence so TTS starts before generation has finished
+            speaker = None
+            if source == "laptop" and self.tts.enabled:
+                speaker = self.tts.sentence_streamer()
+            
+            on_chunk = None
+            if speaker or on_event:
+                def on_chunk(fragment: str):
+                    if speaker:
+                        speaker.feed(fragment)
+                    emit("chunk", {"text": fragment})
+            
+            emit("action_started", {"intent": intent.get("intent")})
+            
+            # Each client keeps its own conversation for follow-up questions
+            with metrics.stage("action_execute", intent=intent.get("intent", "")):
+                result = await self.action_executor.execute(
+                    intent,
+                    on_chunk=on_chunk,
+                    session_id=session_id
+                )
+            
+            if speaker:
+                speaker.flush()
+            
+            self._publish_result(command, source, intent, result)
             
             # Step 3: Respond
             message = result.get("message", "Command completed")
-            self._respond(message, source)
+            self._respond(message, source, already_spoken=bool(speaker and speaker.spoken))
             
             return result
         
         except Exception as e:
             logger.error(f"Error processing command: {e}", exc_info=True)
+            emit("error", {"error": str(e)})
             message = f"Sorry, an error occurred: {str(e)}"
             self._respond(message, source)
             
@@ -77,16 +150,154 @@ class Orchestrator:
                 "error": str(e)
             }
     
-    def _respond(self, message: str, source: str):
+    async def process_batch(self, commands: List[str], source: str = "api",
+                            sequential: bool = False, stop_on_error: bool = False) -> Dict:
+        """
+        Process several commands (each possibly compound) in one call
+        
+        Steps run concurrently unless one depends on another: a step the
+        user ordered with "then" waits for everything before it, UI steps
+        wait for everything before them (they act on whatever window is
+        focused), and steps using the same desktop resource keep their order.
+        
+        Args:
+            commands: Command texts
+            source: Source of the commands
+            sequential: Run every step in order regardless of dependencies
+            stop_on_error: Skip steps whose prerequisites failed
+        
+        Returns:
+            Result dictionary with one entry per step under "steps"
+        """
+        for command in commands:
+            log_manager.log_command(command, source)
+        
+        started = time.time()
+        self.in_flight += 1
+        result = None
+        try:
+            with get_tracer().span("process_batch", source=source, commands=len(commands)) as span:
+                result = await self._process_batch(commands, source, sequential, stop_on_error)
+                if span is not None:
+                    span.set_attribute("success", result.get("success", False))
+            return result
+        finally:
+            self.in_flight -= 1
+            metrics.commands.inc(source=source, status="success" if result and result.get("success") else "error")
+            self.last_command = {
+                "source": source,
+                "success": bool(result and result.get("success")),
+                "elapsed_ms": round((time.time() - started) * 1000, 1),
+                "finished_at": time.time()
+            }
+    
+    async def _process_batch(self, commands: List[str], source: str,
+                             sequential: bool, stop_on_error: bool) -> Dict:
+        """Parse, schedule and run every step of a batch (see process_batch)"""
+        started = time.time()
+        parsed = await asyncio.gather(*(self.intent_parser.parse_multi_async(c) for c in commands))
+        steps = [intent for intents in parsed for intent in intents]
+        logger.info(f"Processing batch from {source}: {len(commands)} commands, {len(steps)} steps")
+        
+        tasks: List[asyncio.Task] = []
+        for index, intent in enumerate(steps):
+            if sequential:
+                deps = list(range(index))
+            else:
+                deps = self._step_dependencies(steps, index)
+            tasks.append(asyncio.ensure_future(
+                self._run_step(intent, [tasks[j] for j in deps], source, stop_on_error)
+            ))
+        results = await asyncio.gather(*tasks)
+        
+        for index, result in enumerate(results):
+            result["step"] = index
+        
+        succeeded = sum(1 for r in results if r["success"])
+        message = "; ".join(r["message"] for r in results if r.get("message"))
+        self._respond(message or f"{succeeded} of {len(results)} steps completed", source)
+        
+        return {
+            "success": succeeded == len(results),
+            "message": message,
+            "steps": results,
+            "elapsed_ms": round((time.time() - started) * 1000, 1)
+        }
+    
+    def _step_dependencies(self, steps: List[Dict], index: int) -> List[int]:
+        """Indices of earlier steps that must finish before this one starts"""
+        intent = steps[index]
+        category = ActionExecutor.INTENT_CATEGORIES.get(intent.get("intent"))
+        
+        if intent.get("after_then") or category == "ui":
+            return list(range(index))
+        
+        # LLM answers and inline lookups don't contend for anything
+        if category in (None, "llm", "inline"):
+            return []
+        
+        return [
+            j for j in range(index)
+            if ActionExecutor.INTENT_CATEGORIES.get(steps[j].get("intent")) == category
+        ]
+    
+    async def _run_step(self, intent: Dict, deps: List[asyncio.Task], source: str,
+                        stop_on_error: bool) -> Dict:
+        """Wait for a step's prerequisites, then execute it"""
+        step = {
+            "command": intent.get("raw_command", ""),
+            "intent": intent.get("intent", "unknown")
+        }
+        
+        if deps:
+            prerequisites = await asyncio.gather(*deps)
+            if stop_on_error and not all(r["success"] for r in prerequisites):
+                step.update(success=False, skipped=True, message="Skipped: an earlier step failed")
+                return step
+        
+        started = time.time()
+        if step["intent"] == "unknown":
+            result = {"success": False, "message": "Sorry, I didn't understand that command."}
+        else:
+            try:
+                # Steps may run concurrently, so none of them joins a conversation
+                result = await self.action_executor.execute(intent)
+            except Exception as e:
+                logger.error(f"Error executing batch step '{step['command']}': {e}", exc_info=True)
+                result = {"success": False, "message": f"Error: {e}", "error": str(e)}
+        
+        self._publish_result(step["command"], source, intent, result)
+        metrics.observe_stage("action_execute", time.time() - started, intent=step["intent"])
+        
+        step.update(
+            success=result.get("success", False),
+            message=result.get("message", ""),
+            data=result.get("data"),
+            elapsed_ms=round((time.time() - started) * 1000, 1)
+        )
+        return step
+    
+    def _publish_result(self, command: str, source: str, intent: Dict, result: Dict):
+        """Push an action result to remote UI subscribers"""
+        self.ui_state.publish_event("action_result", {
+            "source": source,
+            "command": command,
+            "intent": intent.get("intent"),
+            "success": result.get("success", False),
+            "message": result.get("message", "")
+        })
+    
+    def _respond(self, message: str, source: str, already_spoken: bool = False):
         """
         Send response to user
         
         Args:
             message: Response message
             source: Original command source
+            already_spoken: Response was already spoken while streaming
         """
         # If command was from laptop (voice), speak response (non-blocking)
-        if source == "laptop" and self.tts.enabled:
+        if source == "laptop" and self.tts.enabled and not already_spoken:
             self.tts.speak(message, wait=False)  # ✅ Non-blocking!
         
         # For API/phone, response is sent via API (no TTS needed)
@@ -101,17 +312,18 @@ class Orchestrator:
         """
         uptime = time.time() - self.start_time
         
-        # Check LLM availability
-        local_llm = get_local_llm()
-        online_llm = get_online_llm()
+        # LLM availability comes from the health monitor's cache (no network calls)
+        health_monitor = get_health_monitor()
         
         return {
             "uptime": uptime,
             "voice_enabled": self.tts.enabled,
             "llm_available": {
-                "local": local_llm.is_available(),
-                "online": online_llm.is_available()
+                "local": health_monitor.is_available("local"),
+                "online": health_monitor.is_available("online")
             },
+            "health": health_monitor.snapshot(),
+            "models": get_model_manager().snapshot(),
             "timestamp": datetime.now().isoformat()
         }
 
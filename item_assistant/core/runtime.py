@@ -0,0 +1,152 @@
+"""
+Runtime
+Process-wide event loop on a dedicated thread, shared by voice, UI and API work.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Callable, Coroutine, Optional
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+from item_assistant.utils.http_pool import get_http_pool
+
+logger = get_logger()
+
+
+class Runtime:
+    """Owns the long-lived event loop that all async work is submitted to"""
+    
+    def __init__(self):
+        """Initialize runtime (the loop starts on first use)"""
+        self.config = get_config()
+        self.shutdown_timeout = self.config.get("runtime.shutdown_timeout_seconds", 5)
+        
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+    
+    def start(self) -> asyncio.AbstractEventLoop:
+        """
+        Start the loop thread if it isn't running
+        
+        Returns:
+            The shared event loop
+        """
+        with self.lock:
+            if self.loop is not None and self.thread is not None and self.thread.is_alive():
+                return self.loop
+            
+            ready = threading.Event()
+            loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self._run_loop, args=(loop, ready),
+                                           name="runtime-loop", daemon=True)
+            self.thread.start()
+            ready.wait()
+            self.loop = loop
+        
+        logger.info("[RUNTIME] Shared event loop started")
+        return loop
+    
+    def _run_loop(self, loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        """Loop thread: run until stop(), then release async generators"""
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+        finally:
+            try:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+            finally:
+                loop.close()
+    
+    def in_loop_thread(self) -> bool:
+        """Check whether the caller is running on the shared loop's thread"""
+        return self.thread is not None and threading.current_thread() is self.thread
+    
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the shared loop from any thread
+        
+        The task inherits the caller's context (e.g. the current trace).
+        
+        Args:
+            coro: Coroutine to run
+        
+        Returns:
+            concurrent.futures.Future with the coroutine's result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.start())
+    
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the shared loop and wait for its result
+        
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait (None waits indefinitely)
+        
+        Returns:
+            The coroutine's result
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("Runtime.run() would block the shared loop; await the coroutine instead")
+        
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+    
+    def call_soon(self, callback: Callable, *args):
+        """
+        Schedule a plain callback on the shared loop from any thread
+        
+        Args:
+            callback: Callable to run on the loop
+            *args: Arguments for the callback
+        """
+        self.start().call_soon_threadsafe(callback, *args)
+    
+    def stop(self):
+        """Cancel outstanding tasks, close pooled async clients and stop the loop"""
+        with self.lock:
+            loop, thread = self.loop, self.thread
+            self.loop = None
+            self.thread = None
+        
+        if loop is None or not loop.is_running():
+            return
+        
+        async def drain():
+            current = asyncio.current_task()
+            tasks = [task for task in asyncio.all_tasks() if task is not current]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await get_http_pool().close_async()
+        
+        try:
+            asyncio.run_coroutine_threadsafe(drain(), loop).result(self.shutdown_timeout)
+        except Exception as e:
+            logger.warning(f"[RUNTIME] Error draining event loop: {e}")
+        
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(self.shutdown_timeout)
+        logger.info("[RUNTIME] Shared event loop stopped")
+
+
+# Global runtime instance
+_runtime_instance = None
+
+
+def get_runtime() -> Runtime:
+    """Get the global runtime instance"""
+    global _runtime_instance
+    if _runtime_instance is None:
+        _runtime_instance = Runtime()
+    return _runtime_instance
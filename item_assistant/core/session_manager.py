@@ -6,8 +6,9 @@ Allows multiple sessions in the same process without resource leaks or singleton
 
 import asyncio
 import threading
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set
 from item_assistant.logging import get_logger
+from item_assistant.core.runtime import get_runtime
 
 logger = get_logger()
 
@@ -21,6 +22,8 @@ class SessionManager:
         self.event_loop: Optional[asyncio.AbstractEventLoop] = None
         self.resources: List[str] = []  # Track resource names for cleanup
         self.singletons_to_reset: List[tuple] = []  # (module, function_name)
+        # Work this session started on the shared loop (tasks or thread-safe futures)
+        self.tasks: Set = set()
         self.running = False
         
         logger.info("[SESSION] SessionManager initialized")
@@ -36,13 +39,13 @@ class SessionManager:
         self.session_id = str(uuid.uuid4())[:8]
         self.running = True
         
-        # Create event loop for this session
+        # Sessions run on the process-wide runtime loop rather than their own,
+        # so pooled clients and caches bound to a loop are reused
         try:
-            self.event_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.event_loop)
-            logger.info(f"[SESSION] Session {self.session_id} started with new event loop")
+            self.event_loop = get_runtime().start()
+            logger.info(f"[SESSION] Session {self.session_id} started on the shared event loop")
         except Exception as e:
-            logger.error(f"[SESSION] Failed to create event loop: {e}")
+            logger.error(f"[SESSION] Failed to start event loop: {e}")
             raise
         
         return self.session_id
@@ -81,7 +84,16 @@ class SessionManager:
         if not self.event_loop:
             raise RuntimeError("Session not started")
         
-        return await coro
+        if asyncio.get_running_loop() is self.event_loop:
+            task = asyncio.ensure_future(coro)
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            return await task
+        
+        future = get_runtime().submit(coro)
+        self.tasks.add(future)
+        future.add_done_callback(self.tasks.discard)
+        return await asyncio.wrap_future(future)
     
     def end_session(self):
         """
@@ -108,22 +120,19 @@ class SessionManager:
             except Exception as e:
                 logger.error(f"[SESSION] Failed to reset {module_name}.{reset_function_name}: {e}")
         
-        # Close event loop
-        if self.event_loop:
+        # Cancel only this session's work; the shared loop also runs the API
+        # server and is stopped by ItemAssistant.shutdown
+        for task in list(self.tasks):
             try:
-                # Cancel all pending tasks
-                pending = asyncio.all_tasks(self.event_loop)
-                for task in pending:
+                if isinstance(task, asyncio.Task):
+                    task.get_loop().call_soon_threadsafe(task.cancel)
+                else:
                     task.cancel()
-                
-                # Run loop one more time to process cancellations
-                self.event_loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-                
-                # Close the loop
-                self.event_loop.close()
-                logger.info("[SESSION] Event loop closed")
             except Exception as e:
-                logger.error(f"[SESSION] Error closing event loop: {e}")
+                logger.error(f"[SESSION] Error cancelling session task: {e}")
+        if self.tasks:
+            logger.info(f"[SESSION] Cancelled {len(self.tasks)} pending session tasks")
+        self.tasks.clear()
         
         logger.info(f"[SESSION] Session {self.session_id} ended")
         self.session_id = None
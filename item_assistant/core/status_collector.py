@@ -0,0 +1,178 @@
+"""
+Status Collector
+Maintains a cached status snapshot in the background so status polls never do I/O.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+from item_assistant.core.action_dispatcher import get_action_dispatcher
+from item_assistant.core.orchestrator import get_orchestrator
+
+logger = get_logger()
+
+# Fields that change on every refresh and are left out of the ETag; clients
+# that get a 304 can derive uptime from started_at themselves
+_VOLATILE_FIELDS = ("uptime", "collected_at")
+
+# Per-probe health fields that change on every probe even when nothing else did
+_VOLATILE_HEALTH_FIELDS = ("checked_at", "age_seconds", "latency_ms")
+
+
+def _etag_view(snapshot: Dict) -> Dict:
+    """
+    The part of a snapshot the ETag covers
+    
+    Counters and flags are kept; timings and countdowns (probe ages and
+    latencies, seconds until a model unloads) are dropped so the ETag only
+    changes when the status itself does.
+    
+    Args:
+        snapshot: Status snapshot
+    
+    Returns:
+        Snapshot without volatile fields
+    """
+    view = {key: value for key, value in snapshot.items() if key not in _VOLATILE_FIELDS}
+    view["health"] = {
+        name: {key: value for key, value in entry.items() if key not in _VOLATILE_HEALTH_FIELDS}
+        for name, entry in snapshot.get("health", {}).items()
+    }
+    models = snapshot.get("models", {})
+    view["models"] = dict(models, resident=sorted(models.get("resident", {})))
+    return view
+
+
+class StatusCollector:
+    """Rebuilds the status snapshot on an interval and serves it from memory"""
+    
+    def __init__(self):
+        """Initialize status collector"""
+        self.config = get_config()
+        self.orchestrator = get_orchestrator()
+        self.dispatcher = get_action_dispatcher()
+        
+        self.refresh_interval = self.config.get("api.status.refresh_interval_seconds", 2)
+        
+        # name -> callable returning a dict merged into the snapshot under that name
+        self.sources: Dict[str, Callable[[], Dict]] = {
+            "audio": self._audio_health,
+        }
+        
+        self.snapshot: Dict = {}
+        self.etag = ""
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+        
+        self.refresh()
+        logger.info(f"Status collector initialized (interval: {self.refresh_interval}s)")
+    
+    def register_source(self, name: str, source: Callable[[], Dict]):
+        """
+        Add (or replace) a section of the snapshot
+        
+        Args:
+            name: Snapshot key
+            source: Cheap callable returning the section; it runs on the
+                collector thread and must not block on the network
+        """
+        with self.lock:
+            self.sources[name] = source
+        self.wakeup.set()
+    
+    def _audio_health(self) -> Dict:
+        """Default audio section: only TTS is known until the voice pipeline registers"""
+        tts = self.orchestrator.tts
+        return {"tts": bool(tts.enabled and tts.engine is not None)}
+    
+    def refresh(self):
+        """Rebuild the snapshot from cached component state"""
+        status = self.orchestrator.get_status()
+        dispatcher_stats = self.dispatcher.stats()
+        
+        snapshot = {
+            "uptime": status["uptime"],
+            "started_at": self.orchestrator.start_time,
+            "voice_enabled": status["voice_enabled"],
+            "llm_available": status["llm_available"],
+            "health": status["health"],
+            "models": status["models"],
+            "queue": {
+                "commands_in_flight": self.orchestrator.in_flight,
+                "actions_in_flight": sum(s["in_flight"] for s in dispatcher_stats.values()),
+                "pools": dispatcher_stats
+            },
+            "last_command": self.orchestrator.last_command,
+        }
+        
+        with self.lock:
+            sources = dict(self.sources)
+        for name, source in sources.items():
+            try:
+                snapshot[name] = source()
+            except Exception as e:
+                logger.debug(f"Status source '{name}' failed: {e}")
+                snapshot[name] = {"error": str(e)}
+        
+        stable = json.dumps(_etag_view(snapshot), sort_keys=True, default=str)
+        digest = hashlib.sha1(stable.encode("utf-8"))
+        snapshot["collected_at"] = time.time()
+        
+        with self.lock:
+            self.snapshot = snapshot
+            self.etag = f'"{digest.hexdigest()[:16]}"'
+    
+    def get_snapshot(self) -> tuple:
+        """
+        Get the latest snapshot without doing any I/O
+        
+        Returns:
+            Tuple of (snapshot dict, ETag header value)
+        """
+        with self.lock:
+            snapshot, etag = dict(self.snapshot), self.etag
+        # Uptime is cheap to keep exact between refreshes
+        snapshot["uptime"] = time.time() - snapshot.get("started_at", time.time())
+        return snapshot, etag
+    
+    def start(self):
+        """Start background refreshes"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="status-collector", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Stop background refreshes"""
+        self.running = False
+        self.wakeup.set()
+    
+    def _loop(self):
+        """Background loop: refresh on an interval or when woken"""
+        while self.running:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Error collecting status: {e}")
+            self.wakeup.wait(self.refresh_interval)
+            self.wakeup.clear()
+
+
+# Global status collector instance
+_status_collector_instance = None
+
+
+def get_status_collector() -> StatusCollector:
+    """Get the global status collector instance"""
+    global _status_collector_instance
+    if _status_collector_instance is None:
+        _status_collector_instance = StatusCollector()
+    return _status_collector_instance
@@ -2,12 +2,22 @@
 
 from .local_llm import LocalLLM, get_local_llm
 from .online_llm import OnlineLLM, get_online_llm
+from .health_monitor import HealthMonitor, get_health_monitor
+from .latency_tracker import LatencyTracker, get_latency_tracker
+from .model_manager import ModelManager, get_model_manager
 from .llm_router import LLMRouter, get_llm_router
+from .intent_cache import IntentCache
+from .semantic_cache import SemanticCache, get_semantic_cache
 from .intent_parser import IntentParser, get_intent_parser
 
 __all__ = [
     'LocalLLM', 'get_local_llm',
     'OnlineLLM', 'get_online_llm',
+    'HealthMonitor', 'get_health_monitor',
+    'LatencyTracker', 'get_latency_tracker',
+    'ModelManager', 'get_model_manager',
     'LLMRouter', 'get_llm_router',
+    'IntentCache',
+    'SemanticCache', 'get_semantic_cache',
     'IntentParser', 'get_intent_parser',
 ]
@@ -0,0 +1,222 @@
+"""
+Health Monitor
+Probes internet connectivity and LLM providers in the background and caches the results.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Callable
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+from item_assistant.llm.local_llm import get_local_llm
+from item_assistant.llm.online_llm import get_online_llm
+from item_assistant.utils.http_pool import get_http_session
+
+logger = get_logger()
+
+# Authenticated model listings: they prove the key and endpoint work without spending tokens
+_PROVIDER_PROBES = {
+    "groq": ("https://api.groq.com/openai/v1/models", "Authorization", "Bearer {}"),
+    "gemini": ("https://generativelanguage.googleapis.com/v1beta/models?pageSize=1", "x-goog-api-key", "{}"),
+}
+
+
+class HealthMonitor:
+    """Keeps a cached, periodically refreshed view of provider health"""
+    
+    def __init__(self):
+        """Initialize health monitor"""
+        self.config = get_config()
+        self.local_llm = get_local_llm()
+        self.online_llm = get_online_llm()
+        self.session = get_http_session()
+        
+        self.probe_interval = self.config.get("llm.health.probe_interval_seconds", 30)
+        self.ttl = self.config.get("llm.health.ttl_seconds", 60)
+        self.connectivity_url = self.config.get(
+            "network.connectivity_check_url", "https://www.google.com/generate_204"
+        )
+        
+        # name -> probe function returning (available, detail)
+        self.probes: Dict[str, Callable[[], tuple]] = {
+            "internet": self._probe_internet,
+            "local": self._probe_local,
+            "online": self._probe_online,
+        }
+        
+        # name -> {"available", "checked_at", "latency_ms", "detail"}
+        self.status: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+        
+        logger.info(f"[HEALTH] Health monitor initialized (interval: {self.probe_interval}s, ttl: {self.ttl}s)")
+    
+    def _probe_internet(self) -> tuple:
+        """Check internet connectivity"""
+        self.session.head(self.connectivity_url, timeout=3)
+        return True, None
+    
+    def _probe_local(self) -> tuple:
+        """Check Ollama and record which models are installed"""
+        response = self.session.get(f"{self.local_llm.base_url}/api/tags", timeout=5)
+        if response.status_code != 200:
+            return False, f"HTTP {response.status_code}"
+        models = [model['name'] for model in response.json().get('models', [])]
+        return True, {"models": models}
+    
+    def _probe_provider(self, provider: str) -> Optional[str]:
+        """
+        List a provider's models through the pooled session
+        
+        Args:
+            provider: Provider name ("groq" or "gemini")
+        
+        Returns:
+            None if the provider answered, otherwise the reason it failed
+        """
+        api_key = self.config.get(f"llm.online.{provider}.api_key")
+        if provider not in _PROVIDER_PROBES or not api_key:
+            return "not configured"
+        url, header, value = _PROVIDER_PROBES[provider]
+        try:
+            response = self.session.get(url, headers={header: value.format(api_key)}, timeout=5)
+        except Exception as e:
+            return str(e)
+        if response.status_code != 200:
+            return f"HTTP {response.status_code}"
+        return None
+    
+    def _probe_online(self) -> tuple:
+        """Check that the primary online provider (else the fallback) answers"""
+        if not self.online_llm.is_available():
+            return False, "No online provider configured"
+        internet = self.get("internet")
+        if internet and not internet["available"]:
+            return False, "No internet"
+        
+        errors = {}
+        for provider in dict.fromkeys([self.online_llm.primary, self.online_llm.fallback]):
+            if not self.config.get(f"llm.online.{provider}.enabled", False):
+                continue
+            error = self._probe_provider(provider)
+            if error is None:
+                return True, {"primary": self.online_llm.primary, "provider": provider}
+            errors[provider] = error
+        return False, errors or "No online provider enabled"
+    
+    def _run_probe(self, name: str):
+        """Run a single probe and store its result"""
+        started = time.time()
+        try:
+            available, detail = self.probes[name]()
+        except Exception as e:
+            available, detail = False, str(e)
+        latency_ms = (time.time() - started) * 1000
+        
+        with self.lock:
+            previous = self.status.get(name)
+            self.status[name] = {
+                "available": available,
+                "checked_at": time.time(),
+                "latency_ms": round(latency_ms, 1),
+                "detail": detail,
+            }
+        
+        if previous is None or previous["available"] != available:
+            logger.info(f"[HEALTH] {name}: {'OK' if available else 'UNAVAILABLE'} ({latency_ms:.0f}ms)")
+    
+    def refresh_all(self):
+        """Probe everything now (internet first, online depends on it)"""
+        for name in self.probes:
+            self._run_probe(name)
+    
+    def start(self):
+        """Start background probing"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="health-monitor", daemon=True)
+        self.thread.start()
+        logger.info("[HEALTH] Background probing started")
+    
+    def stop(self):
+        """Stop background probing"""
+        self.running = False
+        self.wakeup.set()
+    
+    def _loop(self):
+        """Background probe loop"""
+        while self.running:
+            self.wakeup.wait(self.probe_interval)
+            self.wakeup.clear()
+            if self.running:
+                self.refresh_all()
+    
+    def request_refresh(self):
+        """Ask the background loop to re-probe as soon as possible"""
+        self.wakeup.set()
+    
+    def get(self, name: str) -> Optional[Dict]:
+        """
+        Get the cached status for a probe
+        
+        Args:
+            name: Probe name ("internet", "local", "online")
+        
+        Returns:
+            Status dict or None if never probed
+        """
+        with self.lock:
+            entry = self.status.get(name)
+            return dict(entry) if entry else None
+    
+    def is_available(self, name: str) -> bool:
+        """
+        Cached availability lookup (never blocks on the network)
+        
+        Stale entries are still returned, but trigger a background refresh.
+        
+        Args:
+            name: Probe name ("internet", "local", "online")
+        
+        Returns:
+            Last known availability (False if never probed)
+        """
+        entry = self.get(name)
+        if entry is None:
+            self.request_refresh()
+            return False
+        if time.time() - entry["checked_at"] > self.ttl:
+            self.request_refresh()
+        return entry["available"]
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Get all cached statuses
+        
+        Returns:
+            Dictionary of probe name to status dict
+        """
+        now = time.time()
+        with self.lock:
+            result = {}
+            for name, entry in self.status.items():
+                result[name] = dict(entry)
+                result[name]["age_seconds"] = round(now - entry["checked_at"], 1)
+                result[name]["stale"] = now - entry["checked_at"] > self.ttl
+            return result
+
+
+# Global health monitor instance
+_health_monitor_instance = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Get the global health monitor instance"""
+    global _health_monitor_instance
+    if _health_monitor_instance is None:
+        _health_monitor_instance = HealthMonitor()
+    return _health_monitor_instance
@@ -0,0 +1,226 @@
+"""
+Intent Cache
+LRU + on-disk cache of parsed intents keyed on normalized command text.
+Intents with entities are only reused for the exact spelling they were parsed from.
+"""
+
+import atexit
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+
+logger = get_logger()
+
+# Bump when the shape of cached intents changes
+CACHE_SCHEMA_VERSION = 2
+
+
+def normalize_command(command: str) -> str:
+    """
+    Normalize command text for cache lookups
+    
+    Args:
+        command: Raw command text
+    
+    Returns:
+        Lowercased command with punctuation dropped and whitespace collapsed
+    """
+    text = command.lower().strip()
+    text = re.sub(r"[^\w\s']", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def exact_command(command: str) -> str:
+    """
+    Command text as given, for comparisons where spelling matters
+    
+    Args:
+        command: Raw command text
+    
+    Returns:
+        Command with whitespace collapsed; case and punctuation are kept
+    """
+    return " ".join(command.split())
+
+
+class IntentCache:
+    """Maps normalized commands to previously parsed intents"""
+    
+    def __init__(self, fingerprint_source: str):
+        """
+        Initialize intent cache
+        
+        Args:
+            fingerprint_source: Text identifying the intent schema and model
+                (e.g. system prompt + model name); cached entries are dropped
+                whenever it changes
+        """
+        self.config = get_config()
+        self.enabled = self.config.get("llm.intent.cache.enabled", True)
+        self.max_entries = self.config.get("llm.intent.cache.max_entries", 1000)
+        self.ttl = self.config.get("llm.intent.cache.ttl_hours", 168) * 3600
+        self.flush_interval = self.config.get("llm.intent.cache.flush_interval_seconds", 30)
+        
+        data_dir = Path(self.config.get("system.data_directory", "."))
+        self.cache_file = data_dir / self.config.get("llm.intent.cache.file", "intent_cache.json")
+        
+        self.fingerprint = hashlib.sha1(
+            f"{CACHE_SCHEMA_VERSION}:{fingerprint_source}".encode("utf-8")
+        ).hexdigest()
+        
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.last_flush = time.time()
+        
+        if self.enabled:
+            self._load()
+            atexit.register(self.flush)
+        
+        logger.info(f"Intent cache initialized ({len(self.entries)} entries, enabled: {self.enabled})")
+    
+    def _load(self):
+        """Load cached intents from disk, discarding them if the fingerprint changed"""
+        if not self.cache_file.exists():
+            return
+        
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading intent cache: {e}")
+            return
+        
+        if data.get("fingerprint") != self.fingerprint:
+            logger.info("Intent schema or model changed, discarding cached intents")
+            self.dirty = True
+            return
+        
+        now = time.time()
+        for key, entry in data.get("entries", {}).items():
+            if now - entry.get("created_at", 0) <= self.ttl:
+                self.entries[key] = entry
+    
+    def flush(self):
+        """Write the cache to disk if it changed"""
+        if not self.enabled:
+            return
+        
+        with self.flush_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                data = {"fingerprint": self.fingerprint, "entries": dict(self.entries)}
+                self.dirty = False
+                self.last_flush = time.time()
+            
+            try:
+                # Write to a temp file first so a crash never leaves a truncated cache
+                tmp_file = self.cache_file.with_suffix(".tmp")
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                tmp_file.replace(self.cache_file)
+            except Exception as e:
+                logger.error(f"Error saving intent cache: {e}")
+    
+    def get(self, command: str) -> Optional[Dict]:
+        """
+        Look up a cached intent
+        
+        Args:
+            command: Raw command text
+        
+        Returns:
+            Copy of the cached intent, or None on a miss (including an
+            intent with entities parsed from a different spelling, e.g.
+            "run ls -la" vs "run ls la")
+        """
+        if not self.enabled:
+            return None
+        
+        key = normalize_command(command)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            if time.time() - entry["created_at"] > self.ttl:
+                del self.entries[key]
+                self.dirty = True
+                self.misses += 1
+                return None
+            
+            # Entities are copied out of the text, so they only fit the spelling they came from
+            if entry["intent"].get("entities") and entry.get("command") != exact_command(command):
+                self.misses += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry["intent"])
+    
+    def put(self, command: str, intent: Dict):
+        """
+        Cache a parsed intent
+        
+        Args:
+            command: Raw command text
+            intent: Parsed intent dict
+        """
+        if not self.enabled:
+            return
+        
+        key = normalize_command(command)
+        with self.lock:
+            self.entries[key] = {
+                "intent": copy.deepcopy(intent),
+                "command": exact_command(command),
+                "created_at": time.time()
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.dirty = True
+            due = time.time() - self.last_flush >= self.flush_interval
+        
+        if due:
+            self.flush()
+    
+    def invalidate(self):
+        """Drop all cached intents"""
+        with self.lock:
+            self.entries.clear()
+            self.dirty = True
+        self.flush()
+        logger.info("Intent cache invalidated")
+    
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with size, hits, misses and hit rate
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
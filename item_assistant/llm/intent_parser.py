@@ -4,39 +4,21 @@ Converts natural language commands to structured intents.
 """
 
 import re
+import copy
 import json
-from typing import Dict, Optional, List
+import asyncio
+from typing import Dict, Optional, List, Callable
 
 from item_assistant.config import get_config
 from item_assistant.logging import get_logger
 from item_assistant.llm.llm_router import get_llm_router
+from item_assistant.llm.intent_cache import IntentCache, exact_command
 
 logger = get_logger()
 
 
-class IntentParser:
-    """Parses natural language into structured intents"""
-    
-    def __init__(self):
-        """Initialize intent parser"""
-        self.config = get_config()
-        self.llm_router = get_llm_router()
-        logger.info("Intent parser initialized")
-    
-    def parse(self, command: str) -> Dict:
-        """
-        Parse command into structured intent
-        
-        Args:
-            command: Natural language command
-        
-        Returns:
-            Dictionary with intent, entities, and parameters
-        """
-        logger.info(f"[INTENT] Starting intent parsing for: '{command}'")
-        
-        # Use LLM to parse intent (always use local for speed)
-        system_prompt = """You are an intent parser. Convert user commands into structured JSON.
+# System prompt for LLM-based intent parsing
+INTENT_SYSTEM_PROMPT = """You are an intent parser. Convert user commands into structured JSON.
 
 Output format:
 {
@@ -72,21 +54,351 @@ User: "Search for Python tutorials"
 User: "What time is it?"
 {"intent": "get_time", "entities": {}, "confidence": 1.0}"""
 
-        prompt = f"User: {command}\nJSON:"
+
+class IntentRule:
+    """A precompiled keyword rule mapping a command to an intent"""
+    
+    def __init__(self, intent: str, pattern: str, confidence: float,
+                 entity: Optional[str] = None, strip: Optional[str] = None,
+                 max_words: Optional[int] = None, anchor: Optional[str] = None,
+                 build: Optional[Callable[[str, str], Dict]] = None):
+        """
+        Initialize rule
+        
+        Args:
+            intent: Intent produced when the rule matches
+            pattern: Regex searched in the lowercased command
+            confidence: Confidence for an unambiguous match
+            entity: Entity name filled with the command minus the trigger words
+            strip: Regex removed from the command to extract the entity
+            max_words: Entity length beyond which the match is treated as ambiguous
+            anchor: Imperative phrasing the command must start with for the
+                full confidence; a keyword found elsewhere ("who founded
+                youtube") scores below the fast-path threshold
+            build: Custom entity builder taking (command_lower, command)
+        """
+        self.intent = intent
+        self.pattern = re.compile(pattern)
+        self.confidence = confidence
+        self.entity = entity
+        self.strip = re.compile(strip) if strip else None
+        self.max_words = max_words
+        self.anchor = re.compile(anchor) if anchor else None
+        self.build = build
+    
+    def matches(self, command_lower: str) -> bool:
+        """Check whether the rule's trigger appears in the command"""
+        return self.pattern.search(command_lower) is not None
+    
+    def apply(self, command_lower: str, command: str) -> Dict:
+        """
+        Build the intent for a matching command
+        
+        Args:
+            command_lower: Lowercased, stripped command
+            command: Original command
+        
+        Returns:
+            Intent dict with a confidence adjusted for how clean the match is
+        """
+        confidence = self.confidence
+        if self.anchor and not self.anchor.match(command_lower):
+            confidence -= 0.3
+        
+        if self.build:
+            entities = self.build(command_lower, command)
+        elif self.entity:
+            value = self.strip.sub('', command_lower).strip()
+            entities = {self.entity: value}
+            # An empty or rambling entity means the keyword was probably incidental
+            if not value:
+                confidence -= 0.4
+            elif self.max_words and len(value.split()) > self.max_words:
+                confidence -= 0.2
+        else:
+            entities = {}
+        
+        return {
+            "intent": self.intent,
+            "entities": entities,
+            "confidence": round(confidence, 2)
+        }
+
+
+# Rule table, evaluated in order (first match wins). Compiled once at import.
+INTENT_RULES: List[IntentRule] = [
+    # RESTART / SHUTDOWN - only whole-machine phrasings, so "restart chrome"
+    # or "turn off the lights" never power off the computer
+    IntentRule("system_restart",
+               r'^(please\s+)?(restart|reboot)(\s+(the\s+|my\s+)?(computer|pc|laptop|system))?\W*$', 0.9),
+    IntentRule("system_shutdown",
+               r'^(please\s+)?(shutdown|shut down|turn off|power off)(\s+(the\s+|my\s+)?(computer|pc|laptop|system))?\W*$', 0.9),
+    # OPEN/LAUNCH/START APP
+    IntentRule("open_app", r'\b(open|launch|start|run)\b', 0.85,
+               entity="app_name", strip=r'\b(open|launch|start|run)\b\s*', max_words=3),
+    # CLOSE/QUIT/EXIT APP - "close the door" or "quit smoking" go to the LLM
+    IntentRule("close_app", r'\b(close|quit|exit|shut down|kill)\b', 0.85,
+               entity="app_name", strip=r'\b(close|quit|exit|shut down|kill)\b\s*', max_words=3,
+               anchor=r'(please\s+)?(close|quit|exit|kill|shut\s+down)\s+(?!(the|my|a|an|this|that|smoking)\b)\w'),
+    # SEARCH WEB - only as a leading command ("search for X", "google X")
+    IntentRule("search_web", r'\b(search|google|look up|find|look for)\b', 0.85,
+               entity="query", strip=r'^(please\s+)?(search|google|look up|find|look for)\b\s*(for\s+)?',
+               max_words=8, anchor=r'(please\s+)?(search|google|look\s+up|look\s+for)\b'),
+    # GET TIME
+    IntentRule("get_time", r'\b(what time|tell me the time|current time|what\'s the time|time is it)\b', 0.95),
+    # OPEN URL / VISIT
+    IntentRule("open_url", r'\b(open url|visit|go to|navigate to)\b', 0.8,
+               entity="url", strip=r'\b(open url|visit|go to|navigate to)\b\s*', max_words=3),
+    # LOCK COMPUTER - whole-machine phrasings only, so "lock the door" or
+    # "lock a cell in excel" go to the LLM instead of locking the PC
+    IntentRule("system_lock",
+               r'^(please\s+)?lock(\s+(the\s+|my\s+)?(computer|pc|laptop|screen|system))?\W*$', 0.9),
+    # MUTE / UNMUTE VOLUME
+    IntentRule("unmute_volume", r'\bunmute\b', 0.85),
+    IntentRule("mute_volume", r'\bmute\b', 0.85,
+               anchor=r'(please\s+)?mute\b'),
+    # YOUTUBE
+    IntentRule("navigate_youtube", r'\b(youtube|youtube\.com)\b', 0.8,
+               anchor=r'(please\s+)?((go|navigate)\s+to\s+|open\s+)?youtube(\.com)?\W*$'),
+    # TYPE TEXT
+    IntentRule("type_text", r'\b(type|write|enter)\b', 0.75,
+               entity="text", strip=r'\b(type|write|enter)\b\s*'),
+    # CLICK
+    IntentRule("click", r'\b(click|press)\b', 0.7,
+               entity="target", strip=r'\b(click|press)\b\s*(on\s+)?'),
+    # GENERATE CODE
+    IntentRule("generate_code", r'\b(generate|write|create)\s+(code|script|program)\b', 0.75,
+               build=lambda command_lower, command: {"prompt": command}),
+    # EXPLAIN CODE
+    IntentRule("explain_code", r'\b(explain|understand|what does|how does)\b.*\b(code|script|function)\b', 0.7,
+               build=lambda command_lower, command: {"prompt": command}),
+    # GET WEATHER
+    IntentRule("get_weather", r'\b(weather|temperature|forecast|rain|snow)\b', 0.8,
+               anchor=r"(please\s+)?((what's|what\s+is|how's|how\s+is)\s+the\s+(weather|forecast)"
+                      r"|(tell\s+me|show\s+me|check|get)\s+the\s+(weather|forecast)"
+                      r"|(weather|forecast)\b"
+                      r"|(will|is)\s+it\s+(going\s+to\s+)?(rain|snow))"),
+]
+
+
+# Separators in compound commands. "then" marks an explicit ordering;
+# commas and semicolons only separate.
+THEN_SEPARATOR = re.compile(r'\s*(?:,\s*|\s+)(?:and\s+)?then\s+', re.IGNORECASE)
+LIST_SEPARATOR = re.compile(r'\s*[,;]\s*')
+
+
+def split_commands(command: str) -> List[Dict]:
+    """
+    Split a compound utterance into individual commands
+    
+    "open chrome, search cats, then mute" becomes three steps, the last one
+    ordered after the others. A comma only splits when the text after it
+    starts a recognizable command, so "search for cats, dogs" stays whole.
+    
+    Args:
+        command: Natural language command
+    
+    Returns:
+        List of {"text", "after_then"} dicts (a single step if nothing splits)
+    """
+    steps = []
+    for index, chunk in enumerate(THEN_SEPARATOR.split(command.strip())):
+        pieces = [p for p in LIST_SEPARATOR.split(chunk) if p]
+        merged: List[str] = []
+        for piece in pieces:
+            if merged and not any(rule.matches(piece.lower()) for rule in INTENT_RULES):
+                merged[-1] = f"{merged[-1]}, {piece}"
+            else:
+                merged.append(piece)
+        for position, text in enumerate(merged):
+            steps.append({"text": text, "after_then": index > 0 and position == 0})
+    
+    return steps or [{"text": command, "after_then": False}]
+
+
+class IntentParser:
+    """Parses natural language into structured intents"""
+    
+    def __init__(self):
+        """Initialize intent parser"""
+        self.config = get_config()
+        self.llm_router = get_llm_router()
+        
+        # Rule matches at or above this confidence skip the LLM entirely
+        self.rules_first = self.config.get("llm.intent.rules_first", True)
+        self.rule_threshold = self.config.get("llm.intent.rule_confidence_threshold", 0.8)
+        
+        # LLM-parsed intents are cached; a prompt or model change invalidates them
+        self.intent_model = self.llm_router.local_llm.general_model
+        self.cache = IntentCache(f"{self.intent_model}\n{INTENT_SYSTEM_PROMPT}")
+        # exact command -> future of an LLM parse in progress on the shared loop
+        # (other spellings may carry different entities, so they don't share it)
+        self.pending: Dict[str, asyncio.Future] = {}
+        
+        logger.info(f"Intent parser initialized (rules first: {self.rules_first}, threshold: {self.rule_threshold})")
+    
+    def parse(self, command: str) -> Dict:
+        """
+        Parse command into structured intent
+        
+        Tries the precompiled rule table first and only escalates to the LLM
+        when no rule matches confidently.
+        
+        Args:
+            command: Natural language command
+        
+        Returns:
+            Dictionary with intent, entities, and parameters
+        """
+        logger.info(f"[INTENT] Starting intent parsing for: '{command}'")
+        
+        rule_intent, resolved = self._parse_without_llm(command)
+        if resolved:
+            return resolved
         
         logger.info("[INTENT] Calling LLM router for intent parsing...")
         result = self.llm_router.generate(
-            prompt,
-            system=system_prompt,
+            f"User: {command}\nJSON:",
+            system=INTENT_SYSTEM_PROMPT,
             task_type="intent_parsing",
             max_tokens=256,
             temperature=0.3,
             force_local=True  # Always use local for quick parsing
         )
         
+        return self._interpret_llm_result(command, result, rule_intent)
+    
+    async def parse_async(self, command: str, speculative: bool = False) -> Dict:
+        """
+        Parse command into structured intent without blocking the event loop
+        
+        Args:
+            command: Natural language command
+            speculative: Parse of text that may still change (e.g. a streaming
+                STT partial); the result is shared with an identical parse
+                started meanwhile but never written to the intent cache
+        
+        Returns:
+            Dictionary with intent, entities, and parameters
+        """
+        logger.info(f"[INTENT] Starting intent parsing for: '{command}'")
+        
+        rule_intent, resolved = self._parse_without_llm(command)
+        if resolved:
+            return resolved
+        
+        # A speculative parse of the same text (e.g. started by streaming STT)
+        # may already be waiting on the LLM; share its answer
+        key = exact_command(command)
+        loop = asyncio.get_running_loop()
+        pending = self.pending.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            logger.info("[INTENT] Joining in-flight parse")
+            try:
+                intent, cacheable = await asyncio.shield(pending)
+                if cacheable and not speculative:
+                    # The speculation turned out to be the real command
+                    self.cache.put(command, intent)
+                return dict(copy.deepcopy(intent), raw_command=command)
+            except asyncio.CancelledError:
+                # Only the joined parse being abandoned is ours to recover from
+                if not pending.cancelled():
+                    raise
+            except Exception:
+                pass  # Parse it ourselves below
+        
+        future = loop.create_future()
+        self.pending[key] = future
+        try:
+            logger.info("[INTENT] Calling LLM router for intent parsing (async)...")
+            result = await self.llm_router.generate_async(
+                f"User: {command}\nJSON:",
+                system=INTENT_SYSTEM_PROMPT,
+                task_type="intent_parsing",
+                max_tokens=256,
+                temperature=0.3,
+                force_local=True  # Always use local for quick parsing
+            )
+            intent = self._interpret_llm_result(command, result, rule_intent, cache=not speculative)
+            cacheable = (intent.get("source") == "llm" and bool(intent.get("intent"))
+                         and not result.get("fallback"))
+            future.set_result((copy.deepcopy(intent), cacheable))
+            return intent
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            if self.pending.get(key) is future:
+                del self.pending[key]
+    
+    async def parse_multi_async(self, command: str) -> List[Dict]:
+        """
+        Parse a possibly compound command into one intent per step
+        
+        Steps are parsed concurrently. Each intent carries "step" (its
+        position) and "after_then" (True if the user explicitly ordered it
+        after the previous step).
+        
+        Args:
+            command: Natural language command
+        
+        Returns:
+            List of intent dicts, in utterance order
+        """
+        steps = split_commands(command)
+        if len(steps) > 1:
+            logger.info(f"[INTENT] Split into {len(steps)} steps: {[step['text'] for step in steps]}")
+        
+        intents = await asyncio.gather(*(self.parse_async(step["text"]) for step in steps))
+        for index, (step, intent) in enumerate(zip(steps, intents)):
+            intent["step"] = index
+            intent["after_then"] = step["after_then"]
+        return list(intents)
+    
+    def _parse_without_llm(self, command: str) -> tuple:
+        """
+        Resolve a command from the rule table or the intent cache
+        
+        Args:
+            command: Natural language command
+        
+        Returns:
+            Tuple of (rule match or None, resolved intent or None)
+        """
+        rule_intent = self.match_rules(command)
+        
+        if (self.rules_first and rule_intent
+                and rule_intent["confidence"] >= self.rule_threshold):
+            rule_intent["source"] = "rules"
+            logger.info(f"[INTENT] Rule fast path: {rule_intent['intent']} (confidence: {rule_intent['confidence']})")
+            return rule_intent, rule_intent
+        
+        cached = self.cache.get(command)
+        if cached:
+            cached["raw_command"] = command
+            cached["source"] = "cache"
+            logger.info(f"[INTENT] Cache hit: {cached.get('intent')}")
+            return rule_intent, cached
+        
+        return rule_intent, None
+    
+    def _interpret_llm_result(self, command: str, result: Dict,
+                              rule_intent: Optional[Dict], cache: bool = True) -> Dict:
+        """
+        Turn an LLM response into an intent, falling back to rules on failure
+        
+        Args:
+            command: Natural language command
+            result: LLM router result
+            rule_intent: Rule match computed before calling the LLM
+            cache: Whether a successful parse goes into the intent cache
+        
+        Returns:
+            Parsed intent dict
+        """
         if not result.get("success"):
             logger.warning(f"[INTENT] LLM parsing failed: {result.get('error')}, using fallback")
-            return self._fallback_parse(command)
+            return self._fallback_parse(command, rule_intent)
         
         # Extract JSON from response
         try:
@@ -98,193 +410,66 @@ User: "What time is it?"
             if json_match:
                 intent_data = json.loads(json_match.group())
                 intent_data["raw_command"] = command
+                intent_data["source"] = "llm"
                 logger.info(f"[INTENT] Parsed intent: {intent_data.get('intent')} (confidence: {intent_data.get('confidence')})")
+                if cache and intent_data.get("intent") and not result.get("fallback"):
+                    self.cache.put(command, intent_data)
                 return intent_data
             else:
                 logger.warning(f"[INTENT] No JSON found in LLM response, using fallback")
-                return self._fallback_parse(command)
+                return self._fallback_parse(command, rule_intent)
         
         except json.JSONDecodeError as e:
             logger.warning(f"[INTENT] JSON parsing failed: {e}, using fallback")
-            return self._fallback_parse(command)
+            return self._fallback_parse(command, rule_intent)
+    
+    def match_rules(self, command: str) -> Optional[Dict]:
+        """
+        Match a command against the precompiled rule table
+        
+        The first matching rule wins; if further rules also match, the
+        command is ambiguous and the confidence is lowered.
+        
+        Args:
+            command: User command
+        
+        Returns:
+            Intent dict with confidence, or None if no rule matches
+        """
+        command_lower = command.lower().strip()
+        matched = [rule for rule in INTENT_RULES if rule.matches(command_lower)]
+        
+        if not matched:
+            return None
+        
+        intent = matched[0].apply(command_lower, command)
+        if len(matched) > 1:
+            intent["confidence"] = round(intent["confidence"] - 0.1, 2)
+        intent["raw_command"] = command
+        
+        logger.info(f"[INTENT] Rule matched: {intent['intent']} {intent['entities']} (confidence: {intent['confidence']})")
+        return intent
     
-    def _fallback_parse(self, command: str) -> Dict:
+    def _fallback_parse(self, command: str, rule_intent: Optional[Dict] = None) -> Dict:
         """
         Fallback rule-based parsing when LLM fails
         Uses comprehensive keyword mapping for all supported intents
         
         Args:
             command: User command
+            rule_intent: Already computed rule match, if any
         
         Returns:
             Parsed intent dict
         """
-        command_lower = command.lower().strip()
         logger.info(f"[INTENT] Fallback parsing: '{command}'")
         
-        # Comprehensive keyword mappings for all intents
-        
-        # OPEN/LAUNCH/START APP
-        if re.search(r'\b(open|launch|start|run)\b', command_lower):
-            app_name = re.sub(r'\b(open|launch|start|run)\s+', '', command_lower).strip()
-            logger.info(f"[INTENT] Matched: open_app (app: {app_name})")
-            return {
-                "intent": "open_app",
-                "entities": {"app_name": app_name},
-                "confidence": 0.85,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # CLOSE/QUIT/EXIT APP
-        if re.search(r'\b(close|quit|exit|shut down|kill)\b', command_lower):
-            app_name = re.sub(r'\b(close|quit|exit|shut down|kill)\s+', '', command_lower).strip()
-            logger.info(f"[INTENT] Matched: close_app (app: {app_name})")
-            return {
-                "intent": "close_app",
-                "entities": {"app_name": app_name},
-                "confidence": 0.85,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # SEARCH WEB
-        if re.search(r'\b(search|google|look up|find|look for)\b', command_lower):
-            query = re.sub(r'\b(search|google|look up|find|look for)\s+(for\s+)?', '', command_lower).strip()
-            logger.info(f"[INTENT] Matched: search_web (query: {query})")
-            return {
-                "intent": "search_web",
-                "entities": {"query": query},
-                "confidence": 0.85,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # GET TIME
-        if re.search(r'\b(what time|tell me the time|current time|what\'s the time|time is it)\b', command_lower):
-            logger.info("[INTENT] Matched: get_time")
-            return {
-                "intent": "get_time",
-                "entities": {},
-                "confidence": 0.95,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # OPEN URL / VISIT
-        if re.search(r'\b(open url|visit|go to|navigate to)\b', command_lower):
-            url = re.sub(r'\b(open url|visit|go to|navigate to)\s+', '', command_lower).strip()
-            logger.info(f"[INTENT] Matched: open_url (url: {url})")
-            return {
-                "intent": "open_url",
-                "entities": {"url": url},
-                "confidence": 0.8,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # LOCK COMPUTER
-        if re.search(r'\b(lock|lock computer|lock screen)\b', command_lower):
-            logger.info("[INTENT] Matched: system_lock")
-            return {
-                "intent": "system_lock",
-                "entities": {},
-                "confidence": 0.9,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # SHUTDOWN / TURN OFF
-        if re.search(r'\b(shutdown|shut down|turn off|power off|restart|reboot)\b', command_lower):
-            action = "restart" if "restart" in command_lower or "reboot" in command_lower else "shutdown"
-            logger.info(f"[INTENT] Matched: system_shutdown (action: {action})")
-            return {
-                "intent": "system_shutdown",
-                "entities": {"action": action},
-                "confidence": 0.9,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # MUTE / UNMUTE VOLUME
-        if re.search(r'\b(mute|unmute|silence|quiet)\b', command_lower):
-            action = "unmute" if "unmute" in command_lower else "mute"
-            logger.info(f"[INTENT] Matched: volume_control (action: {action})")
-            return {
-                "intent": "volume_control",
-                "entities": {"action": action},
-                "confidence": 0.85,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # YOUTUBE
-        if re.search(r'\b(youtube|youtube\.com)\b', command_lower):
-            logger.info("[INTENT] Matched: navigate_youtube")
-            return {
-                "intent": "navigate_youtube",
-                "entities": {},
-                "confidence": 0.8,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # TYPE TEXT
-        if re.search(r'\b(type|write|enter)\b', command_lower):
-            text = re.sub(r'\b(type|write|enter)\s+', '', command_lower).strip()
-            logger.info(f"[INTENT] Matched: type_text (text: {text})")
-            return {
-                "intent": "type_text",
-                "entities": {"text": text},
-                "confidence": 0.75,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # CLICK
-        if re.search(r'\b(click|press)\b', command_lower):
-            target = re.sub(r'\b(click|press)\s+(on\s+)?', '', command_lower).strip()
-            logger.info(f"[INTENT] Matched: click (target: {target})")
-            return {
-                "intent": "click",
-                "entities": {"target": target},
-                "confidence": 0.7,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # GENERATE CODE
-        if re.search(r'\b(generate|write|create)\s+(code|script|program)\b', command_lower):
-            logger.info("[INTENT] Matched: generate_code")
-            return {
-                "intent": "generate_code",
-                "entities": {"prompt": command},
-                "confidence": 0.75,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # EXPLAIN CODE
-        if re.search(r'\b(explain|understand|what does|how does)\b.*\b(code|script|function)\b', command_lower):
-            logger.info("[INTENT] Matched: explain_code")
-            return {
-                "intent": "explain_code",
-                "entities": {"prompt": command},
-                "confidence": 0.7,
-                "raw_command": command,
-                "fallback": True
-            }
-        
-        # GET WEATHER
-        if re.search(r'\b(weather|temperature|forecast|rain|snow)\b', command_lower):
-            logger.info("[INTENT] Matched: get_weather")
-            return {
-                "intent": "get_weather",
-                "entities": {},
-                "confidence": 0.8,
-                "raw_command": command,
-                "fallback": True
-            }
+        if rule_intent is None:
+            rule_intent = self.match_rules(command)
+        
+        if rule_intent:
+            rule_intent["fallback"] = True
+            return rule_intent
         
         # Default to general query
         logger.info("[INTENT] No specific match, using general_query")
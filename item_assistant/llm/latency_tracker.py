@@ -0,0 +1,245 @@
+"""
+Latency Tracker
+Rolling per-provider latency and error statistics used for adaptive routing.
+"""
+
+import atexit
+import json
+import random
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+
+logger = get_logger()
+
+# Bump when the on-disk sample format changes
+STATS_SCHEMA_VERSION = 1
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class LatencyTracker:
+    """Keeps a window of recent call samples per (provider, model, task_type)"""
+    
+    def __init__(self):
+        """Initialize latency tracker"""
+        self.config = get_config()
+        self.enabled = self.config.get("llm.routing.adaptive.enabled", True)
+        self.window = self.config.get("llm.routing.adaptive.window", 50)
+        self.min_samples = self.config.get("llm.routing.adaptive.min_samples", 5)
+        self.stale_after = self.config.get("llm.routing.adaptive.stale_after_minutes", 30) * 60
+        self.max_age = self.config.get("llm.routing.adaptive.max_age_hours", 24) * 3600
+        self.exploration_rate = self.config.get("llm.routing.adaptive.exploration_rate", 0.05)
+        self.stale_exploration_rate = self.config.get("llm.routing.adaptive.stale_exploration_rate", 0.05)
+        self.error_penalty_ms = self.config.get("llm.routing.adaptive.error_penalty_ms", 3000)
+        self.flush_interval = self.config.get("llm.routing.adaptive.flush_interval_seconds", 60)
+        
+        data_dir = Path(self.config.get("system.data_directory", "."))
+        self.stats_file = data_dir / self.config.get("llm.routing.adaptive.file", "latency_stats.json")
+        
+        # (provider, model, task_type) -> deque of (timestamp, latency_ms, success)
+        self.samples: Dict[Tuple[str, str, str], Deque[Tuple[float, float, bool]]] = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.dirty = False
+        self.last_flush = time.time()
+        
+        if self.enabled:
+            self._load()
+            atexit.register(self.flush)
+        
+        logger.info(f"Latency tracker initialized ({len(self.samples)} series, enabled: {self.enabled})")
+    
+    def _load(self):
+        """Load recent samples from disk"""
+        if not self.stats_file.exists():
+            return
+        
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading latency stats: {e}")
+            return
+        
+        if data.get("version") != STATS_SCHEMA_VERSION:
+            return
+        
+        cutoff = time.time() - self.max_age
+        for key, rows in data.get("series", {}).items():
+            provider, model, task_type = key.split("|", 2)
+            fresh = [(ts, ms, bool(ok)) for ts, ms, ok in rows if ts >= cutoff]
+            if fresh:
+                self.samples[(provider, model, task_type)] = deque(fresh, maxlen=self.window)
+    
+    def flush(self):
+        """Write samples to disk if they changed"""
+        if not self.enabled:
+            return
+        
+        with self.flush_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                data = {
+                    "version": STATS_SCHEMA_VERSION,
+                    "series": {"|".join(key): list(rows) for key, rows in self.samples.items()}
+                }
+                self.dirty = False
+                self.last_flush = time.time()
+            
+            try:
+                tmp_file = self.stats_file.with_suffix(".tmp")
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                tmp_file.replace(self.stats_file)
+            except Exception as e:
+                logger.error(f"Error saving latency stats: {e}")
+    
+    def record(self, provider: str, model: str, task_type: Optional[str],
+               latency_ms: float, success: bool):
+        """
+        Record one completed call
+        
+        Args:
+            provider: Provider name ("local", "groq", "gemini")
+            model: Model name
+            task_type: Task type the call was routed for
+            latency_ms: Wall-clock time of the call
+            success: Whether the call succeeded
+        """
+        if not self.enabled:
+            return
+        
+        key = (provider, model or "unknown", task_type or "default")
+        with self.lock:
+            series = self.samples.get(key)
+            if series is None:
+                series = self.samples[key] = deque(maxlen=self.window)
+            series.append((time.time(), round(latency_ms, 1), success))
+            self.dirty = True
+            due = time.time() - self.last_flush >= self.flush_interval
+        
+        if due:
+            self.flush()
+    
+    def summary(self, side: str, task_type: Optional[str]) -> Optional[Dict]:
+        """
+        Aggregate recent samples for one side of the router
+        
+        Args:
+            side: "local" (Ollama) or "online" (any hosted provider)
+            task_type: Task type
+        
+        Returns:
+            Dict with count, p50_ms, p95_ms, error_rate, age_seconds and
+            expected_ms, or None if there are no samples
+        """
+        task_type = task_type or "default"
+        cutoff = time.time() - self.max_age
+        with self.lock:
+            rows = [
+                row
+                for (provider, _, task), series in self.samples.items()
+                if task == task_type and (provider == "local") == (side == "local")
+                for row in series
+                if row[0] >= cutoff
+            ]
+        if not rows:
+            return None
+        
+        latencies = sorted(ms for _, ms, _ in rows)
+        error_rate = sum(1 for _, _, ok in rows if not ok) / len(rows)
+        p50 = _percentile(latencies, 0.5)
+        return {
+            "count": len(rows),
+            "p50_ms": p50,
+            "p95_ms": _percentile(latencies, 0.95),
+            "error_rate": round(error_rate, 3),
+            "age_seconds": round(time.time() - max(ts for ts, _, _ in rows), 1),
+            # A failure costs roughly a fallback round trip on top of the wait
+            "expected_ms": round(p50 + error_rate * self.error_penalty_ms, 1)
+        }
+    
+    def _is_fresh(self, summary: Optional[Dict]) -> bool:
+        """Check whether a summary has enough recent samples to be trusted"""
+        return (summary is not None and summary["count"] >= self.min_samples
+                and summary["age_seconds"] <= self.stale_after)
+    
+    def choose(self, task_type: Optional[str], default: str) -> str:
+        """
+        Pick the side with the lowest expected latency
+        
+        Falls back to the static default until both sides have fresh
+        statistics, and occasionally tries the other side so its numbers
+        don't go stale.
+        
+        Args:
+            task_type: Task type
+            default: Side the static routing rules would pick
+        
+        Returns:
+            "local" or "online"
+        """
+        if not self.enabled:
+            return default
+        
+        stats = {side: self.summary(side, task_type) for side in ("local", "online")}
+        
+        if all(self._is_fresh(s) for s in stats.values()):
+            best = min(stats, key=lambda side: stats[side]["expected_ms"])
+        else:
+            best = default
+        
+        # Explore harder while the other side's numbers are missing or old
+        other = "online" if best == "local" else "local"
+        rate = self.exploration_rate if self._is_fresh(stats[other]) else self.stale_exploration_rate
+        if random.random() < rate:
+            logger.info(f"[LLM] Exploring {other} for '{task_type}'")
+            return other
+        
+        if best != default:
+            logger.info(f"[LLM] Adaptive routing: {best} for '{task_type}' "
+                        f"({stats[best]['expected_ms']:.0f}ms vs {stats[other]['expected_ms']:.0f}ms expected)")
+        return best
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Get per-series statistics
+        
+        Returns:
+            Dictionary of "provider|model|task_type" to count, p50/p95 and error rate
+        """
+        with self.lock:
+            series = {key: list(rows) for key, rows in self.samples.items()}
+        
+        result = {}
+        for key, rows in series.items():
+            latencies = sorted(ms for _, ms, _ in rows)
+            result["|".join(key)] = {
+                "count": len(rows),
+                "p50_ms": _percentile(latencies, 0.5),
+                "p95_ms": _percentile(latencies, 0.95),
+                "error_rate": round(sum(1 for _, _, ok in rows if not ok) / len(rows), 3)
+            }
+        return result
+
+
+# Global latency tracker instance
+_latency_tracker_instance = None
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Get the global latency tracker instance"""
+    global _latency_tracker_instance
+    if _latency_tracker_instance is None:
+        _latency_tracker_instance = LatencyTracker()
+    return _latency_tracker_instance
@@ -3,13 +3,18 @@ LLM Router
 Smart routing between local and online LLMs based on task complexity and internet availability.
 """
 
-import requests
-from typing import Dict, Optional, List
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, List, Callable, Awaitable
 
 from item_assistant.config import get_config
-from item_assistant.logging import get_logger
+from item_assistant.logging import get_logger, get_tracer
 from item_assistant.llm.local_llm import get_local_llm
 from item_assistant.llm.online_llm import get_online_llm
+from item_assistant.llm.health_monitor import get_health_monitor
+from item_assistant.llm.latency_tracker import get_latency_tracker
+from item_assistant.llm.model_manager import get_model_manager
 
 logger = get_logger()
 
@@ -27,6 +32,30 @@ class LLMRouter:
         self.default_mode = self.config.get("llm.routing.default_mode", "auto")
         self.online_tasks = self.config.get("llm.routing.use_online_for", [])
         self.local_tasks = self.config.get("llm.routing.use_local_for", [])
+        self.long_prompt_chars = self.config.get("llm.routing.long_prompt_chars", 2000)
+        
+        # Observed latency/error rates steer tasks that aren't pinned either way
+        self.latency_tracker = get_latency_tracker()
+        self.tracer = get_tracer()
+        
+        # Task types that fire at local and online concurrently (async paths only)
+        self.race_tasks = self.config.get("llm.routing.race_for", [])
+        self.race_min_samples = self.config.get("llm.routing.race_min_samples", 20)
+        self.race_dominance = self.config.get("llm.routing.race_dominance", 0.9)
+        self.race_reprobe_every = self.config.get("llm.routing.race_reprobe_every", 10)
+        
+        # session_id -> side ("local"/"online") that answered its last chat turn
+        self.chat_affinity: Dict[str, str] = {}
+        
+        # task_type -> {"local": wins, "online": wins, "calls": routed calls}
+        self.race_stats: Dict[str, Dict[str, int]] = {}
+        self.race_lock = threading.Lock()
+        
+        # Connectivity and provider health are probed in the background
+        self.health_monitor = get_health_monitor()
+        
+        # Keeps the local models loaded in Ollama
+        self.model_manager = get_model_manager()
         
         # Timeouts for LLM providers
         self.LOCAL_TIMEOUT = 2  # seconds
@@ -38,44 +67,36 @@ class LLMRouter:
         self._verify_llm_availability()
     
     def _verify_llm_availability(self):
-        """Verify LLM availability at startup"""
+        """Verify LLM availability at startup and start background health probes"""
         logger.info("[LLM] Verifying LLM availability...")
         
-        # Check local LLM
-        try:
-            logger.info("[LLM] Checking local LLM (Ollama)...")
-            if self.local_llm and self.local_llm.is_available():
-                logger.info("[LLM] Local LLM: OK")
-            else:
-                logger.warning("[LLM] Local LLM: Not available")
-        except Exception as e:
-            logger.warning(f"[LLM] Local LLM check failed: {e}")
-        
-        # Check online LLM
-        try:
-            logger.info("[LLM] Checking online LLM (Groq)...")
-            if self.online_llm and self.online_llm.is_available():
-                logger.info("[LLM] Online LLM: OK")
-            else:
-                logger.warning("[LLM] Online LLM: Not available")
-        except Exception as e:
-            logger.warning(f"[LLM] Online LLM check failed: {e}")
+        # Prime the health cache once so the first command has real data
+        self.health_monitor.refresh_all()
         
+        if self.health_monitor.is_available("local"):
+            logger.info("[LLM] Local LLM: OK")
+        else:
+            logger.warning("[LLM] Local LLM: Not available")
+        
+        if self.health_monitor.is_available("online"):
+            logger.info("[LLM] Online LLM: OK")
+        else:
+            logger.warning("[LLM] Online LLM: Not available")
+        
+        self.health_monitor.start()
+        
+        # Preloading runs in the background so startup isn't held up by model loads
+        self.model_manager.start()
         logger.info("[LLM] LLM availability check complete")
     
     def is_internet_available(self) -> bool:
         """
-        Check if internet is available
+        Check if internet is available (cached by the health monitor)
         
         Returns:
             True if internet is available
         """
-        try:
-            # Try to reach a reliable endpoint
-            requests.get("https://www.google.com", timeout=3)
-            return True
-        except:
-            return False
+        return self.health_monitor.is_available("internet")
     
     def should_use_online(self, task_type: Optional[str] = None,
                          prompt_length: int = 0) -> bool:
@@ -95,7 +116,7 @@ class LLMRouter:
         
         # If default mode is online, use online (if available)
         if self.default_mode == "online":
-            return self.is_internet_available() and self.online_llm.is_available()
+            return self.health_monitor.is_available("online")
         
         # Auto mode - smart routing
         
@@ -104,29 +125,88 @@ class LLMRouter:
             logger.info("No internet available, using local LLM")
             return False
         
-        # Online LLM not configured = always local
-        if not self.online_llm.is_available():
+        # Online LLM not configured or unreachable = always local
+        if not self.health_monitor.is_available("online"):
             logger.info("Online LLM not available, using local LLM")
             return False
         
-        # Check task type
-        if task_type:
-            if task_type in self.online_tasks:
-                logger.info(f"Task '{task_type}' configured for online LLM")
-                return True
-            
-            if task_type in self.local_tasks:
-                logger.info(f"Task '{task_type}' configured for local LLM")
-                return False
+        # Quality rules: these always go online when it is reachable
+        if task_type and task_type in self.online_tasks:
+            logger.info(f"Task '{task_type}' configured for online LLM")
+            return True
+        
+        # Pinned local tasks never move online, whatever the latency says
+        if task_type and task_type in self.local_tasks:
+            logger.info(f"Task '{task_type}' configured for local LLM")
+            return False
         
         # Check prompt length (long prompts -> online for better context)
-        if prompt_length > 2000:
+        if prompt_length > self.long_prompt_chars:
             logger.info(f"Long prompt ({prompt_length} chars), using online LLM")
             return True
         
-        # Default to local for quick tasks
-        logger.info("Using local LLM for quick task")
-        return False
+        # Everything else defaults to local, unless observed latency says
+        # online is currently faster (e.g. Ollama saturated)
+        return self.latency_tracker.choose(task_type, default="local") == "online"
+    
+    def _select_online(self, task_type: Optional[str], prompt_length: int,
+                       force_local: bool, force_online: bool) -> bool:
+        """Resolve force flags and routing rules into a local/online decision"""
+        if force_online:
+            logger.info("[LLM] Forced online mode")
+            return True
+        if force_local:
+            logger.info("[LLM] Forced local mode")
+            return False
+        return self.should_use_online(task_type, prompt_length)
+    
+    def _record_latency(self, side: str, task_type: Optional[str], result: Dict, started: float):
+        """Feed one provider call into the latency tracker"""
+        self.latency_tracker.record(
+            result.get("provider") or side,
+            result.get("model", ""),
+            task_type,
+            (time.time() - started) * 1000,
+            bool(result.get("success"))
+        )
+    
+    def _timed(self, side: str, task_type: Optional[str],
+               call: Callable[..., Dict], *args, **kwargs) -> Dict:
+        """Run a blocking provider call and record its latency"""
+        with self.tracer.span(f"llm.{side}", task_type=task_type or "default") as span:
+            started = time.time()
+            result = call(*args, **kwargs)
+            self._record_latency(side, task_type, result, started)
+            self._annotate_span(span, result)
+        return result
+    
+    async def _timed_async(self, side: str, task_type: Optional[str],
+                           call: Callable[..., Awaitable[Dict]], *args, **kwargs) -> Dict:
+        """Await a provider call and record its latency (cancelled calls are not recorded)"""
+        with self.tracer.span(f"llm.{side}", task_type=task_type or "default") as span:
+            started = time.time()
+            result = await call(*args, **kwargs)
+            self._record_latency(side, task_type, result, started)
+            self._annotate_span(span, result)
+        return result
+    
+    def _annotate_span(self, span, result: Dict):
+        """Copy provider, model and outcome onto an LLM span"""
+        if span is None:
+            return
+        span.attributes.update(provider=result.get("provider", ""), model=result.get("model", ""),
+                               success=result.get("success", False))
+        if not result.get("success"):
+            span.error = result.get("error")
+    
+    def get_latency_stats(self) -> Dict[str, Dict]:
+        """
+        Get observed latency per provider, model and task type
+        
+        Returns:
+            Dictionary of "provider|model|task_type" to p50/p95 and error rate
+        """
+        return self.latency_tracker.snapshot()
     
     def generate(self, prompt: str, task_type: Optional[str] = None,
                 system: Optional[str] = None, max_tokens: int = 2048,
@@ -150,27 +230,20 @@ class LLMRouter:
         logger.info(f"[LLM] Generate called: task_type={task_type}, force_local={force_local}, force_online={force_online}")
         
         # Determine which LLM to use
-        use_online = False
-        
-        if force_online:
-            use_online = True
-            logger.info("[LLM] Forced online mode")
-        elif force_local:
-            use_online = False
-            logger.info("[LLM] Forced local mode")
-        else:
-            use_online = self.should_use_online(task_type, len(prompt))
+        use_online = self._select_online(task_type, len(prompt), force_local, force_online)
         
         # Try selected LLM with fallback chain
         if use_online:
             logger.info("[LLM] Primary: Online (Groq)")
-            result = self.online_llm.generate(prompt, system, max_tokens, temperature)
+            result = self._timed("online", task_type, self.online_llm.generate, prompt, system,
+                                 max_tokens, temperature)
             
             # Fallback to local if online fails
             if not result.get("success"):
                 logger.warning(f"[LLM] Online LLM failed: {result.get('error')}, falling back to local")
-                result = self.local_llm.generate(prompt, system=system,
-                                               max_tokens=max_tokens, temperature=temperature)
+                self.health_monitor.request_refresh()
+                result = self._timed("local", task_type, self.local_llm.generate, prompt,
+                                     system=system, max_tokens=max_tokens, temperature=temperature)
                 if result.get("success"):
                     logger.info("[LLM] Fallback to local succeeded")
                     result["fallback"] = True
@@ -180,15 +253,17 @@ class LLMRouter:
         
         else:
             logger.info("[LLM] Primary: Local (Ollama)")
-            result = self.local_llm.generate(prompt, system=system,
-                                           max_tokens=max_tokens, temperature=temperature)
+            result = self._timed("local", task_type, self.local_llm.generate, prompt, system=system,
+                                 max_tokens=max_tokens, temperature=temperature)
             
             # If local fails and online is available, fallback
             if not result.get("success"):
                 logger.warning(f"[LLM] Local LLM failed: {result.get('error')}")
+                self.health_monitor.request_refresh()
                 if self.online_llm.is_available():
                     logger.info("[LLM] Falling back to online (Groq)")
-                    result = self.online_llm.generate(prompt, system, max_tokens, temperature)
+                    result = self._timed("online", task_type, self.online_llm.generate, prompt,
+                                         system, max_tokens, temperature)
                     if result.get("success"):
                         logger.info("[LLM] Fallback to online succeeded")
                         result["fallback"] = True
@@ -201,6 +276,71 @@ class LLMRouter:
         logger.info(f"[LLM] Generate result: success={result.get('success')}, provider={result.get('provider')}")
         return result
     
+    def generate_stream(self, prompt: str, on_chunk: Callable[[str], None],
+                        task_type: Optional[str] = None, system: Optional[str] = None,
+                        max_tokens: int = 2048, temperature: float = 0.7,
+                        force_local: bool = False, force_online: bool = False) -> Dict:
+        """
+        Generate text, passing fragments to on_chunk as soon as they arrive
+        
+        Routing and fallback follow generate(), except that the fallback
+        provider is only used when the primary failed before producing any
+        text; once fragments have been delivered the partial result is
+        returned as-is.
+        
+        Args:
+            prompt: User prompt
+            on_chunk: Called with each text fragment as it is generated
+            task_type: Type of task (for routing decision)
+            system: System prompt
+            max_tokens: Max output tokens
+            temperature: Sampling temperature
+            force_local: Force local LLM usage
+            force_online: Force online LLM usage
+        
+        Returns:
+            Dictionary with the full generated text and metadata
+        """
+        logger.info(f"[LLM] Generate (stream) called: task_type={task_type}, force_local={force_local}, force_online={force_online}")
+        
+        use_online = self._select_online(task_type, len(prompt), force_local, force_online)
+        
+        if use_online:
+            logger.info("[LLM] Primary (stream): Online (Groq)")
+            result = self._timed("online", task_type, self.online_llm.generate_stream, prompt,
+                                 on_chunk, system, max_tokens, temperature)
+            
+            if not result.get("success"):
+                self.health_monitor.request_refresh()
+            if not result.get("success") and not result.get("streamed"):
+                logger.warning(f"[LLM] Online stream failed: {result.get('error')}, falling back to local")
+                result = self._timed("local", task_type, self.local_llm.generate_stream, prompt,
+                                     on_chunk, system=system, max_tokens=max_tokens,
+                                     temperature=temperature)
+                if result.get("success"):
+                    result["fallback"] = True
+                    result["fallback_reason"] = "Online LLM API failed"
+        
+        else:
+            logger.info("[LLM] Primary (stream): Local (Ollama)")
+            result = self._timed("local", task_type, self.local_llm.generate_stream, prompt,
+                                 on_chunk, system=system, max_tokens=max_tokens,
+                                 temperature=temperature)
+            
+            if not result.get("success"):
+                self.health_monitor.request_refresh()
+            if (not result.get("success") and not result.get("streamed")
+                    and self.online_llm.is_available()):
+                logger.warning(f"[LLM] Local stream failed: {result.get('error')}, falling back to online")
+                result = self._timed("online", task_type, self.online_llm.generate_stream, prompt,
+                                     on_chunk, system, max_tokens, temperature)
+                if result.get("success"):
+                    result["fallback"] = True
+                    result["fallback_reason"] = "Local LLM failed"
+        
+        logger.info(f"[LLM] Stream result: success={result.get('success')}, provider={result.get('provider')}")
+        return result
+    
     def generate_code(self, prompt: str, language: Optional[str] = None,
                      max_tokens: int = 4096) -> Dict:
         """
@@ -225,8 +365,40 @@ class LLMRouter:
         return self.generate(prompt, task_type=task_type, system=system,
                            max_tokens=max_tokens, temperature=0.3)
     
+    def _chat_online(self, messages: List[Dict[str, str]], task_type: Optional[str],
+                     session_id: Optional[str]) -> bool:
+        """
+        Pick a side for a chat turn
+        
+        A session stays on the side that answered its previous turn while
+        that side is healthy, so the provider can reuse its cached prefix.
+        """
+        side = self.chat_affinity.get(session_id) if session_id is not None else None
+        if side is not None and self.health_monitor.is_available(side):
+            return side == "online"
+        
+        # Calculate total prompt length
+        total_length = sum(len(m['content']) for m in messages)
+        return self.should_use_online(task_type, total_length)
+    
+    def _note_chat_side(self, session_id: Optional[str], result: Dict):
+        """Remember which side answered a session's turn"""
+        if session_id is not None and result.get("success"):
+            self.chat_affinity[session_id] = "local" if result.get("provider") == "local" else "online"
+    
+    def end_session(self, session_id: str):
+        """
+        Forget a chat session's provider affinity and local session state
+        
+        Args:
+            session_id: Session identifier
+        """
+        self.chat_affinity.pop(session_id, None)
+        self.local_llm.end_session(session_id)
+    
     def chat(self, messages: List[Dict[str, str]], task_type: Optional[str] = None,
-            max_tokens: int = 2048, temperature: float = 0.7) -> Dict:
+            max_tokens: int = 2048, temperature: float = 0.7,
+            session_id: Optional[str] = None) -> Dict:
         """
         Chat with appropriate LLM
         
@@ -235,27 +407,424 @@ class LLMRouter:
             task_type: Type of task
             max_tokens: Max tokens
             temperature: Temperature
+            session_id: Conversation identifier (optional)
         
         Returns:
             Dictionary with response
         """
-        # Calculate total prompt length
-        total_length = sum(len(m['content']) for m in messages)
+        use_online = self._chat_online(messages, task_type, session_id)
+        
+        if use_online:
+            result = self._timed("online", task_type, self.online_llm.chat, messages, max_tokens,
+                                 temperature)
+            if not result.get("success"):
+                result = self._timed("local", task_type, self.local_llm.chat, messages,
+                                     max_tokens=max_tokens, temperature=temperature,
+                                     session_id=session_id)
+        else:
+            result = self._timed("local", task_type, self.local_llm.chat, messages,
+                                 max_tokens=max_tokens, temperature=temperature,
+                                 session_id=session_id)
+            if not result.get("success") and self.online_llm.is_available():
+                result = self._timed("online", task_type, self.online_llm.chat, messages, max_tokens,
+                                     temperature)
         
-        use_online = self.should_use_online(task_type, total_length)
+        self._note_chat_side(session_id, result)
+        return result
+
+    
+    # ========================
+    # Async API (non-blocking, for use on the event loop)
+    # ========================
+    
+    def _race_plan(self, task_type: Optional[str], force_local: bool,
+                   force_online: bool) -> Optional[str]:
+        """
+        Decide whether an async request should race local against online
+        
+        Once one provider has won nearly every race for a task type, calls
+        go straight to it, with a periodic race to keep the stats current.
+        
+        Args:
+            task_type: Type of task
+            force_local: Force local LLM usage
+            force_online: Force online LLM usage
+        
+        Returns:
+            "race", "local" or "online", or None to use normal routing
+        """
+        if force_local or force_online or task_type not in self.race_tasks:
+            return None
+        if task_type in self.local_tasks:
+            return None  # Pinned local
+        if self.default_mode != "auto":
+            return None
+        if not (self.health_monitor.is_available("local")
+                and self.health_monitor.is_available("online")):
+            return None
+        
+        with self.race_lock:
+            stats = self.race_stats.setdefault(task_type, {"local": 0, "online": 0, "calls": 0})
+            stats["calls"] += 1
+            races = stats["local"] + stats["online"]
+            if races < self.race_min_samples or stats["calls"] % self.race_reprobe_every == 0:
+                return "race"
+            for provider in ("local", "online"):
+                if stats[provider] / races >= self.race_dominance:
+                    return provider
+        return "race"
+    
+    def _record_race_win(self, task_type: str, provider: str):
+        """Count a race win for a provider"""
+        with self.race_lock:
+            stats = self.race_stats.setdefault(task_type, {"local": 0, "online": 0, "calls": 0})
+            stats[provider] += 1
+    
+    def get_race_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get race wins per task type
+        
+        Returns:
+            Dictionary of task type to {"local", "online", "calls"}
+        """
+        with self.race_lock:
+            return {task: dict(stats) for task, stats in self.race_stats.items()}
+    
+    async def _race(self, task_type: str,
+                    run_local: Callable[[Optional[Callable[[str], None]]], Awaitable[Dict]],
+                    run_online: Callable[[Optional[Callable[[str], None]]], Awaitable[Dict]],
+                    on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
+        """
+        Run local and online concurrently and keep the first successful result
+        
+        When streaming, the first provider to emit a chunk owns the stream and
+        the other is cancelled immediately, so the caller never sees
+        interleaved output.
+        
+        Args:
+            task_type: Type of task (for win statistics)
+            run_local: Coroutine factory for the local provider, given an on_chunk
+            run_online: Coroutine factory for the online provider, given an on_chunk
+            on_chunk: Optional stream callback
+        
+        Returns:
+            Winning result with "race" metadata, or the last failure
+        """
+        started = time.time()
+        tasks: Dict[asyncio.Task, str] = {}
+        owner: Dict[str, str] = {}
+        
+        def relay(provider: str) -> Optional[Callable[[str], None]]:
+            if on_chunk is None:
+                return None
+            
+            def forward(chunk: str):
+                if "provider" not in owner:
+                    owner["provider"] = provider
+                    for task, name in tasks.items():
+                        if name != provider:
+                            task.cancel()
+                if owner["provider"] == provider:
+                    on_chunk(chunk)
+            return forward
+        
+        tasks[asyncio.ensure_future(run_local(relay("local")))] = "local"
+        tasks[asyncio.ensure_future(run_online(relay("online")))] = "online"
+        
+        pending = set(tasks)
+        last_result = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    provider = tasks[task]
+                    result = task.result()
+                    if result.get("success") or owner.get("provider") == provider:
+                        for other in pending:
+                            other.cancel()
+                        elapsed_ms = (time.time() - started) * 1000
+                        if result.get("success"):
+                            self._record_race_win(task_type, provider)
+                        result["race"] = {"winner": provider, "elapsed_ms": round(elapsed_ms, 1)}
+                        logger.info(f"[LLM] Race for '{task_type}' won by {provider} ({elapsed_ms:.0f}ms)")
+                        return result
+                    logger.warning(f"[LLM] Race entrant {provider} failed: {result.get('error')}")
+                    last_result = result
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        
+        self.health_monitor.request_refresh()
+        return last_result or {"success": False, "error": "All raced providers failed", "text": ""}
+    
+    async def generate_async(self, prompt: str, task_type: Optional[str] = None,
+                             system: Optional[str] = None, max_tokens: int = 2048,
+                             temperature: float = 0.7, force_local: bool = False,
+                             force_online: bool = False) -> Dict:
+        """
+        Generate text with the same routing and fallback chain as generate(),
+        without blocking the event loop
+        
+        Args:
+            prompt: User prompt
+            task_type: Type of task (for routing decision)
+            system: System prompt
+            max_tokens: Max output tokens
+            temperature: Sampling temperature
+            force_local: Force local LLM usage
+            force_online: Force online LLM usage
+        
+        Returns:
+            Dictionary with generated text and metadata
+        """
+        logger.info(f"[LLM] Generate (async) called: task_type={task_type}, force_local={force_local}, force_online={force_online}")
+        
+        plan = self._race_plan(task_type, force_local, force_online)
+        if plan == "race":
+            result = await self._race(
+                task_type,
+                lambda _: self._timed_async("local", task_type, self.local_llm.generate_async,
+                                            prompt, system=system, max_tokens=max_tokens,
+                                            temperature=temperature),
+                lambda _: self._timed_async("online", task_type, self.online_llm.generate_async,
+                                            prompt, system, max_tokens, temperature)
+            )
+            logger.info(f"[LLM] Generate (async) result: success={result.get('success')}, provider={result.get('provider')}")
+            return result
+        
+        if plan:
+            use_online = plan == "online"
+        else:
+            use_online = self._select_online(task_type, len(prompt), force_local, force_online)
+        
+        if use_online:
+            result = await self._timed_async("online", task_type, self.online_llm.generate_async,
+                                             prompt, system, max_tokens, temperature)
+            
+            if not result.get("success"):
+                logger.warning(f"[LLM] Online LLM failed: {result.get('error')}, falling back to local")
+                self.health_monitor.request_refresh()
+                result = await self._timed_async("local", task_type, self.local_llm.generate_async,
+                                                 prompt, system=system, max_tokens=max_tokens,
+                                                 temperature=temperature)
+                if result.get("success"):
+                    result["fallback"] = True
+                    result["fallback_reason"] = "Online LLM API failed"
+        
+        else:
+            result = await self._timed_async("local", task_type, self.local_llm.generate_async,
+                                             prompt, system=system, max_tokens=max_tokens,
+                                             temperature=temperature)
+            
+            if not result.get("success"):
+                logger.warning(f"[LLM] Local LLM failed: {result.get('error')}")
+                self.health_monitor.request_refresh()
+                if self.online_llm.is_available():
+                    result = await self._timed_async("online", task_type, self.online_llm.generate_async,
+                                                     prompt, system, max_tokens, temperature)
+                    if result.get("success"):
+                        result["fallback"] = True
+                        result["fallback_reason"] = "Local LLM failed"
+        
+        logger.info(f"[LLM] Generate (async) result: success={result.get('success')}, provider={result.get('provider')}")
+        return result
+    
+    async def generate_stream_async(self, prompt: str, on_chunk: Callable[[str], None],
+                                    task_type: Optional[str] = None, system: Optional[str] = None,
+                                    max_tokens: int = 2048, temperature: float = 0.7,
+                                    force_local: bool = False, force_online: bool = False) -> Dict:
+        """
+        Stream text with the same routing as generate_stream(), without
+        blocking the event loop
+        
+        Args:
+            prompt: User prompt
+            on_chunk: Called with each text fragment as it is generated
+            task_type: Type of task (for routing decision)
+            system: System prompt
+            max_tokens: Max output tokens
+            temperature: Sampling temperature
+            force_local: Force local LLM usage
+            force_online: Force online LLM usage
+        
+        Returns:
+            Dictionary with the full generated text and metadata
+        """
+        plan = self._race_plan(task_type, force_local, force_online)
+        if plan == "race":
+            result = await self._race(
+                task_type,
+                lambda relay: self._timed_async("local", task_type, self.local_llm.generate_stream_async,
+                                                prompt, relay, system=system, max_tokens=max_tokens,
+                                                temperature=temperature),
+                lambda relay: self._timed_async("online", task_type, self.online_llm.generate_stream_async,
+                                                prompt, relay, system, max_tokens, temperature),
+                on_chunk=on_chunk
+            )
+            logger.info(f"[LLM] Stream (async) result: success={result.get('success')}, provider={result.get('provider')}")
+            return result
+        
+        if plan:
+            use_online = plan == "online"
+        else:
+            use_online = self._select_online(task_type, len(prompt), force_local, force_online)
         
         if use_online:
-            result = self.online_llm.chat(messages, max_tokens, temperature)
+            result = await self._timed_async("online", task_type, self.online_llm.generate_stream_async,
+                                             prompt, on_chunk, system, max_tokens, temperature)
+            
             if not result.get("success"):
-                result = self.local_llm.chat(messages, max_tokens=max_tokens,
-                                           temperature=temperature)
+                self.health_monitor.request_refresh()
+            if not result.get("success") and not result.get("streamed"):
+                logger.warning(f"[LLM] Online stream failed: {result.get('error')}, falling back to local")
+                result = await self._timed_async("local", task_type, self.local_llm.generate_stream_async,
+                                                 prompt, on_chunk, system=system,
+                                                 max_tokens=max_tokens, temperature=temperature)
+                if result.get("success"):
+                    result["fallback"] = True
+                    result["fallback_reason"] = "Online LLM API failed"
+        
         else:
-            result = self.local_llm.chat(messages, max_tokens=max_tokens,
-                                       temperature=temperature)
+            result = await self._timed_async("local", task_type, self.local_llm.generate_stream_async,
+                                             prompt, on_chunk, system=system, max_tokens=max_tokens,
+                                             temperature=temperature)
+            
+            if not result.get("success"):
+                self.health_monitor.request_refresh()
+            if (not result.get("success") and not result.get("streamed")
+                    and self.online_llm.is_available()):
+                logger.warning(f"[LLM] Local stream failed: {result.get('error')}, falling back to online")
+                result = await self._timed_async("online", task_type, self.online_llm.generate_stream_async,
+                                                 prompt, on_chunk, system, max_tokens, temperature)
+                if result.get("success"):
+                    result["fallback"] = True
+                    result["fallback_reason"] = "Local LLM failed"
+        
+        logger.info(f"[LLM] Stream (async) result: success={result.get('success')}, provider={result.get('provider')}")
+        return result
+    
+    async def chat_async(self, messages: List[Dict[str, str]], task_type: Optional[str] = None,
+                         max_tokens: int = 2048, temperature: float = 0.7,
+                         session_id: Optional[str] = None) -> Dict:
+        """
+        Chat with appropriate LLM without blocking the event loop (see chat)
+        
+        Args:
+            messages: Message history
+            task_type: Type of task
+            max_tokens: Max tokens
+            temperature: Temperature
+            session_id: Conversation identifier (optional)
+        
+        Returns:
+            Dictionary with response
+        """
+        use_online = self._chat_online(messages, task_type, session_id)
+        
+        if use_online:
+            result = await self._timed_async("online", task_type, self.online_llm.chat_async,
+                                             messages, max_tokens, temperature)
+            if not result.get("success"):
+                self.health_monitor.request_refresh()
+                result = await self._timed_async("local", task_type, self.local_llm.chat_async,
+                                                 messages, max_tokens=max_tokens,
+                                                 temperature=temperature, session_id=session_id)
+                if result.get("success"):
+                    result["fallback"] = True
+                    result["fallback_reason"] = "Online LLM API failed"
+        else:
+            result = await self._timed_async("local", task_type, self.local_llm.chat_async,
+                                             messages, max_tokens=max_tokens,
+                                             temperature=temperature, session_id=session_id)
             if not result.get("success") and self.online_llm.is_available():
-                result = self.online_llm.chat(messages, max_tokens, temperature)
+                self.health_monitor.request_refresh()
+                result = await self._timed_async("online", task_type, self.online_llm.chat_async,
+                                                 messages, max_tokens, temperature)
+                if result.get("success"):
+                    result["fallback"] = True
+                    result["fallback_reason"] = "Local LLM failed"
         
+        self._note_chat_side(session_id, result)
         return result
+    
+    async def chat_stream_async(self, messages: List[Dict[str, str]],
+                                on_chunk: Callable[[str], None], task_type: Optional[str] = None,
+                                max_tokens: int = 2048, temperature: float = 0.7,
+                                session_id: Optional[str] = None) -> Dict:
+        """
+        Stream a chat response without blocking the event loop
+        
+        Fallback follows generate_stream(): only if nothing was streamed yet.
+        
+        Args:
+            messages: Message history
+            on_chunk: Called with each text fragment as it is generated
+            task_type: Type of task
+            max_tokens: Max tokens
+            temperature: Temperature
+            session_id: Conversation identifier (optional)
+        
+        Returns:
+            Dictionary with the full response and metadata
+        """
+        use_online = self._chat_online(messages, task_type, session_id)
+        
+        if use_online:
+            result = await self._timed_async("online", task_type, self.online_llm.chat_stream_async,
+                                             messages, on_chunk, max_tokens, temperature)
+            if not result.get("success"):
+                self.health_monitor.request_refresh()
+            if not result.get("success") and not result.get("streamed"):
+                logger.warning(f"[LLM] Online chat failed: {result.get('error')}, falling back to local")
+                result = await self._timed_async("local", task_type, self.local_llm.chat_stream_async,
+                                                 messages, on_chunk, max_tokens=max_tokens,
+                                                 temperature=temperature, session_id=session_id)
+                if result.get("success"):
+                    result["fallback"] = True
+                    result["fallback_reason"] = "Online LLM API failed"
+        else:
+            result = await self._timed_async("local", task_type, self.local_llm.chat_stream_async,
+                                             messages, on_chunk, max_tokens=max_tokens,
+                                             temperature=temperature, session_id=session_id)
+            if not result.get("success"):
+                self.health_monitor.request_refresh()
+            if (not result.get("success") and not result.get("streamed")
+                    and self.online_llm.is_available()):
+                logger.warning(f"[LLM] Local chat failed: {result.get('error')}, falling back to online")
+                result = await self._timed_async("online", task_type, self.online_llm.chat_stream_async,
+                                                 messages, on_chunk, max_tokens, temperature)
+                if result.get("success"):
+                    result["fallback"] = True
+                    result["fallback_reason"] = "Local LLM failed"
+        
+        self._note_chat_side(session_id, result)
+        logger.info(f"[LLM] Chat (async) result: success={result.get('success')}, provider={result.get('provider')}")
+        return result
+    
+    async def generate_code_async(self, prompt: str, language: Optional[str] = None,
+                                  max_tokens: int = 4096) -> Dict:
+        """
+        Generate code without blocking the event loop (see generate_code)
+        
+        Args:
+            prompt: Code generation prompt
+            language: Programming language
+            max_tokens: Max output tokens
+        
+        Returns:
+            Dictionary with generated code
+        """
+        task_type = "simple_code" if len(prompt) < 500 else "complex_code"
+        
+        system = "You are an expert programmer. Generate clean, efficient code."
+        if language:
+            system += f" The language is {language}."
+        
+        return await self.generate_async(prompt, task_type=task_type, system=system,
+                                         max_tokens=max_tokens, temperature=0.3)
 
 
 # Global LLM router instance
@@ -3,17 +3,142 @@ Local LLM Client using Ollama
 Provides access to locally-running LLM models.
 """
 
-import requests
 import json
-from typing import Dict, Optional, List
+import time
+from typing import Dict, Optional, List, Callable
 
 from item_assistant.config import get_config
-from item_assistant.logging import get_log_manager
+from item_assistant.logging import get_log_manager, elapsed_ms
+from item_assistant.utils.http_pool import get_http_session, get_async_http_client
 
 logger = get_log_manager().get_logger()
 log_manager = get_log_manager()
 
 
+def _ollama_usage(data: Dict) -> Dict:
+    """Token counts from an Ollama response (the final line when streaming)"""
+    return {
+        "prompt_tokens": data.get("prompt_eval_count"),
+        "completion_tokens": data.get("eval_count")
+    }
+
+
+class _OllamaCall:
+    """
+    Bookkeeping for one Ollama request: collects streamed fragments, logs
+    the call and builds the result dict, so the sync and async variants of
+    each method differ only in transport
+    """
+    
+    def __init__(self, llm: "LocalLLM", model: str, prompt_length: int, action: str,
+                 chat: bool = False, session_id: Optional[str] = None,
+                 on_chunk: Optional[Callable[[str], None]] = None):
+        """
+        Start timing a request
+        
+        Args:
+            llm: Client the request belongs to
+            model: Model the request was sent to
+            prompt_length: Prompt size in characters, for the call log
+            action: What failed, for error logs ("generation", "chat streaming", ...)
+            chat: /api/chat (message content) rather than /api/generate (response)
+            session_id: Chat session to update on success
+            on_chunk: Called with each streamed fragment (None if not streaming)
+        """
+        self.llm = llm
+        self.model = model
+        self.prompt_length = prompt_length
+        self.action = action
+        self.chat = chat
+        self.session_id = session_id
+        self.on_chunk = on_chunk
+        self.chunks: List[str] = []
+        self.data: Dict = {}
+        self.started = time.perf_counter()
+    
+    def _text(self, data: Dict) -> str:
+        """Text carried by a response object or stream line"""
+        if self.chat:
+            return data.get("message", {}).get("content", "")
+        return data.get("response", "")
+    
+    def feed(self, line: str) -> bool:
+        """
+        Handle one newline-delimited JSON line of a streamed response
+        
+        Args:
+            line: Raw line (blank lines are skipped)
+        
+        Returns:
+            True once the final ("done") line has been seen
+        """
+        if not line:
+            return False
+        self.data = json.loads(line)
+        if self.data.get("error"):
+            raise RuntimeError(self.data["error"])
+        
+        fragment = self._text(self.data)
+        if fragment:
+            self.chunks.append(fragment)
+            self.on_chunk(fragment)
+        return bool(self.data.get("done"))
+    
+    def _log(self, success: bool, **usage):
+        """Record the call in the LLM call log"""
+        log_manager.log_llm_call("local", self.model, self.prompt_length, success,
+                                 duration_ms=elapsed_ms(self.started), **usage)
+    
+    def success(self, data: Optional[Dict] = None) -> Dict:
+        """
+        Finish a successful request
+        
+        Args:
+            data: Response object of a non-streamed request (streamed ones
+                use the fragments and final line already fed)
+        
+        Returns:
+            Result dict with text, model and provider
+        """
+        if data is not None:
+            self.data = data
+        self._log(True, **_ollama_usage(self.data))
+        
+        result = {
+            "success": True,
+            "text": self._text(self.data) if data is not None else "".join(self.chunks),
+            "model": self.model,
+            "provider": "local"
+        }
+        if self.on_chunk is not None:
+            result["streamed"] = bool(self.chunks)
+        if self.chat:
+            return self.llm._finish_chat(self.session_id, self.data, result)
+        return result
+    
+    def http_error(self, status_code: int) -> Dict:
+        """Finish a request Ollama rejected"""
+        self._log(False)
+        return {
+            "success": False,
+            "error": f"API error: {status_code}",
+            "text": ""
+        }
+    
+    def failure(self, error: Exception) -> Dict:
+        """Finish a request that raised, keeping any text already streamed"""
+        self._log(False)
+        logger.error(f"Local LLM {self.action} failed: {error!r}")
+        result = {
+            "success": False,
+            "error": str(error) or repr(error),
+            "text": "".join(self.chunks)
+        }
+        if self.on_chunk is not None:
+            result["streamed"] = bool(self.chunks)
+        return result
+
+
 class LocalLLM:
     """Client for local LLM via Ollama"""
     
@@ -22,10 +147,25 @@ class LocalLLM:
         self.config = get_config()
         self.base_url = self.config.get("llm.local.base_url", "http://localhost:11434")
         self.timeout = self.config.get("llm.local.timeout", 60)
+        self.context_length = self.config.get("llm.local.context_length", 4096)
         
         # Get model names from config
         self.general_model = self.config.get("llm.local.models.general", "llama3.2:3b")
         self.code_model = self.config.get("llm.local.models.code", "codegemma:7b")
+        self.embedding_model = self.config.get("llm.local.models.embedding", "nomic-embed-text")
+        
+        # How long Ollama should keep a model in memory after each request
+        self.keep_alive = self.config.get("llm.local.keep_alive", "30m")
+        
+        # model -> time of the last request, read by the model manager
+        self.last_used: Dict[str, float] = {}
+        
+        # session_id -> {"model", "turns", "prompt_eval_count"}; a session stays
+        # on one model so Ollama can reuse the KV cache for its history prefix
+        self.chat_sessions: Dict[str, Dict] = {}
+        
+        # Shared keep-alive session so repeated calls reuse TCP connections
+        self.session = get_http_session()
         
         logger.info(f"Local LLM initialized (general: {self.general_model}, code: {self.code_model})")
     
@@ -37,7 +177,7 @@ class LocalLLM:
             True if available
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             return response.status_code == 200
         except:
             return False
@@ -50,7 +190,7 @@ class LocalLLM:
             List of model names
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 return [model['name'] for model in data.get('models', [])]
@@ -76,57 +216,162 @@ class LocalLLM:
             Dictionary with generated text and metadata
         """
         model = model or self.general_model
+        payload = self._build_payload(prompt, model, system, max_tokens,
+                                      temperature, stream=False)
+        call = _OllamaCall(self, model, len(prompt), "generation")
         
-        # Build request payload
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                return call.http_error(response.status_code)
+            return call.success(response.json())
+        except Exception as e:
+            return call.failure(e)
+    
+    def embed(self, text: str, model: Optional[str] = None) -> Optional[List[float]]:
+        """
+        Get an embedding vector for text
+        
+        Args:
+            text: Text to embed
+            model: Embedding model (defaults to configured embedding model)
+        
+        Returns:
+            Embedding vector, or None if unavailable
+        """
+        model = model or self.embedding_model
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/embeddings",
+                json={"model": model, "prompt": text},
+                timeout=self.timeout
+            )
+            if response.status_code == 200:
+                return response.json().get("embedding") or None
+            logger.debug(f"Embedding request failed: HTTP {response.status_code}")
+            return None
+        except Exception as e:
+            logger.debug(f"Embedding request failed: {e}")
+            return None
+    
+    def _build_payload(self, prompt: str, model: str, system: Optional[str],
+                       max_tokens: int, temperature: float, stream: bool) -> Dict:
+        """Build an Ollama /api/generate request payload"""
         payload = {
             "model": model,
             "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-                "num_predict": max_tokens
-            }
+            "stream": stream,
+            "options": self._options(max_tokens, temperature)
         }
         
         if system:
             payload["system"] = system
         
+        return self._finish_payload(payload, model)
+    
+    def _build_chat_payload(self, messages: List[Dict[str, str]], model: str,
+                            max_tokens: int, temperature: float, stream: bool) -> Dict:
+        """Build an Ollama /api/chat request payload"""
+        payload = {
+            "model": model,
+            "messages": [{"role": m['role'], "content": m['content']} for m in messages],
+            "stream": stream,
+            "options": self._options(max_tokens, temperature)
+        }
+        return self._finish_payload(payload, model)
+    
+    def _options(self, max_tokens: int, temperature: float) -> Dict:
+        """Sampling options; num_ctx is always sent because changing it reloads the model"""
+        return {
+            "temperature": temperature,
+            "num_predict": max_tokens,
+            "num_ctx": self.context_length
+        }
+    
+    def _finish_payload(self, payload: Dict, model: str) -> Dict:
+        """Add keep-alive and note model usage"""
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        
+        # Every request variant builds its payload here, so this is where usage is noted
+        self.last_used[model] = time.time()
+        
+        return payload
+    
+    def _session_model(self, session_id: Optional[str], model: Optional[str]) -> str:
+        """Resolve the model for a chat, pinning it for the session's lifetime"""
+        if session_id is None:
+            return model or self.general_model
+        session = self.chat_sessions.get(session_id)
+        if session is None:
+            session = {"model": model or self.general_model, "turns": 0, "prompt_eval_count": 0}
+            self.chat_sessions[session_id] = session
+        return session["model"]
+    
+    def _finish_chat(self, session_id: Optional[str], data: Dict, result: Dict) -> Dict:
+        """Record per-session stats from the final /api/chat response"""
+        prompt_eval_count = data.get("prompt_eval_count", 0)
+        result["prompt_eval_count"] = prompt_eval_count
+        session = self.chat_sessions.get(session_id) if session_id is not None else None
+        if session is not None:
+            session["turns"] += 1
+            session["prompt_eval_count"] = prompt_eval_count
+            result["session_id"] = session_id
+        return result
+    
+    def end_session(self, session_id: str):
+        """
+        Forget a chat session
+        
+        Args:
+            session_id: Session identifier
+        """
+        self.chat_sessions.pop(session_id, None)
+    
+    def generate_stream(self, prompt: str, on_chunk: Callable[[str], None],
+                        model: Optional[str] = None, system: Optional[str] = None,
+                        max_tokens: int = 2048, temperature: float = 0.7) -> Dict:
+        """
+        Generate text using local LLM, streaming tokens as they arrive
+        
+        Ollama streams newline-delimited JSON objects; each carries a
+        "response" fragment and the last one has "done": true.
+        
+        Args:
+            prompt: User prompt
+            on_chunk: Called with each text fragment as it is generated
+            model: Model to use (defaults to general model)
+            system: System prompt (optional)
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+        
+        Returns:
+            Dictionary with the full generated text and metadata
+        """
+        model = model or self.general_model
+        payload = self._build_payload(prompt, model, system, max_tokens,
+                                      temperature, stream=True)
+        call = _OllamaCall(self, model, len(prompt), "streaming", on_chunk=on_chunk)
+        
         try:
-            # Call Ollama API
-            response = requests.post(
+            with self.session.post(
                 f"{self.base_url}/api/generate",
                 json=payload,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                generated_text = data.get('response', '')
-                
-                log_manager.log_llm_call("local", model, len(prompt), True)
-                
-                return {
-                    "success": True,
-                    "text": generated_text,
-                    "model": model,
-                    "provider": "local"
-                }
-            else:
-                log_manager.log_llm_call("local", model, len(prompt), False)
-                return {
-                    "success": False,
-                    "error": f"API error: {response.status_code}",
-                    "text": ""
-                }
-        
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    return call.http_error(response.status_code)
+                for line in response.iter_lines():
+                    if call.feed(line):
+                        break
+            return call.success()
         except Exception as e:
-            log_manager.log_llm_call("local", model, len(prompt), False)
-            logger.error(f"Local LLM generation failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "text": ""
-            }
+            return call.failure(e)
     
     def generate_code(self, prompt: str, language: Optional[str] = None,
                      max_tokens: int = 4096) -> Dict:
@@ -154,46 +399,287 @@ class LocalLLM:
         )
     
     def chat(self, messages: List[Dict[str, str]], model: Optional[str] = None,
-            max_tokens: int = 2048, temperature: float = 0.7) -> Dict:
+            max_tokens: int = 2048, temperature: float = 0.7,
+            session_id: Optional[str] = None) -> Dict:
         """
         Chat with local LLM using message history
         
+        Uses Ollama's /api/chat so the history is sent as messages. Ollama
+        keeps the KV cache of the last request per loaded model, so when a
+        session's next turn extends the same history on the same model and
+        options, only the new tokens are evaluated.
+        
         Args:
             messages: List of message dicts with 'role' and 'content'
-            model: Model to use
+            model: Model to use (ignored after a session's first turn)
             max_tokens: Maximum tokens
             temperature: Sampling temperature
+            session_id: Conversation identifier (optional)
         
         Returns:
             Dictionary with response
         """
+        model = self._session_model(session_id, model)
+        payload = self._build_chat_payload(messages, model, max_tokens,
+                                           temperature, stream=False)
+        call = _OllamaCall(self, model, sum(len(m['content']) for m in messages), "chat",
+                           chat=True, session_id=session_id)
+        
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/chat",
+                json=payload,
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                return call.http_error(response.status_code)
+            return call.success(response.json())
+        except Exception as e:
+            return call.failure(e)
+    
+    def chat_stream(self, messages: List[Dict[str, str]], on_chunk: Callable[[str], None],
+                    model: Optional[str] = None, max_tokens: int = 2048,
+                    temperature: float = 0.7, session_id: Optional[str] = None) -> Dict:
+        """
+        Chat with local LLM, streaming tokens as they arrive (see chat)
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            on_chunk: Called with each text fragment as it is generated
+            model: Model to use (ignored after a session's first turn)
+            max_tokens: Maximum tokens
+            temperature: Sampling temperature
+            session_id: Conversation identifier (optional)
+        
+        Returns:
+            Dictionary with the full response and metadata
+        """
+        model = self._session_model(session_id, model)
+        payload = self._build_chat_payload(messages, model, max_tokens,
+                                           temperature, stream=True)
+        call = _OllamaCall(self, model, sum(len(m['content']) for m in messages), "chat streaming",
+                           chat=True, session_id=session_id, on_chunk=on_chunk)
+        
+        try:
+            with self.session.post(
+                f"{self.base_url}/api/chat",
+                json=payload,
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    return call.http_error(response.status_code)
+                for line in response.iter_lines():
+                    if call.feed(line):
+                        break
+            return call.success()
+        except Exception as e:
+            return call.failure(e)
+    
+    # ========================
+    # Async API (non-blocking, for use on the event loop)
+    # ========================
+    
+    async def generate_async(self, prompt: str, model: Optional[str] = None,
+                             system: Optional[str] = None, max_tokens: int = 2048,
+                             temperature: float = 0.7) -> Dict:
+        """
+        Generate text using local LLM without blocking the event loop
+        
+        Args:
+            prompt: User prompt
+            model: Model to use (defaults to general model)
+            system: System prompt (optional)
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+        
+        Returns:
+            Dictionary with generated text and metadata
+        """
+        model = model or self.general_model
+        payload = self._build_payload(prompt, model, system, max_tokens,
+                                      temperature, stream=False)
+        call = _OllamaCall(self, model, len(prompt), "generation")
+        
+        try:
+            client = get_async_http_client()
+            response = await client.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                return call.http_error(response.status_code)
+            return call.success(response.json())
+        except Exception as e:
+            return call.failure(e)
+    
+    async def generate_stream_async(self, prompt: str, on_chunk: Callable[[str], None],
+                                    model: Optional[str] = None, system: Optional[str] = None,
+                                    max_tokens: int = 2048, temperature: float = 0.7) -> Dict:
+        """
+        Stream text from the local LLM without blocking the event loop
+        
+        Args:
+            prompt: User prompt
+            on_chunk: Called with each text fragment as it is generated
+            model: Model to use (defaults to general model)
+            system: System prompt (optional)
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+        
+        Returns:
+            Dictionary with the full generated text and metadata
+        """
         model = model or self.general_model
+        payload = self._build_payload(prompt, model, system, max_tokens,
+                                      temperature, stream=True)
+        call = _OllamaCall(self, model, len(prompt), "streaming", on_chunk=on_chunk)
+        
+        try:
+            client = get_async_http_client()
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=self.timeout
+            ) as response:
+                if response.status_code != 200:
+                    return call.http_error(response.status_code)
+                async for line in response.aiter_lines():
+                    if call.feed(line):
+                        break
+            return call.success()
+        except Exception as e:
+            return call.failure(e)
+    
+    async def generate_code_async(self, prompt: str, language: Optional[str] = None,
+                                  max_tokens: int = 4096) -> Dict:
+        """
+        Generate code using the code model without blocking the event loop
+        
+        Args:
+            prompt: Code generation prompt
+            language: Programming language (optional)
+            max_tokens: Maximum tokens
+        
+        Returns:
+            Dictionary with generated code
+        """
+        system_prompt = "You are an expert programmer. Generate clean, efficient code."
+        if language:
+            system_prompt += f" The language is {language}."
+        
+        return await self.generate_async(
+            prompt=prompt,
+            model=self.code_model,
+            system=system_prompt,
+            max_tokens=max_tokens,
+            temperature=0.3
+        )
+    
+    async def chat_async(self, messages: List[Dict[str, str]], model: Optional[str] = None,
+                         max_tokens: int = 2048, temperature: float = 0.7,
+                         session_id: Optional[str] = None) -> Dict:
+        """
+        Chat with local LLM without blocking the event loop (see chat)
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            model: Model to use (ignored after a session's first turn)
+            max_tokens: Maximum tokens
+            temperature: Sampling temperature
+            session_id: Conversation identifier (optional)
+        
+        Returns:
+            Dictionary with response
+        """
+        model = self._session_model(session_id, model)
+        payload = self._build_chat_payload(messages, model, max_tokens,
+                                           temperature, stream=False)
+        call = _OllamaCall(self, model, sum(len(m['content']) for m in messages), "chat",
+                           chat=True, session_id=session_id)
+        
+        try:
+            client = get_async_http_client()
+            response = await client.post(
+                f"{self.base_url}/api/chat",
+                json=payload,
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                return call.http_error(response.status_code)
+            return call.success(response.json())
+        except Exception as e:
+            return call.failure(e)
+    
+    async def chat_stream_async(self, messages: List[Dict[str, str]],
+                                on_chunk: Callable[[str], None], model: Optional[str] = None,
+                                max_tokens: int = 2048, temperature: float = 0.7,
+                                session_id: Optional[str] = None) -> Dict:
+        """
+        Stream a chat response without blocking the event loop (see chat)
+        
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            on_chunk: Called with each text fragment as it is generated
+            model: Model to use (ignored after a session's first turn)
+            max_tokens: Maximum tokens
+            temperature: Sampling temperature
+            session_id: Conversation identifier (optional)
+        
+        Returns:
+            Dictionary with the full response and metadata
+        """
+        model = self._session_model(session_id, model)
+        payload = self._build_chat_payload(messages, model, max_tokens,
+                                           temperature, stream=True)
+        call = _OllamaCall(self, model, sum(len(m['content']) for m in messages), "chat streaming",
+                           chat=True, session_id=session_id, on_chunk=on_chunk)
         
-        # Convert messages to Ollama format
-        # Extract system message if present
-        system = None
-        prompt_messages = []
-        
-        for msg in messages:
-            if msg['role'] == 'system':
-                system = msg['content']
-            else:
-                prompt_messages.append(msg)
-        
-        # Build prompt from messages
-        prompt = ""
-        for msg in prompt_messages:
-            role = msg['role']
-            content = msg['content']
-            if role == 'user':
-                prompt += f"User: {content}\n"
-            elif role == 'assistant':
-                prompt += f"Assistant: {content}\n"
-        
-        prompt += "Assistant:"
-        
-        return self.generate(prompt, model=model, system=system,
-                           max_tokens=max_tokens, temperature=temperature)
+        try:
+            client = get_async_http_client()
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/api/chat",
+                json=payload,
+                timeout=self.timeout
+            ) as response:
+                if response.status_code != 200:
+                    return call.http_error(response.status_code)
+                async for line in response.aiter_lines():
+                    if call.feed(line):
+                        break
+            return call.success()
+        except Exception as e:
+            return call.failure(e)
+    
+    async def embed_async(self, text: str, model: Optional[str] = None) -> Optional[List[float]]:
+        """
+        Get an embedding vector for text without blocking the event loop
+        
+        Args:
+            text: Text to embed
+            model: Embedding model (defaults to configured embedding model)
+        
+        Returns:
+            Embedding vector, or None if unavailable
+        """
+        model = model or self.embedding_model
+        try:
+            client = get_async_http_client()
+            response = await client.post(
+                f"{self.base_url}/api/embeddings",
+                json={"model": model, "prompt": text},
+                timeout=self.timeout
+            )
+            if response.status_code == 200:
+                return response.json().get("embedding") or None
+            logger.debug(f"Embedding request failed: HTTP {response.status_code}")
+            return None
+        except Exception as e:
+            logger.debug(f"Embedding request failed: {e!r}")
+            return None
 
 
 # Global local LLM instance
@@ -0,0 +1,242 @@
+"""
+Model Manager
+Keeps the Ollama models the assistant needs resident, so requests never pay a cold load.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+from item_assistant.llm.local_llm import get_local_llm
+from item_assistant.llm.health_monitor import get_health_monitor
+
+logger = get_logger()
+
+
+def _parse_expiry(value: Optional[str]) -> Optional[float]:
+    """Parse an Ollama expires_at timestamp into epoch seconds"""
+    if not value:
+        return None
+    try:
+        # Ollama reports nanoseconds; fromisoformat only accepts up to micro
+        head, sep, tail = value.partition(".")
+        if sep:
+            digits = len(tail) - len(tail.lstrip("0123456789"))
+            tail = tail[:min(digits, 6)] + tail[digits:]
+        return datetime.fromisoformat((head + sep + tail).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _canonical(model: str) -> str:
+    """Ollama lists untagged models as name:latest"""
+    return model if ":" in model else f"{model}:latest"
+
+
+class ModelManager:
+    """Preloads local models and re-warms them before Ollama unloads them"""
+    
+    def __init__(self):
+        """Initialize model manager"""
+        self.config = get_config()
+        self.local_llm = get_local_llm()
+        self.health_monitor = get_health_monitor()
+        
+        self.enabled = self.config.get("llm.local.residency.enabled", True)
+        self.poll_interval = self.config.get("llm.local.residency.poll_interval_seconds", 30)
+        self.warm_window = self.config.get("llm.local.residency.warm_window_minutes", 60) * 60
+        
+        roles = {"general": self.local_llm.general_model, "code": self.local_llm.code_model}
+        # Loaded at startup and kept warm for as long as the assistant runs
+        self.pinned: List[str] = [
+            _canonical(roles.get(name, name))
+            for name in self.config.get("llm.local.residency.pinned", ["general"])
+        ]
+        # Loaded once at startup; after that only real use keeps them warm
+        self.preload_models: List[str] = list(dict.fromkeys(self.pinned + [
+            _canonical(roles.get(name, name))
+            for name in self.config.get("llm.local.residency.preload", ["general", "code"])
+        ]))
+        
+        # model -> epoch seconds at which Ollama will unload it
+        self.resident: Dict[str, Optional[float]] = {}
+        self.warmups = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+        
+        logger.info(f"[MODELS] Model manager initialized (pinned: {self.pinned}, enabled: {self.enabled})")
+    
+    def refresh_resident(self) -> Dict[str, Optional[float]]:
+        """
+        Ask Ollama which models are loaded
+        
+        Returns:
+            Dictionary of model name to unload time (epoch seconds)
+        """
+        try:
+            response = self.local_llm.session.get(f"{self.local_llm.base_url}/api/ps", timeout=5)
+            if response.status_code != 200:
+                return self.get_resident()
+            resident = {
+                model["name"]: _parse_expiry(model.get("expires_at"))
+                for model in response.json().get("models", [])
+            }
+        except Exception as e:
+            logger.debug(f"[MODELS] Could not list loaded models: {e}")
+            return self.get_resident()
+        
+        with self.lock:
+            newly_hot = set(resident) - set(self.resident)
+            self.resident = resident
+        for model in newly_hot:
+            logger.info(f"[MODELS] {model} is loaded")
+        return resident
+    
+    def warm(self, model: str) -> bool:
+        """
+        Load a model (or extend its keep-alive) with an empty request
+        
+        Args:
+            model: Model name
+        
+        Returns:
+            True if Ollama accepted the request
+        """
+        started = time.time()
+        try:
+            response = self.local_llm.session.post(
+                f"{self.local_llm.base_url}/api/generate",
+                # Same num_ctx as real requests, or the first one reloads the model
+                json={"model": model, "prompt": "", "stream": False,
+                      "keep_alive": self.local_llm.keep_alive,
+                      "options": {"num_ctx": self.local_llm.context_length}},
+                timeout=self.local_llm.timeout
+            )
+        except Exception as e:
+            logger.warning(f"[MODELS] Warm-up of {model} failed: {e}")
+            return False
+        
+        if response.status_code != 200:
+            logger.warning(f"[MODELS] Warm-up of {model} failed: HTTP {response.status_code}")
+            return False
+        
+        with self.lock:
+            self.warmups += 1
+        logger.info(f"[MODELS] Warmed {model} ({(time.time() - started) * 1000:.0f}ms)")
+        return True
+    
+    def preload(self):
+        """Load every startup model that isn't already resident"""
+        resident = self.refresh_resident()
+        for model in self.preload_models:
+            if model not in resident:
+                self.warm(model)
+        self.refresh_resident()
+    
+    def wanted_models(self) -> List[str]:
+        """
+        Models that should currently be resident
+        
+        Returns:
+            Pinned models plus any model actually used within the warm
+            window (startup preloads are not re-warmed unless used)
+        """
+        now = time.time()
+        recent = [
+            _canonical(model) for model, used_at in list(self.local_llm.last_used.items())
+            if now - used_at <= self.warm_window and model != self.local_llm.embedding_model
+        ]
+        return list(dict.fromkeys(self.pinned + recent))
+    
+    def _tick(self):
+        """Reload unloaded pinned models and extend wanted ones about to expire"""
+        if not self.health_monitor.is_available("local"):
+            return
+        
+        resident = self.refresh_resident()
+        # Re-warm anything that would expire before the next check
+        deadline = time.time() + self.poll_interval * 2
+        for model in self.wanted_models():
+            if model not in resident:
+                # Something else needed the memory; an unpinned model reloads
+                # on its next real request rather than evicting it straight back
+                if model in self.pinned:
+                    self.warm(model)
+            elif resident[model] is not None and resident[model] < deadline:
+                self.warm(model)
+    
+    def start(self):
+        """Preload models and start background residency checks"""
+        if self.running or not self.enabled:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="model-manager", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Stop background residency checks"""
+        self.running = False
+        self.wakeup.set()
+    
+    def _loop(self):
+        """Background loop: preload once, then keep wanted models resident"""
+        if self.health_monitor.is_available("local"):
+            self.preload()
+        
+        while self.running:
+            self.wakeup.wait(self.poll_interval)
+            self.wakeup.clear()
+            if self.running:
+                self._tick()
+    
+    def get_resident(self) -> Dict[str, Optional[float]]:
+        """Get the last known loaded models and their unload times"""
+        with self.lock:
+            return dict(self.resident)
+    
+    def is_hot(self, model: Optional[str] = None) -> bool:
+        """
+        Check whether a model is loaded (per the last /api/ps poll)
+        
+        Args:
+            model: Model name (defaults to the general model)
+        
+        Returns:
+            True if the model is resident
+        """
+        return _canonical(model or self.local_llm.general_model) in self.get_resident()
+    
+    def snapshot(self) -> Dict:
+        """
+        Get residency status
+        
+        Returns:
+            Dictionary with resident models, wanted models and warm-up count
+        """
+        now = time.time()
+        resident = self.get_resident()
+        return {
+            "resident": {
+                model: round(expires - now) if expires is not None else None
+                for model, expires in resident.items()
+            },
+            "wanted": self.wanted_models(),
+            "warmups": self.warmups
+        }
+
+
+# Global model manager instance
+_model_manager_instance = None
+
+
+def get_model_manager() -> ModelManager:
+    """Get the global model manager instance"""
+    global _model_manager_instance
+    if _model_manager_instance is None:
+        _model_manager_instance = ModelManager()
+    return _model_manager_instance
@@ -4,17 +4,36 @@ Provides access to free-tier cloud LLM APIs (Groq, Gemini, etc.)
 """
 
 import os
-from typing import Dict, Optional, List
+import time
+from typing import Dict, Optional, List, Callable
 import google.generativeai as genai
-from groq import Groq
+from groq import Groq, AsyncGroq
 
 from item_assistant.config import get_config
-from item_assistant.logging import get_log_manager
+from item_assistant.logging import get_log_manager, elapsed_ms
 
 logger = get_log_manager().get_logger()
 log_manager = get_log_manager()
 
 
+def _groq_usage(usage) -> Dict:
+    """Token counts from a Groq usage object (None if not reported)"""
+    if usage is None:
+        return {}
+    return {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+
+
+def _gemini_usage(response) -> Dict:
+    """Token counts from a Gemini response or stream chunk"""
+    metadata = getattr(response, "usage_metadata", None)
+    if not metadata or not metadata.prompt_token_count:
+        return {}
+    return {
+        "prompt_tokens": metadata.prompt_token_count,
+        "completion_tokens": metadata.candidates_token_count
+    }
+
+
 class OnlineLLM:
     """Client for online LLM APIs"""
     
@@ -24,6 +43,7 @@ class OnlineLLM:
         
         # Initialize Groq
         self.groq_client = None
+        self.groq_async_client = None
         self.groq_enabled = self.config.get("llm.online.groq.enabled", False)
         self.groq_model = self.config.get("llm.online.groq.model", "llama-3.3-70b-versatile")
         
@@ -32,6 +52,7 @@ class OnlineLLM:
             if api_key:
                 try:
                     self.groq_client = Groq(api_key=api_key)
+                    self.groq_async_client = AsyncGroq(api_key=api_key)
                     logger.info("Groq client initialized")
                 except Exception as e:
                     logger.error(f"Failed to initialize Groq: {e}")
@@ -57,19 +78,55 @@ class OnlineLLM:
         """Check if any online LLM is available"""
         return (self.groq_enabled and self.groq_client is not None) or self.gemini_enabled
     
-    def _generate_groq(self, prompt: str, system: Optional[str] = None,
-                      max_tokens: int = 8000, temperature: float = 0.7) -> Dict:
+    def _to_messages(self, prompt: str, system: Optional[str] = None) -> List[Dict[str, str]]:
+        """Wrap a single prompt as a message list"""
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    def _gemini_request(self, messages: List[Dict[str, str]], max_tokens: int,
+                        temperature: float) -> tuple:
+        """
+        Convert a message list into a Gemini model and contents
+        
+        Gemini names the assistant role "model". google-generativeai 0.3.x
+        has no system_instruction setting, so the system prompt is put in
+        front of the first user turn.
+        
+        Returns:
+            Tuple of (GenerativeModel, contents)
+        """
+        system = "\n\n".join(m['content'] for m in messages if m['role'] == 'system')
+        contents = [
+            {"role": "model" if m['role'] == 'assistant' else "user", "parts": [m['content']]}
+            for m in messages if m['role'] != 'system'
+        ]
+        if system:
+            if contents and contents[0]["role"] == "user":
+                contents[0]["parts"] = [f"{system}\n\n{contents[0]['parts'][0]}"]
+            else:
+                contents.insert(0, {"role": "user", "parts": [system]})
+        
+        model = genai.GenerativeModel(
+            model_name=self.gemini_model,
+            generation_config={
+                "temperature": temperature,
+                "max_output_tokens": max_tokens,
+            }
+        )
+        return model, contents
+    
+    def _generate_groq(self, messages: List[Dict[str, str]], max_tokens: int = 8000,
+                       temperature: float = 0.7) -> Dict:
         """Generate using Groq API"""
         if not self.groq_client:
             return {"success": False, "error": "Groq not initialized", "text": ""}
         
+        prompt_length = sum(len(m['content']) for m in messages)
+        started = time.perf_counter()
         try:
-            # Build messages
-            messages = []
-            if system:
-                messages.append({"role": "system", "content": system})
-            messages.append({"role": "user", "content": prompt})
-            
             # Call Groq API
             completion = self.groq_client.chat.completions.create(
                 model=self.groq_model,
@@ -80,7 +137,8 @@ class OnlineLLM:
             
             text = completion.choices[0].message.content
             
-            log_manager.log_llm_call("groq", self.groq_model, len(prompt), True)
+            log_manager.log_llm_call("groq", self.groq_model, prompt_length, True,
+                                     duration_ms=elapsed_ms(started), **_groq_usage(completion.usage))
             
             return {
                 "success": True,
@@ -90,7 +148,8 @@ class OnlineLLM:
             }
         
         except Exception as e:
-            log_manager.log_llm_call("groq", self.groq_model, len(prompt), False)
+            log_manager.log_llm_call("groq", self.groq_model, prompt_length, False,
+                                     duration_ms=elapsed_ms(started))
             logger.error(f"Groq generation failed: {e}")
             return {
                 "success": False,
@@ -98,32 +157,23 @@ class OnlineLLM:
                 "text": ""
             }
     
-    def _generate_gemini(self, prompt: str, system: Optional[str] = None,
-                        max_tokens: int = 8000, temperature: float = 0.7) -> Dict:
+    def _generate_gemini(self, messages: List[Dict[str, str]], max_tokens: int = 8000,
+                         temperature: float = 0.7) -> Dict:
         """Generate using Gemini API"""
         if not self.gemini_enabled:
             return {"success": False, "error": "Gemini not initialized", "text": ""}
         
+        prompt_length = sum(len(m['content']) for m in messages)
+        started = time.perf_counter()
         try:
-            # Create model
-            model = genai.GenerativeModel(
-                model_name=self.gemini_model,
-                generation_config={
-                    "temperature": temperature,
-                    "max_output_tokens": max_tokens,
-                }
-            )
-            
-            # Build full prompt
-            full_prompt = prompt
-            if system:
-                full_prompt = f"{system}\n\n{prompt}"
+            model, contents = self._gemini_request(messages, max_tokens, temperature)
             
             # Generate
-            response = model.generate_content(full_prompt)
+            response = model.generate_content(contents)
             text = response.text
             
-            log_manager.log_llm_call("gemini", self.gemini_model, len(prompt), True)
+            log_manager.log_llm_call("gemini", self.gemini_model, prompt_length, True,
+                                     duration_ms=elapsed_ms(started), **_gemini_usage(response))
             
             return {
                 "success": True,
@@ -133,7 +183,8 @@ class OnlineLLM:
             }
         
         except Exception as e:
-            log_manager.log_llm_call("gemini", self.gemini_model, len(prompt), False)
+            log_manager.log_llm_call("gemini", self.gemini_model, prompt_length, False,
+                                     duration_ms=elapsed_ms(started))
             logger.error(f"Gemini generation failed: {e}")
             return {
                 "success": False,
@@ -141,6 +192,99 @@ class OnlineLLM:
                 "text": ""
             }
     
+    def _stream_groq(self, messages: List[Dict[str, str]], on_chunk: Callable[[str], None],
+                     max_tokens: int = 8000, temperature: float = 0.7) -> Dict:
+        """Generate using Groq API, streaming deltas as they arrive"""
+        if not self.groq_client:
+            return {"success": False, "error": "Groq not initialized", "text": ""}
+        
+        prompt_length = sum(len(m['content']) for m in messages)
+        chunks = []
+        usage = {}
+        started = time.perf_counter()
+        try:
+            stream = self.groq_client.chat.completions.create(
+                model=self.groq_model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True
+            )
+            
+            for chunk in stream:
+                # Groq reports usage on the last chunk
+                usage = _groq_usage(getattr(getattr(chunk, "x_groq", None), "usage", None)) or usage
+                if not chunk.choices:
+                    continue
+                fragment = chunk.choices[0].delta.content
+                if fragment:
+                    chunks.append(fragment)
+                    on_chunk(fragment)
+            
+            log_manager.log_llm_call("groq", self.groq_model, prompt_length, True,
+                                     duration_ms=elapsed_ms(started), **usage)
+            
+            return {
+                "success": True,
+                "text": "".join(chunks),
+                "model": self.groq_model,
+                "provider": "groq",
+                "streamed": bool(chunks)
+            }
+        
+        except Exception as e:
+            log_manager.log_llm_call("groq", self.groq_model, prompt_length, False,
+                                     duration_ms=elapsed_ms(started))
+            logger.error(f"Groq streaming failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "text": "".join(chunks),
+                "streamed": bool(chunks)
+            }
+    
+    def _stream_gemini(self, messages: List[Dict[str, str]], on_chunk: Callable[[str], None],
+                       max_tokens: int = 8000, temperature: float = 0.7) -> Dict:
+        """Generate using Gemini API, streaming partial responses"""
+        if not self.gemini_enabled:
+            return {"success": False, "error": "Gemini not initialized", "text": ""}
+        
+        prompt_length = sum(len(m['content']) for m in messages)
+        chunks = []
+        usage = {}
+        started = time.perf_counter()
+        try:
+            model, contents = self._gemini_request(messages, max_tokens, temperature)
+            
+            for chunk in model.generate_content(contents, stream=True):
+                usage = _gemini_usage(chunk) or usage
+                fragment = chunk.text
+                if fragment:
+                    chunks.append(fragment)
+                    on_chunk(fragment)
+            
+            log_manager.log_llm_call("gemini", self.gemini_model, prompt_length, True,
+                                     duration_ms=elapsed_ms(started), **usage)
+            
+            return {
+                "success": True,
+                "text": "".join(chunks),
+                "model": self.gemini_model,
+                "provider": "gemini",
+                "streamed": bool(chunks)
+            }
+        
+        except Exception as e:
+            log_manager.log_llm_call("gemini", self.gemini_model, prompt_length, False,
+                                     duration_ms=elapsed_ms(started))
+            logger.error(f"Gemini streaming failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "text": "".join(chunks),
+                "streamed": bool(chunks)
+            }
+    
     def generate(self, prompt: str, system: Optional[str] = None,
                 max_tokens: int = 8000, temperature: float = 0.7,
                 use_fallback: bool = True) -> Dict:
@@ -157,53 +301,356 @@ class OnlineLLM:
         Returns:
             Dictionary with generated text
         """
-        # Try primary provider
+        return self.chat(self._to_messages(prompt, system), max_tokens, temperature,
+                         use_fallback=use_fallback)
+    
+    def generate_stream(self, prompt: str, on_chunk: Callable[[str], None],
+                        system: Optional[str] = None, max_tokens: int = 8000,
+                        temperature: float = 0.7, use_fallback: bool = True) -> Dict:
+        """
+        Generate using online LLM, streaming text fragments to on_chunk
+        
+        The fallback provider is only tried if the primary failed before
+        emitting any text, so a listener never hears a restarted answer.
+        
+        Args:
+            prompt: User prompt
+            on_chunk: Called with each text fragment as it is generated
+            system: System prompt
+            max_tokens: Max output tokens
+            temperature: Sampling temperature
+            use_fallback: Use fallback provider on failure
+        
+        Returns:
+            Dictionary with the full generated text
+        """
+        return self.chat_stream(self._to_messages(prompt, system), on_chunk, max_tokens,
+                                temperature, use_fallback=use_fallback)
+    
+    def chat(self, messages: List[Dict[str, str]], max_tokens: int = 8000,
+            temperature: float = 0.7, use_fallback: bool = True) -> Dict:
+        """
+        Chat with online LLM using message history
+        
+        The history is sent as native messages, not flattened into one prompt.
+        
+        Args:
+            messages: List of {role, content} dicts
+            max_tokens: Max output tokens
+            temperature: Sampling temperature
+            use_fallback: Use fallback provider on failure
+        
+        Returns:
+            Dictionary with response
+        """
+        generators = {"groq": self._generate_groq, "gemini": self._generate_gemini}
         result = None
         
-        if self.primary == "groq":
-            result = self._generate_groq(prompt, system, max_tokens, temperature)
-        elif self.primary == "gemini":
-            result = self._generate_gemini(prompt, system, max_tokens, temperature)
+        # Try primary provider
+        if self.primary in generators:
+            result = generators[self.primary](messages, max_tokens, temperature)
         
         # If failed and fallback is enabled, try fallback
-        if use_fallback and (not result or not result.get("success")):
+        if use_fallback and (not result or not result.get("success")) and self.fallback in generators:
             logger.info(f"Primary provider failed, trying fallback: {self.fallback}")
-            
-            if self.fallback == "groq":
-                result = self._generate_groq(prompt, system, max_tokens, temperature)
-            elif self.fallback == "gemini":
-                result = self._generate_gemini(prompt, system, max_tokens, temperature)
+            result = generators[self.fallback](messages, max_tokens, temperature)
         
         return result or {"success": False, "error": "No providers available", "text": ""}
     
-    def chat(self, messages: List[Dict[str, str]], max_tokens: int = 8000,
-            temperature: float = 0.7) -> Dict:
+    def chat_stream(self, messages: List[Dict[str, str]], on_chunk: Callable[[str], None],
+                    max_tokens: int = 8000, temperature: float = 0.7,
+                    use_fallback: bool = True) -> Dict:
         """
-        Chat with online LLM using message history
+        Chat with online LLM, streaming text fragments to on_chunk
+        
+        Args:
+            messages: List of {role, content} dicts
+            on_chunk: Called with each text fragment as it is generated
+            max_tokens: Max output tokens
+            temperature: Sampling temperature
+            use_fallback: Use fallback provider on failure
+        
+        Returns:
+            Dictionary with the full generated text
+        """
+        streamers = {"groq": self._stream_groq, "gemini": self._stream_gemini}
+        result = None
+        
+        if self.primary in streamers:
+            result = streamers[self.primary](messages, on_chunk, max_tokens, temperature)
+        
+        if (use_fallback and (not result or not result.get("success"))
+                and not (result and result.get("streamed"))
+                and self.fallback in streamers):
+            logger.info(f"Primary provider failed, trying fallback: {self.fallback}")
+            result = streamers[self.fallback](messages, on_chunk, max_tokens, temperature)
+        
+        return result or {"success": False, "error": "No providers available", "text": ""}
+
+    
+    # ========================
+    # Async API (non-blocking, for use on the event loop)
+    # ========================
+    
+    async def _generate_groq_async(self, messages: List[Dict[str, str]], max_tokens: int = 8000,
+                                   temperature: float = 0.7) -> Dict:
+        """Generate using Groq's async client"""
+        if not self.groq_async_client:
+            return {"success": False, "error": "Groq not initialized", "text": ""}
+        
+        prompt_length = sum(len(m['content']) for m in messages)
+        started = time.perf_counter()
+        try:
+            completion = await self.groq_async_client.chat.completions.create(
+                model=self.groq_model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            
+            log_manager.log_llm_call("groq", self.groq_model, prompt_length, True,
+                                     duration_ms=elapsed_ms(started), **_groq_usage(completion.usage))
+            
+            return {
+                "success": True,
+                "text": completion.choices[0].message.content,
+                "model": self.groq_model,
+                "provider": "groq"
+            }
+        
+        except Exception as e:
+            log_manager.log_llm_call("groq", self.groq_model, prompt_length, False,
+                                     duration_ms=elapsed_ms(started))
+            logger.error(f"Groq generation failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "text": ""
+            }
+    
+    async def _generate_gemini_async(self, messages: List[Dict[str, str]], max_tokens: int = 8000,
+                                     temperature: float = 0.7) -> Dict:
+        """Generate using Gemini's async API"""
+        if not self.gemini_enabled:
+            return {"success": False, "error": "Gemini not initialized", "text": ""}
+        
+        prompt_length = sum(len(m['content']) for m in messages)
+        started = time.perf_counter()
+        try:
+            model, contents = self._gemini_request(messages, max_tokens, temperature)
+            
+            response = await model.generate_content_async(contents)
+            
+            log_manager.log_llm_call("gemini", self.gemini_model, prompt_length, True,
+                                     duration_ms=elapsed_ms(started), **_gemini_usage(response))
+            
+            return {
+                "success": True,
+                "text": response.text,
+                "model": self.gemini_model,
+                "provider": "gemini"
+            }
+        
+        except Exception as e:
+            log_manager.log_llm_call("gemini", self.gemini_model, prompt_length, False,
+                                     duration_ms=elapsed_ms(started))
+            logger.error(f"Gemini generation failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "text": ""
+            }
+    
+    async def _stream_groq_async(self, messages: List[Dict[str, str]],
+                                 on_chunk: Callable[[str], None], max_tokens: int = 8000,
+                                 temperature: float = 0.7) -> Dict:
+        """Stream from Groq's async client"""
+        if not self.groq_async_client:
+            return {"success": False, "error": "Groq not initialized", "text": ""}
+        
+        prompt_length = sum(len(m['content']) for m in messages)
+        chunks = []
+        usage = {}
+        started = time.perf_counter()
+        try:
+            stream = await self.groq_async_client.chat.completions.create(
+                model=self.groq_model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True
+            )
+            
+            async for chunk in stream:
+                # Groq reports usage on the last chunk
+                usage = _groq_usage(getattr(getattr(chunk, "x_groq", None), "usage", None)) or usage
+                if not chunk.choices:
+                    continue
+                fragment = chunk.choices[0].delta.content
+                if fragment:
+                    chunks.append(fragment)
+                    on_chunk(fragment)
+            
+            log_manager.log_llm_call("groq", self.groq_model, prompt_length, True,
+                                     duration_ms=elapsed_ms(started), **usage)
+            
+            return {
+                "success": True,
+                "text": "".join(chunks),
+                "model": self.groq_model,
+                "provider": "groq",
+                "streamed": bool(chunks)
+            }
+        
+        except Exception as e:
+            log_manager.log_llm_call("groq", self.groq_model, prompt_length, False,
+                                     duration_ms=elapsed_ms(started))
+            logger.error(f"Groq streaming failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "text": "".join(chunks),
+                "streamed": bool(chunks)
+            }
+    
+    async def _stream_gemini_async(self, messages: List[Dict[str, str]],
+                                   on_chunk: Callable[[str], None], max_tokens: int = 8000,
+                                   temperature: float = 0.7) -> Dict:
+        """Stream from Gemini's async API"""
+        if not self.gemini_enabled:
+            return {"success": False, "error": "Gemini not initialized", "text": ""}
+        
+        prompt_length = sum(len(m['content']) for m in messages)
+        chunks = []
+        usage = {}
+        started = time.perf_counter()
+        try:
+            model, contents = self._gemini_request(messages, max_tokens, temperature)
+            
+            response = await model.generate_content_async(contents, stream=True)
+            async for chunk in response:
+                usage = _gemini_usage(chunk) or usage
+                fragment = chunk.text
+                if fragment:
+                    chunks.append(fragment)
+                    on_chunk(fragment)
+            
+            log_manager.log_llm_call("gemini", self.gemini_model, prompt_length, True,
+                                     duration_ms=elapsed_ms(started), **usage)
+            
+            return {
+                "success": True,
+                "text": "".join(chunks),
+                "model": self.gemini_model,
+                "provider": "gemini",
+                "streamed": bool(chunks)
+            }
+        
+        except Exception as e:
+            log_manager.log_llm_call("gemini", self.gemini_model, prompt_length, False,
+                                     duration_ms=elapsed_ms(started))
+            logger.error(f"Gemini streaming failed: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "text": "".join(chunks),
+                "streamed": bool(chunks)
+            }
+    
+    async def generate_async(self, prompt: str, system: Optional[str] = None,
+                             max_tokens: int = 8000, temperature: float = 0.7,
+                             use_fallback: bool = True) -> Dict:
+        """
+        Generate using online LLM with automatic fallback, without blocking
+        
+        Args:
+            prompt: User prompt
+            system: System prompt
+            max_tokens: Max output tokens
+            temperature: Sampling temperature
+            use_fallback: Use fallback provider on failure
+        
+        Returns:
+            Dictionary with generated text
+        """
+        return await self.chat_async(self._to_messages(prompt, system), max_tokens,
+                                     temperature, use_fallback=use_fallback)
+    
+    async def generate_stream_async(self, prompt: str, on_chunk: Callable[[str], None],
+                                    system: Optional[str] = None, max_tokens: int = 8000,
+                                    temperature: float = 0.7, use_fallback: bool = True) -> Dict:
+        """
+        Stream from online LLM without blocking (see generate_stream)
+        
+        Args:
+            prompt: User prompt
+            on_chunk: Called with each text fragment as it is generated
+            system: System prompt
+            max_tokens: Max output tokens
+            temperature: Sampling temperature
+            use_fallback: Use fallback provider on failure
+        
+        Returns:
+            Dictionary with the full generated text
+        """
+        return await self.chat_stream_async(self._to_messages(prompt, system), on_chunk,
+                                            max_tokens, temperature, use_fallback=use_fallback)
+    
+    async def chat_async(self, messages: List[Dict[str, str]], max_tokens: int = 8000,
+                         temperature: float = 0.7, use_fallback: bool = True) -> Dict:
+        """
+        Chat with online LLM without blocking (see chat)
         
         Args:
             messages: List of {role, content} dicts
             max_tokens: Max output tokens
             temperature: Sampling temperature
+            use_fallback: Use fallback provider on failure
         
         Returns:
             Dictionary with response
         """
-        # Extract system message if present
-        system = None
-        user_messages = []
+        generators = {"groq": self._generate_groq_async, "gemini": self._generate_gemini_async}
+        result = None
         
-        for msg in messages:
-            if msg['role'] == 'system':
-                system = msg['content']
-            else:
-                user_messages.append(msg)
+        if self.primary in generators:
+            result = await generators[self.primary](messages, max_tokens, temperature)
+        
+        if use_fallback and (not result or not result.get("success")) and self.fallback in generators:
+            logger.info(f"Primary provider failed, trying fallback: {self.fallback}")
+            result = await generators[self.fallback](messages, max_tokens, temperature)
+        
+        return result or {"success": False, "error": "No providers available", "text": ""}
+    
+    async def chat_stream_async(self, messages: List[Dict[str, str]],
+                                on_chunk: Callable[[str], None], max_tokens: int = 8000,
+                                temperature: float = 0.7, use_fallback: bool = True) -> Dict:
+        """
+        Chat with online LLM, streaming without blocking (see chat_stream)
         
-        # Build prompt from messages
-        prompt = "\n".join([f"{m['role']}: {m['content']}" for m in user_messages])
+        Args:
+            messages: List of {role, content} dicts
+            on_chunk: Called with each text fragment as it is generated
+            max_tokens: Max output tokens
+            temperature: Sampling temperature
+            use_fallback: Use fallback provider on failure
         
-        return self.generate(prompt, system=system, max_tokens=max_tokens,
-                           temperature=temperature)
+        Returns:
+            Dictionary with the full generated text
+        """
+        streamers = {"groq": self._stream_groq_async, "gemini": self._stream_gemini_async}
+        result = None
+        
+        if self.primary in streamers:
+            result = await streamers[self.primary](messages, on_chunk, max_tokens, temperature)
+        
+        if (use_fallback and (not result or not result.get("success"))
+                and not (result and result.get("streamed"))
+                and self.fallback in streamers):
+            logger.info(f"Primary provider failed, trying fallback: {self.fallback}")
+            result = await streamers[self.fallback](messages, on_chunk, max_tokens, temperature)
+        
+        return result or {"success": False, "error": "No providers available", "text": ""}
 
 
 # Global online LLM instance
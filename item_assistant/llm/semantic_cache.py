@@ -0,0 +1,305 @@
+"""
+Semantic Cache
+Reuses answers to near-duplicate general queries using embedding similarity.
+"""
+
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+from item_assistant.llm.local_llm import get_local_llm
+from item_assistant.llm.health_monitor import get_health_monitor
+
+logger = get_logger()
+
+# Filler ignored by the local stand-in embedding. Question words, auxiliaries
+# (tense) and negation are kept: "who won" and "why did they win" must differ
+_STOPWORDS = frozenset("a an the please hey".split())
+
+# Contractions expanded so "what's" matches "what is" and "isn't" keeps its "not"
+_CONTRACTIONS = (
+    (re.compile(r"n't\b"), " not"),
+    (re.compile(r"'s\b"), " is"),
+    (re.compile(r"'re\b"), " are"),
+    (re.compile(r"'ll\b"), " will"),
+    (re.compile(r"'ve\b"), " have"),
+    (re.compile(r"'d\b"), " would"),
+)
+
+# Questions whose answers change over time are never cached
+_VOLATILE_QUERY = re.compile(
+    r"\b(now|today|tonight|tomorrow|yesterday|current|currently|latest|recent|"
+    r"news|weather|time|date|price|score)\b"
+)
+
+
+class VectorIndex:
+    """Fixed-capacity matrix of unit vectors with per-row metadata"""
+    
+    def __init__(self, dim: int, capacity: int):
+        """
+        Initialize vector index
+        
+        Args:
+            dim: Vector dimension
+            capacity: Maximum number of rows
+        """
+        self.dim = dim
+        self.capacity = capacity
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.entries: List[Dict] = []
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def search(self, vector: np.ndarray) -> Tuple[int, float]:
+        """
+        Find the most similar row
+        
+        Args:
+            vector: Unit query vector
+        
+        Returns:
+            Tuple of (row index, cosine similarity), (-1, 0.0) if empty
+        """
+        if not self.entries:
+            return -1, 0.0
+        scores = self.vectors[:len(self.entries)] @ vector
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+    
+    def add(self, vector: np.ndarray, entry: Dict):
+        """Add a row, evicting the least recently used one when full"""
+        if len(self.entries) < self.capacity:
+            row = len(self.entries)
+            self.entries.append(entry)
+        else:
+            row = min(range(len(self.entries)), key=lambda i: self.entries[i]["last_used"])
+            self.entries[row] = entry
+        self.vectors[row] = vector
+    
+    def remove(self, row: int):
+        """Remove a row by moving the last row into its slot"""
+        last = len(self.entries) - 1
+        if row != last:
+            self.vectors[row] = self.vectors[last]
+            self.entries[row] = self.entries[last]
+        self.entries.pop()
+
+
+class SemanticCache:
+    """Caches LLM answers and serves them for semantically similar queries"""
+    
+    def __init__(self):
+        """Initialize semantic cache"""
+        self.config = get_config()
+        self.local_llm = get_local_llm()
+        self.health_monitor = get_health_monitor()
+        
+        self.enabled = self.config.get("llm.semantic_cache.enabled", True)
+        self.threshold = self.config.get("llm.semantic_cache.similarity_threshold", 0.92)
+        self.max_entries = self.config.get("llm.semantic_cache.max_entries", 500)
+        self.ttl = self.config.get("llm.semantic_cache.ttl_hours", 24) * 3600
+        self.use_ollama = self.config.get("llm.semantic_cache.use_ollama_embeddings", True)
+        self.hash_dim = self.config.get("llm.semantic_cache.fallback_dimensions", 512)
+        self.hash_threshold = self.config.get("llm.semantic_cache.fallback_similarity_threshold", 0.97)
+        
+        # Vectors from different embedding models are not comparable, so
+        # each embedding space gets its own index
+        self.indices: Dict[str, VectorIndex] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.ollama_retry_at = 0.0
+        
+        logger.info(f"Semantic cache initialized (threshold: {self.threshold}, enabled: {self.enabled})")
+    
+    def _hash_embedding(self, text: str) -> np.ndarray:
+        """
+        Local stand-in embedding: signed feature hashing of words and word pairs
+        
+        Only near-verbatim rephrasings ("What's the capital of France?" vs
+        "what is the capital of france") end up close. Word pairs keep word
+        order, so "who was X" and "who is X" or "why did" and "why didn't"
+        stay apart; unlike a learned embedding it has no notion of synonyms,
+        so it is paired with a stricter threshold.
+        
+        Args:
+            text: Text to embed
+        
+        Returns:
+            Unnormalized vector of length hash_dim
+        """
+        text = text.lower().replace("\u2019", "'")
+        for pattern, replacement in _CONTRACTIONS:
+            text = pattern.sub(replacement, text)
+        words = [w for w in re.sub(r"[^\w\s]", " ", text).split() if w not in _STOPWORDS]
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        
+        vector = np.zeros(self.hash_dim, dtype=np.float32)
+        for feature in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.hash_dim] += 1.0 if (h >> 16) & 1 else -1.0
+        return vector
+    
+    def embed(self, query: str) -> Optional[Tuple[str, np.ndarray]]:
+        """
+        Embed a query for lookup/storage
+        
+        Args:
+            query: User query
+        
+        Returns:
+            Tuple of (embedding space, unit vector), or None if the query
+            should not be cached
+        """
+        if not self._is_cacheable(query):
+            return None
+        
+        raw = self.local_llm.embed(query) if self._ollama_usable() else None
+        return self._finish_embedding(query, raw)
+    
+    async def embed_async(self, query: str) -> Optional[Tuple[str, np.ndarray]]:
+        """
+        Embed a query without blocking the event loop (see embed)
+        
+        Args:
+            query: User query
+        
+        Returns:
+            Tuple of (embedding space, unit vector), or None
+        """
+        if not self._is_cacheable(query):
+            return None
+        
+        raw = await self.local_llm.embed_async(query) if self._ollama_usable() else None
+        return self._finish_embedding(query, raw)
+    
+    def _is_cacheable(self, query: str) -> bool:
+        """Check whether answers to this query may be cached at all"""
+        return self.enabled and not _VOLATILE_QUERY.search(query.lower())
+    
+    def _ollama_usable(self) -> bool:
+        """Check whether Ollama embeddings should be attempted"""
+        return (self.use_ollama and time.time() >= self.ollama_retry_at
+                and self.health_monitor.is_available("local"))
+    
+    def _finish_embedding(self, query: str,
+                          raw: Optional[List[float]]) -> Optional[Tuple[str, np.ndarray]]:
+        """
+        Normalize an Ollama embedding, or fall back to the hashed stand-in
+        
+        Args:
+            query: User query
+            raw: Ollama embedding, or None if unavailable
+        
+        Returns:
+            Tuple of (embedding space, unit vector), or None
+        """
+        if raw:
+            vector = np.asarray(raw, dtype=np.float32)
+            space = f"ollama:{self.local_llm.embedding_model}"
+        else:
+            if self._ollama_usable():
+                # Embedding model missing or failing; don't retry on every query
+                self.ollama_retry_at = time.time() + 300
+            vector = self._hash_embedding(query)
+            space = f"hash:{self.hash_dim}"
+        
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return space, vector / norm
+    
+    def lookup(self, embedding: Optional[Tuple[str, np.ndarray]]) -> Optional[Dict]:
+        """
+        Find a fresh cached answer above the similarity threshold
+        
+        Args:
+            embedding: Result of embed()
+        
+        Returns:
+            Dict with "answer", "query" and "similarity", or None on a miss
+        """
+        if embedding is None:
+            return None
+        
+        space, vector = embedding
+        with self.lock:
+            index = self.indices.get(space)
+            if index is None:
+                self.misses += 1
+                return None
+            
+            threshold = self.hash_threshold if space.startswith("hash:") else self.threshold
+            row, score = index.search(vector)
+            if row < 0 or score < threshold:
+                self.misses += 1
+                return None
+            
+            entry = index.entries[row]
+            if time.time() - entry["created_at"] > self.ttl:
+                index.remove(row)
+                self.misses += 1
+                return None
+            
+            entry["last_used"] = time.time()
+            self.hits += 1
+            logger.info(f"[CACHE] Semantic hit ({score:.3f}) for '{entry['query']}'")
+            return {"answer": entry["answer"], "query": entry["query"], "similarity": round(score, 3)}
+    
+    def store(self, query: str, answer: str,
+              embedding: Optional[Tuple[str, np.ndarray]]):
+        """
+        Cache an answer
+        
+        Args:
+            query: User query
+            answer: LLM answer
+            embedding: Result of embed() for the query
+        """
+        if embedding is None or not answer:
+            return
+        
+        space, vector = embedding
+        now = time.time()
+        with self.lock:
+            index = self.indices.get(space)
+            if index is None or index.dim != len(vector):
+                index = VectorIndex(len(vector), self.max_entries)
+                self.indices[space] = index
+            index.add(vector, {"query": query, "answer": answer,
+                               "created_at": now, "last_used": now})
+    
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with entry counts and hit/miss counters
+        """
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "entries": {space: len(index) for space, index in self.indices.items()},
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+# Global semantic cache instance
+_semantic_cache_instance = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Get the global semantic cache instance"""
+    global _semantic_cache_instance
+    if _semantic_cache_instance is None:
+        _semantic_cache_instance = SemanticCache()
+    return _semantic_cache_instance
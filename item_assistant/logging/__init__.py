@@ -1,5 +1,11 @@
 """Logging module initialization"""
 
+from .metrics import MetricsRegistry, get_metrics, elapsed_ms
+from .tracing import Tracer, get_tracer
 from .log_manager import LogManager, get_logger, get_log_manager
 
-__all__ = ['LogManager', 'get_logger', 'get_log_manager']
+__all__ = [
+    'LogManager', 'get_logger', 'get_log_manager',
+    'MetricsRegistry', 'get_metrics', 'elapsed_ms',
+    'Tracer', 'get_tracer',
+]
@@ -12,6 +12,8 @@ from logging.handlers import RotatingFileHandler
 from typing import Optional
 
 from item_assistant.config import get_config
+from item_assistant.logging.metrics import get_metrics
+from item_assistant.logging.tracing import TraceContextFilter
 
 
 class LogManager:
@@ -43,14 +45,17 @@ class LogManager:
         
         # Get log format
         log_format = self.config.get("logging.format",
-                                     "[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s")
+                                     "[%(asctime)s] [%(levelname)s] [%(trace_id)s] %(message)s")
         formatter = logging.Formatter(log_format, datefmt="%Y-%m-%d %H:%M:%S")
+        # Lets formats use %(trace_id)s / %(span_id)s to correlate lines of one command
+        trace_filter = TraceContextFilter()
         
         # Console handler
         if self.config.get("logging.console_output", True):
             console_handler = logging.StreamHandler(sys.stdout)
             console_handler.setLevel(log_level)
             console_handler.setFormatter(formatter)
+            console_handler.addFilter(trace_filter)
             logger.addHandler(console_handler)
         
         # File handler with rotation
@@ -70,6 +75,7 @@ class LogManager:
             )
             file_handler.setLevel(log_level)
             file_handler.setFormatter(formatter)
+            file_handler.addFilter(trace_filter)
             logger.addHandler(file_handler)
         
         logger.info("=" * 80)
@@ -122,18 +128,31 @@ class LogManager:
         response_str = "CONFIRMED" if user_response else "DENIED"
         self.logger.info(f"CONFIRMATION [{response_str}]: {prompt}")
     
-    def log_llm_call(self, provider: str, model: str, prompt_length: int, success: bool):
+    def log_llm_call(self, provider: str, model: str, prompt_length: int, success: bool,
+                     duration_ms: Optional[float] = None, prompt_tokens: Optional[int] = None,
+                     completion_tokens: Optional[int] = None):
         """
-        Log an LLM API call
+        Log an LLM API call and record it in the metrics
         
         Args:
             provider: LLM provider ("local", "groq", "gemini")
             model: Model name
             prompt_length: Length of prompt in characters
             success: Whether call succeeded
+            duration_ms: Wall-clock duration of the call (optional)
+            prompt_tokens: Input tokens reported by the provider (optional)
+            completion_tokens: Output tokens reported by the provider (optional)
         """
         status = "SUCCESS" if success else "FAILED"
-        self.logger.info(f"LLM [{provider}/{model}] {status}: prompt_length={prompt_length}")
+        details = f"prompt_length={prompt_length}"
+        if duration_ms is not None:
+            details += f" duration_ms={duration_ms:.0f}"
+        if prompt_tokens is not None or completion_tokens is not None:
+            details += f" tokens={prompt_tokens or 0}/{completion_tokens or 0}"
+        self.logger.info(f"LLM [{provider}/{model}] {status}: {details}")
+        
+        get_metrics().record_llm_call(provider, model, success, duration_ms,
+                                      prompt_tokens, completion_tokens)
     
     def log_error(self, error_type: str, message: str, exception: Optional[Exception] = None):
         """
@@ -0,0 +1,285 @@
+"""
+Metrics
+In-process counters and histograms exposed in the Prometheus text format.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from item_assistant.logging.tracing import get_tracer
+
+# Seconds; spans a single wake-word frame up to a slow cloud generation
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Pipeline stages timed by the assistant, in the order a voice command goes through them
+STAGES = ("wake_word", "stt_record", "stt_transcribe", "intent_parse", "action_execute", "tts")
+
+
+def elapsed_ms(started: float) -> float:
+    """Milliseconds since a time.perf_counter() reading"""
+    return (time.perf_counter() - started) * 1000
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render {name="value",...}"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value ("+Inf" style for infinities, integers without .0)"""
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0, **labels):
+        """
+        Increase the counter
+        
+        Args:
+            amount: Non-negative increment
+            **labels: Label values (missing labels are recorded as "")
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+    
+    def render(self) -> List[str]:
+        """Text-format lines for this counter"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with a fixed set of label names"""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self.series: Dict[Tuple[str, ...], list] = {}
+        self.lock = threading.Lock()
+    
+    def observe(self, value: float, **labels):
+        """
+        Record one observation
+        
+        Args:
+            value: Observed value (seconds for durations)
+            **labels: Label values (missing labels are recorded as "")
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    def render(self) -> List[str]:
+        """Text-format lines for this histogram"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self.series.items()}
+        
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the assistant's metrics and renders them for scraping"""
+    
+    def __init__(self, namespace: str = "item"):
+        """
+        Initialize metrics registry
+        
+        Args:
+            namespace: Prefix for every metric name
+        """
+        self.namespace = namespace
+        self.metrics: Dict[str, object] = {}
+        self.lock = threading.Lock()
+        
+        self.stage_duration = self.histogram(
+            "stage_duration_seconds",
+            "Time spent in each pipeline stage",
+            ("stage", "provider", "intent")
+        )
+        self.commands = self.counter(
+            "commands_total",
+            "Commands processed",
+            ("source", "status")
+        )
+        self.llm_requests = self.counter(
+            "llm_requests_total",
+            "LLM calls by outcome",
+            ("provider", "model", "status")
+        )
+        self.llm_duration = self.histogram(
+            "llm_request_duration_seconds",
+            "Wall-clock duration of LLM calls",
+            ("provider", "model")
+        )
+        self.llm_tokens = self.counter(
+            "llm_tokens_total",
+            "Tokens reported by LLM providers",
+            ("provider", "model", "kind")
+        )
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """
+        Get or create a counter
+        
+        Args:
+            name: Metric name without the namespace prefix
+            documentation: HELP text
+            labelnames: Label names
+        
+        Returns:
+            Counter
+        """
+        return self._register(Counter, name, documentation, labelnames)
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """
+        Get or create a histogram
+        
+        Args:
+            name: Metric name without the namespace prefix
+            documentation: HELP text
+            labelnames: Label names
+            buckets: Upper bounds of the buckets
+        
+        Returns:
+            Histogram
+        """
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+    
+    def _register(self, kind, name: str, documentation: str, labelnames: Sequence[str], *args):
+        """Create a metric once; later calls return the same object"""
+        full_name = f"{self.namespace}_{name}"
+        with self.lock:
+            metric = self.metrics.get(full_name)
+            if metric is None:
+                metric = self.metrics[full_name] = kind(full_name, documentation, labelnames, *args)
+            elif not isinstance(metric, kind):
+                raise ValueError(f"Metric {full_name} already registered as {type(metric).__name__}")
+            return metric
+    
+    def observe_stage(self, stage: str, seconds: float, **labels):
+        """
+        Record the duration of a pipeline stage
+        
+        Args:
+            stage: One of STAGES
+            seconds: Duration
+            **labels: Optional provider/intent labels
+        """
+        self.stage_duration.observe(seconds, stage=stage, **labels)
+    
+    @contextmanager
+    def stage(self, stage: str, **labels) -> Iterator[Dict[str, str]]:
+        """
+        Time a block as a pipeline stage (also recorded as a trace span)
+        
+        The yielded dict can be updated inside the block to set labels that
+        are only known afterwards (e.g. which STT provider answered).
+        
+        Args:
+            stage: One of STAGES
+            **labels: Optional provider/intent labels
+        """
+        started = time.perf_counter()
+        with get_tracer().span(stage) as span:
+            try:
+                yield labels
+            finally:
+                self.observe_stage(stage, time.perf_counter() - started, **labels)
+                if span is not None:
+                    span.attributes.update(labels)
+    
+    def record_llm_call(self, provider: str, model: str, success: bool,
+                        duration_ms: Optional[float] = None,
+                        prompt_tokens: Optional[int] = None,
+                        completion_tokens: Optional[int] = None):
+        """
+        Record one LLM call
+        
+        Args:
+            provider: LLM provider ("local", "groq", "gemini")
+            model: Model name
+            success: Whether the call succeeded
+            duration_ms: Wall-clock duration
+            prompt_tokens: Input tokens, if the provider reported them
+            completion_tokens: Output tokens, if the provider reported them
+        """
+        self.llm_requests.inc(provider=provider, model=model, status="success" if success else "error")
+        if duration_ms is not None:
+            self.llm_duration.observe(duration_ms / 1000, provider=provider, model=model)
+        if prompt_tokens:
+            self.llm_tokens.inc(prompt_tokens, provider=provider, model=model, kind="prompt")
+        if completion_tokens:
+            self.llm_tokens.inc(completion_tokens, provider=provider, model=model, kind="completion")
+    
+    def render(self) -> str:
+        """
+        Render every metric
+        
+        Returns:
+            Prometheus text exposition format (version 0.0.4)
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry instance
+_metrics_instance = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the global metrics registry instance"""
+    global _metrics_instance
+    if _metrics_instance is None:
+        _metrics_instance = MetricsRegistry()
+    return _metrics_instance
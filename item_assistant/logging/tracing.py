@@ -0,0 +1,290 @@
+"""
+Tracing
+Lightweight trace/span context for following one command across threads and event loops.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from item_assistant.config import get_config
+
+# Span of the code currently running; asyncio tasks inherit it automatically,
+# threads and executors only through Tracer.wrap()
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "item_current_span", default=None
+)
+
+
+def _new_id(nbytes: int) -> str:
+    """Random lowercase hex id (16 bytes for traces, 8 for spans, as in OTLP)"""
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    """One timed operation within a trace"""
+    
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.thread = threading.current_thread().name
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+    
+    def set_attribute(self, key: str, value):
+        """Attach a value to the span"""
+        self.attributes[key] = value
+    
+    def end(self):
+        """Close the span (only the first call counts)"""
+        if self.end_time is None:
+            self.end_time = self.start_time + (time.perf_counter() - self._started)
+    
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Duration, or None while the span is open"""
+        if self.end_time is None:
+            return None
+        return round((self.end_time - self.start_time) * 1000, 2)
+    
+    def to_dict(self) -> Dict:
+        """JSON-friendly representation"""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "thread": self.thread,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error
+        }
+    
+    def to_otlp(self) -> Dict:
+        """OTLP/JSON span representation"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(int(self.start_time * 1e9)),
+            "endTimeUnixNano": str(int((self.end_time or time.time()) * 1e9)),
+            "attributes": [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in dict(self.attributes, thread=self.thread).items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class TraceContextFilter(logging.Filter):
+    """Adds trace_id and span_id to every log record ("-" outside a trace)"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = _current_span.get()
+        record.trace_id = span.trace_id[:16] if span else "-"
+        record.span_id = span.span_id if span else "-"
+        return True
+
+
+class Tracer:
+    """Creates spans, keeps recent traces in memory and exports finished spans"""
+    
+    def __init__(self):
+        """Initialize tracer"""
+        self.config = get_config()
+        
+        self.enabled = self.config.get("logging.tracing.enabled", True)
+        self.max_traces = self.config.get("logging.tracing.recent_traces", 50)
+        self.exporter = self.config.get("logging.tracing.exporter", "none")  # none, json, otlp
+        self.otlp_endpoint = self.config.get("logging.tracing.otlp_endpoint",
+                                             "http://localhost:4318/v1/traces")
+        self.service_name = self.config.get("logging.tracing.service_name", "item-assistant")
+        log_dir = Path(self.config.get("system.log_directory", "."))
+        self.json_path = log_dir / self.config.get("logging.tracing.file", "traces.jsonl")
+        
+        # trace_id -> finished spans, oldest trace first
+        self.traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self.lock = threading.Lock()
+        
+        self.export_queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self.export_thread: Optional[threading.Thread] = None
+        if self.enabled and self.exporter in ("json", "otlp"):
+            self.export_thread = threading.Thread(target=self._export_loop,
+                                                  name="trace-exporter", daemon=True)
+            self.export_thread.start()
+    
+    def current_span(self) -> Optional[Span]:
+        """Get the span of the running code, if any"""
+        return _current_span.get()
+    
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """
+        Run a block inside a new span
+        
+        The span is a child of the current span, or starts a new trace if
+        there is none. Exceptions are recorded on the span and re-raised.
+        
+        Args:
+            name: Operation name (e.g. "intent_parse")
+            **attributes: Initial span attributes
+        
+        Yields:
+            The span (None when tracing is disabled)
+        """
+        if not self.enabled:
+            yield None
+            return
+        
+        parent = _current_span.get()
+        span = Span(name, parent.trace_id if parent else _new_id(16),
+                    parent.span_id if parent else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            self._finish(span)
+    
+    def wrap(self, func: Callable) -> Callable:
+        """
+        Bind a callable to the current context so a thread or executor
+        running it continues the current trace
+        
+        Args:
+            func: Callable to run elsewhere
+        
+        Returns:
+            Callable that runs func in a copy of the caller's context
+        """
+        context = contextvars.copy_context()
+        
+        @functools.wraps(func)
+        def run_in_context(*args, **kwargs):
+            # A context can only be entered by one thread at a time
+            return context.copy().run(func, *args, **kwargs)
+        
+        return run_in_context
+    
+    def _finish(self, span: Span):
+        """Keep a finished span for /api/traces/recent and queue it for export"""
+        with self.lock:
+            spans = self.traces.get(span.trace_id)
+            if spans is None:
+                spans = self.traces[span.trace_id] = []
+                while len(self.traces) > self.max_traces:
+                    self.traces.popitem(last=False)
+            spans.append(span)
+        
+        if self.export_thread is not None:
+            try:
+                self.export_queue.put_nowait(span)
+            except queue.Full:
+                pass
+    
+    def recent(self, limit: int = 20) -> List[Dict]:
+        """
+        Get the most recent traces
+        
+        Args:
+            limit: Maximum number of traces
+        
+        Returns:
+            Newest first; each has trace_id, root name, overall duration and
+            spans in start order
+        """
+        with self.lock:
+            traces = [(trace_id, list(spans)) for trace_id, spans in self.traces.items()][-limit:]
+        
+        result = []
+        for trace_id, spans in reversed(traces):
+            spans.sort(key=lambda s: s.start_time)
+            root = next((s for s in spans if s.parent_id is None), spans[0])
+            # The root may end early (the wake-word span hands off to another thread)
+            end_time = max(s.end_time for s in spans)
+            result.append({
+                "trace_id": trace_id,
+                "name": root.name,
+                "start_time": spans[0].start_time,
+                "duration_ms": round((end_time - spans[0].start_time) * 1000, 2),
+                "spans": [s.to_dict() for s in spans]
+            })
+        return result
+    
+    def _export_loop(self):
+        """Background loop: batch finished spans and hand them to the exporter"""
+        while True:
+            batch = [self.export_queue.get()]
+            # Collect whatever else finished within the next moment
+            deadline = time.time() + 1.0
+            while len(batch) < 512:
+                try:
+                    batch.append(self.export_queue.get(timeout=max(0.0, deadline - time.time())))
+                except queue.Empty:
+                    break
+            try:
+                if self.exporter == "json":
+                    self._export_json(batch)
+                else:
+                    self._export_otlp(batch)
+            except Exception as e:
+                logging.getLogger("item_assistant").warning(f"Trace export failed: {e}")
+    
+    def _export_json(self, batch: List[Span]):
+        """Append spans to a JSON Lines file"""
+        with open(self.json_path, 'a', encoding='utf-8') as f:
+            for span in batch:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+    
+    def _export_otlp(self, batch: List[Span]):
+        """Send spans to an OTLP/HTTP collector as JSON"""
+        # Imported here: the HTTP pool depends on logging, which imports this module
+        from item_assistant.utils.http_pool import get_http_session
+        
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "item_assistant"},
+                    "spans": [span.to_otlp() for span in batch]
+                }]
+            }]
+        }
+        get_http_session().post(self.otlp_endpoint, json=payload, timeout=5)
+
+
+# Global tracer instance
+_tracer_instance = None
+
+
+def get_tracer() -> Tracer:
+    """Get the global tracer instance"""
+    global _tracer_instance
+    if _tracer_instance is None:
+        _tracer_instance = Tracer()
+    return _tracer_instance
@@ -4,16 +4,15 @@ OPTIMIZED: Continuous wake word listening, synchronous transcription
 WITH: Desktop slide-up UI panel
 """
 
-import asyncio
 import threading
 import sys
 from pathlib import Path
 
 from item_assistant.config import get_config
-from item_assistant.logging import get_logger
-from item_assistant.voice import get_wake_word_detector, get_stt, get_tts
-from item_assistant.api import start_server
-from item_assistant.core import get_orchestrator
+from item_assistant.logging import get_logger, get_tracer
+from item_assistant.voice import get_wake_word_detector, get_stt, get_tts, get_audio_capture
+from item_assistant.api import start_server_async
+from item_assistant.core import get_orchestrator, get_status_collector, get_runtime
 from item_assistant.ui.state import get_ui_state_manager, AssistantState
 from item_assistant.ui.panel import get_slide_up_panel
 
@@ -34,6 +33,9 @@ class ItemAssistant:
         self.tts = get_tts()
         self.stt = get_stt()
         
+        # One event loop for voice commands and the API server
+        self.runtime = get_runtime()
+        
         # UI components
         self.ui_state_manager = get_ui_state_manager()
         self.slide_up_panel = None
@@ -60,25 +62,42 @@ class ItemAssistant:
         
         # CRITICAL: Run command processing in a separate thread to avoid blocking audio loop
         command_thread = threading.Thread(
-            target=self._handle_command_async,
+            target=get_tracer().wrap(self._handle_command_traced),
             daemon=True
         )
         command_thread.start()
     
+    def _handle_command_traced(self):
+        """Handle a voice command inside a span covering STT through the reply"""
+        with get_tracer().span("voice_command"):
+            self._handle_command_async()
+    
     def _handle_command_async(self):
         """Handle command processing in separate thread (non-blocking)"""
         try:
             logger.info("[PROCESS] Starting command processing thread")
             logger.info("[LISTEN] Wake word detected! Listening for command...")
             
-            # Step 1: Speak acknowledgment
-            logger.info("[TTS] Speaking acknowledgment...")
-            self.tts.speak("Yes?", wait=False)
-            logger.info("[TTS] Acknowledgment spoken")
+            # Without a spoken acknowledgment the command is read from
+            # right where the wake word ended
+            start_position = None
+            if self.wake_word_detector:
+                start_position = self.wake_word_detector.last_wake_position
+                self.wake_word_detector.last_wake_position = None
+            
+            # Step 1: Speak acknowledgment, and record only what follows it
+            # so the prompt never leaks into the command audio
+            if self.tts.enabled and self.tts.engine is not None:
+                logger.info("[TTS] Speaking acknowledgment...")
+                self.tts.speak("Yes?", wait=True)
+                logger.info("[TTS] Acknowledgment spoken")
+                capture = get_audio_capture()
+                # Offset the reader's pre-roll, which would reach back into the prompt
+                start_position = capture.position + capture.pre_roll if capture.is_running() else None
             
             # Step 2: Record and transcribe with detailed logging
-            logger.info("[STT] Calling listen_and_transcribe(duration=3)...")
-            result = self.stt.listen_and_transcribe(duration=3)
+            logger.info("[STT] Calling listen_and_transcribe()...")
+            result = self.stt.listen_and_transcribe(start_position=start_position)
             logger.info(f"[STT] Result received: {result}")
             
             if not result:
@@ -107,8 +126,9 @@ class ItemAssistant:
                 logger.info("[EXEC] Processing command with orchestrator...")
                 try:
                     logger.info(f"[EXEC] Calling orchestrator.process_command('{command}', source='laptop')")
-                    result = asyncio.run(
-                        self.orchestrator.process_command(command, source="laptop")
+                    result = self.runtime.run(
+                        # Spoken commands form one ongoing conversation
+                        self.orchestrator.process_command(command, source="laptop", session_id="laptop")
                     )
                     logger.info(f"[EXEC] Command executed successfully: {result}")
                 except Exception as exec_error:
@@ -152,15 +172,34 @@ class ItemAssistant:
         listener_thread.start()
         logger.info("[VOICE] Voice listener started (continuous mode)")
     
+    def _audio_health(self) -> dict:
+        """Audio pipeline section of the status snapshot (no I/O)"""
+        detector = self.wake_word_detector
+        return {
+            "wake_word": bool(detector and detector.porcupine is not None),
+            "listening": bool(detector and detector.is_listening),
+            "processing_command": self.processing_command,
+            "stt_online": self.stt.groq_client is not None,
+            "stt_offline": self.stt.offline.ready,
+            "stt_offline_engine": self.stt.offline.stats(),
+            "tts": bool(self.tts.enabled and self.tts.engine is not None),
+            "capture": get_audio_capture().stats()
+        }
+    
     def start_api_server(self):
-        """Start API server in background thread"""
-        api_thread = threading.Thread(
-            target=start_server,
-            daemon=True
-        )
-        api_thread.start()
+        """Start API server on the shared runtime loop"""
+        api_future = self.runtime.submit(start_server_async())
+        api_future.add_done_callback(self._on_api_server_exit)
         logger.info("[API] API server started")
     
+    def _on_api_server_exit(self, future):
+        """Log why the API server stopped (it should run until shutdown)"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error:
+            logger.error(f"[API] API server stopped: {error}")
+    
     def _on_ui_mic_click(self):
         """Handle mic button click from UI"""
         logger.info("[MIC] Manual mic activation from UI")
@@ -198,6 +237,7 @@ class ItemAssistant:
             logger.info("[START] Starting Item AI Assistant...")
             
             # Start API server
+            get_status_collector().register_source("audio", self._audio_health)
             self.start_api_server()
             
             # Start UI panel
@@ -237,12 +277,15 @@ class ItemAssistant:
         
         if self.wake_word_detector:
             self.wake_word_detector.cleanup()
+        get_audio_capture().stop()
         
         if self.slide_up_panel:
             self.slide_up_panel.stop()
         
         self.tts.speak("Goodbye!")
         
+        self.runtime.stop()
+        
         logger.info("[OK] Item AI Assistant shut down")
         sys.exit(0)
 
@@ -3,7 +3,7 @@ UI Module for Item AI Assistant
 Provides desktop slide-up panel for status and interaction.
 """
 
-from item_assistant.ui.state import UIStateManager, AssistantState
+from item_assistant.ui.state import UIStateManager, AssistantState, StateSubscription
 from item_assistant.ui.panel import SlideUpPanel
 
-__all__ = ["UIStateManager", "AssistantState", "SlideUpPanel"]
+__all__ = ["UIStateManager", "AssistantState", "StateSubscription", "SlideUpPanel"]
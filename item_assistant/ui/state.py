@@ -3,8 +3,10 @@ UI State Management for Item AI Assistant
 Manages assistant state and broadcasts updates to UI components.
 """
 
+import asyncio
+import time
 from enum import Enum
-from typing import Optional, Callable, List
+from typing import Optional, Callable, List, Dict
 from threading import Lock
 from item_assistant.logging import get_logger
 
@@ -19,6 +21,57 @@ class AssistantState(Enum):
     SPEAKING = "Speaking"
 
 
+class StateSubscription:
+    """Bounded event queue for one remote subscriber"""
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        """
+        Initialize subscription
+        
+        Args:
+            loop: Event loop the subscriber reads on
+            maxsize: Events buffered before the oldest are dropped
+        """
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+    
+    def push(self, event: Dict) -> bool:
+        """
+        Hand an event to the subscriber's loop without waiting (any thread)
+        
+        Returns:
+            False if the subscriber's loop is gone
+        """
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+            return True
+        except RuntimeError:
+            return False
+    
+    def _put(self, event: Dict):
+        """Enqueue on the subscriber's loop, dropping the oldest event when full"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+    
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Wait for the next event
+        
+        Args:
+            timeout: Seconds to wait
+        
+        Returns:
+            Event dict, or None on timeout
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
 class UIStateManager:
     """Manages UI state and broadcasts updates to listeners"""
     
@@ -28,6 +81,8 @@ class UIStateManager:
         self.last_user_text: Optional[str] = None
         self.last_assistant_text: Optional[str] = None
         self.listeners: List[Callable] = []
+        self.subscribers: List[StateSubscription] = []
+        self.sequence = 0
         self.lock = Lock()
         
         logger.info("UI State Manager initialized")
@@ -79,6 +134,66 @@ class UIStateManager:
                 listener(state, user_text, assistant_text)
             except Exception as e:
                 logger.error(f"Error calling UI listener: {e}")
+        
+        self.publish_event("state", {
+            "state": state.value,
+            "user_text": user_text,
+            "assistant_text": assistant_text
+        })
+    
+    def subscribe(self, maxsize: int = 100) -> StateSubscription:
+        """
+        Subscribe to state and action events from the running event loop
+        
+        The current state is queued immediately. Slow subscribers lose their
+        oldest events instead of slowing down the publisher.
+        
+        Args:
+            maxsize: Events buffered per subscriber
+        
+        Returns:
+            Subscription to read events from
+        """
+        subscription = StateSubscription(asyncio.get_running_loop(), maxsize)
+        with self.lock:
+            self.subscribers.append(subscription)
+            snapshot = self._event("state", {
+                "state": self.current_state.value,
+                "user_text": self.last_user_text,
+                "assistant_text": self.last_assistant_text
+            })
+        subscription.push(snapshot)
+        logger.debug(f"UI event subscriber added ({len(self.subscribers)} total)")
+        return subscription
+    
+    def unsubscribe(self, subscription: StateSubscription):
+        """Remove a subscription"""
+        with self.lock:
+            if subscription in self.subscribers:
+                self.subscribers.remove(subscription)
+    
+    def _event(self, event_type: str, payload: Dict) -> Dict:
+        """Build a numbered event (caller holds the lock)"""
+        self.sequence += 1
+        return {"type": event_type, "seq": self.sequence, "timestamp": time.time(), **payload}
+    
+    def publish_event(self, event_type: str, payload: Dict):
+        """
+        Push an event to all remote subscribers without blocking
+        
+        Args:
+            event_type: Event type ("state", "action_result", ...)
+            payload: Event fields
+        """
+        with self.lock:
+            if not self.subscribers:
+                return
+            event = self._event(event_type, payload)
+            subscribers = self.subscribers.copy()
+        
+        gone = [s for s in subscribers if not s.push(event)]
+        for subscription in gone:
+            self.unsubscribe(subscription)
     
     def get_state(self) -> tuple:
         """
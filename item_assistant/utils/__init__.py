@@ -1,4 +1,7 @@
 """Utility functions package"""
 
-# Placeholder for utility functions
-# Add common utility functions here as needed
+from .http_pool import HTTPPool, get_http_pool, get_http_session, get_async_http_client
+
+__all__ = [
+    'HTTPPool', 'get_http_pool', 'get_http_session', 'get_async_http_client',
+]
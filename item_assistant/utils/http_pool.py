@@ -0,0 +1,112 @@
+"""
+HTTP Connection Pool
+Shared keep-alive HTTP sessions (sync and async) for Ollama and health probes.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+
+logger = get_logger()
+
+
+class HTTPPool:
+    """Owns the process-wide pooled HTTP sessions"""
+    
+    def __init__(self):
+        """Initialize HTTP pool settings from config"""
+        self.config = get_config()
+        self.pool_size = self.config.get("network.http_pool.pool_size", 10)
+        self.keepalive_seconds = self.config.get("network.http_pool.keepalive_seconds", 60)
+        
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        # httpx.AsyncClient is bound to the event loop it was first used on,
+        # so keep one client per loop
+        self._async_clients = weakref.WeakKeyDictionary()
+        
+        logger.info(f"HTTP pool initialized (pool size: {self.pool_size}, keep-alive: {self.keepalive_seconds}s)")
+    
+    def get_session(self) -> requests.Session:
+        """
+        Get the shared synchronous session
+        
+        Returns:
+            requests.Session with a connection-pooling adapter
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_size,
+                        pool_maxsize=self.pool_size
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers["Connection"] = "keep-alive"
+                    self._session = session
+        return self._session
+    
+    def get_async_client(self) -> httpx.AsyncClient:
+        """
+        Get the async client for the running event loop
+        
+        Returns:
+            httpx.AsyncClient with pooled keep-alive connections
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=self.keepalive_seconds
+                )
+            )
+            self._async_clients[loop] = client
+        return client
+    
+    def close(self):
+        """Close the synchronous session (async clients close with their loop)"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+    
+    async def close_async(self):
+        """Close the async client bound to the running event loop"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+
+# Global HTTP pool instance
+_http_pool_instance: Optional[HTTPPool] = None
+
+
+def get_http_pool() -> HTTPPool:
+    """Get the global HTTP pool instance"""
+    global _http_pool_instance
+    if _http_pool_instance is None:
+        _http_pool_instance = HTTPPool()
+    return _http_pool_instance
+
+
+def get_http_session() -> requests.Session:
+    """Get the shared pooled requests session"""
+    return get_http_pool().get_session()
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the pooled httpx client for the running event loop"""
+    return get_http_pool().get_async_client()
@@ -1,11 +1,20 @@
 """Voice module initialization"""
 
+from .audio_capture import AudioCapture, AudioRingBuffer, AudioReader, get_audio_capture
+from .vad import VoiceActivityDetector, EndPointer, get_vad
+from .streaming_stt import StreamingTranscriber
+from .stt_engines import OfflineEnginePool, create_engine, get_offline_stt_pool
+from .audio_encoding import AudioEncoder, EncodedAudio, get_audio_encoder
 from .wake_word import WakeWordDetector, get_wake_word_detector
 from .stt import STT, get_stt
-from .tts import TTS, get_tts
+from .tts import TTS, SentenceStreamer, get_tts
 
 __all__ = [
+    'AudioCapture', 'AudioRingBuffer', 'AudioReader', 'get_audio_capture',
+    'VoiceActivityDetector', 'EndPointer', 'get_vad',
     'WakeWordDetector', 'get_wake_word_detector',
-    'STT', 'get_stt',
-    'TTS', 'get_tts',
+    'STT', 'StreamingTranscriber', 'get_stt',
+    'AudioEncoder', 'EncodedAudio', 'get_audio_encoder',
+    'OfflineEnginePool', 'create_engine', 'get_offline_stt_pool',
+    'TTS', 'SentenceStreamer', 'get_tts',
 ]
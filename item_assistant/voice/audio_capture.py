@@ -0,0 +1,271 @@
+"""
+Audio Capture
+One microphone stream per process, buffered in a ring that wake word and STT read from.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import sounddevice as sd
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+
+logger = get_logger()
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size int16 ring addressed by absolute sample position
+    
+    There is one writer (the capture callback). It copies samples in and
+    only then advances `written`, so readers never need a lock: a reader
+    copies out a range and checks afterwards that the writer hasn't lapped
+    it in the meantime. The oldest `guard` samples count as gone already,
+    since a write in progress may be overwriting them.
+    """
+    
+    def __init__(self, capacity: int, guard: int = 0):
+        """
+        Initialize ring buffer
+        
+        Args:
+            capacity: Number of samples kept
+            guard: Largest single write (one capture block)
+        """
+        self.capacity = capacity
+        self.guard = guard
+        self.buffer = np.zeros(capacity, dtype=np.int16)
+        self.written = 0  # total samples ever written
+        # Only used to wake waiting readers, never to guard the data
+        self.data_ready = threading.Condition()
+    
+    @property
+    def oldest(self) -> int:
+        """Absolute position of the oldest sample safe to read"""
+        return max(0, self.written - self.capacity + self.guard)
+    
+    def write(self, samples: np.ndarray):
+        """
+        Append samples (capture thread only)
+        
+        Args:
+            samples: 1-D int16 samples
+        """
+        count = len(samples)
+        if count > self.capacity:
+            samples = samples[-self.capacity:]
+            self.written += count - self.capacity
+            count = self.capacity
+        
+        start = self.written % self.capacity
+        first = min(count, self.capacity - start)
+        self.buffer[start:start + first] = samples[:first]
+        self.buffer[:count - first] = samples[first:]
+        # Publish only after the samples are in place
+        self.written += count
+        
+        with self.data_ready:
+            self.data_ready.notify_all()
+    
+    def read(self, position: int, count: int) -> Optional[np.ndarray]:
+        """
+        Copy samples [position, position + count)
+        
+        Args:
+            position: Absolute start position
+            count: Number of samples (must already be written)
+        
+        Returns:
+            Copy of the samples, or None if part of the range was overwritten
+        """
+        if position < self.oldest or position + count > self.written:
+            return None
+        
+        start = position % self.capacity
+        first = min(count, self.capacity - start)
+        data = np.concatenate((self.buffer[start:start + first], self.buffer[:count - first]))
+        # The writer may have lapped us while copying
+        if position < self.oldest:
+            return None
+        return data
+    
+    def wait_for(self, position: int, timeout: Optional[float]) -> bool:
+        """
+        Block until the ring holds samples up to an absolute position
+        
+        Args:
+            position: Position that must be written
+            timeout: Seconds to wait (None waits indefinitely)
+        
+        Returns:
+            True if the samples are available
+        """
+        with self.data_ready:
+            return self.data_ready.wait_for(lambda: self.written >= position, timeout)
+
+
+class AudioReader:
+    """Independent read cursor into the capture ring"""
+    
+    def __init__(self, ring: AudioRingBuffer, position: int):
+        """
+        Initialize reader
+        
+        Args:
+            ring: Ring to read from
+            position: Absolute position of the first sample to return
+        """
+        self.ring = ring
+        self.position = max(position, ring.oldest)
+        self.overruns = 0
+    
+    def read(self, count: int, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Return the next samples, waiting for them to be captured
+        
+        If the reader fell so far behind that its samples were overwritten,
+        it skips ahead to the oldest samples still buffered.
+        
+        Args:
+            count: Number of samples
+            timeout: Seconds to wait for the samples
+        
+        Returns:
+            int16 samples, or None on timeout
+        """
+        while True:
+            if not self.ring.wait_for(self.position + count, timeout):
+                return None
+            data = self.ring.read(self.position, count)
+            if data is not None:
+                self.position += count
+                return data
+            self.overruns += 1
+            self.position = self.ring.oldest
+    
+    def available(self) -> int:
+        """Number of samples captured but not yet read"""
+        return self.ring.written - self.position
+
+
+class AudioCapture:
+    """Owns the single input stream and the ring buffer it fills"""
+    
+    def __init__(self):
+        """Initialize audio capture (the device opens on start())"""
+        self.config = get_config()
+        self.sample_rate = self.config.get("voice.capture.sample_rate", 16000)
+        # Porcupine consumes 512-sample frames at 16 kHz
+        self.block_size = self.config.get("voice.capture.block_size", 512)
+        self.device = self.config.get("voice.capture.device", None)
+        buffer_seconds = self.config.get("voice.capture.buffer_seconds", 30)
+        self.pre_roll = int(self.config.get("voice.capture.pre_roll_ms", 300) * self.sample_rate / 1000)
+        
+        self.ring = AudioRingBuffer(int(buffer_seconds * self.sample_rate), guard=self.block_size * 4)
+        self.stream: Optional[sd.InputStream] = None
+        self.lock = threading.Lock()
+        self.started_at: Optional[float] = None
+        self.status_errors = 0
+        
+        logger.info(f"[AUDIO] Audio capture initialized ({self.sample_rate}Hz, {buffer_seconds}s ring)")
+    
+    def _callback(self, indata: np.ndarray, frames: int, time_info, status):
+        """PortAudio callback: copy the block into the ring"""
+        if status:
+            self.status_errors += 1
+        self.ring.write(indata[:, 0])
+    
+    def start(self) -> bool:
+        """
+        Open the input device once and start capturing
+        
+        Returns:
+            True if capture is running
+        """
+        with self.lock:
+            if self.stream is not None:
+                return True
+            try:
+                stream = sd.InputStream(
+                    samplerate=self.sample_rate,
+                    blocksize=self.block_size,
+                    device=self.device,
+                    channels=1,
+                    dtype='int16',
+                    callback=self._callback
+                )
+                stream.start()
+            except Exception as e:
+                logger.error(f"[AUDIO] Failed to open input device: {e}")
+                return False
+            self.stream = stream
+            self.started_at = time.time()
+        
+        logger.info("[AUDIO] Microphone capture started")
+        return True
+    
+    def stop(self):
+        """Stop capturing and close the device"""
+        with self.lock:
+            stream, self.stream = self.stream, None
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception as e:
+                logger.debug(f"[AUDIO] Error closing input stream: {e}")
+            logger.info("[AUDIO] Microphone capture stopped")
+    
+    def is_running(self) -> bool:
+        """Check whether the input stream is open"""
+        return self.stream is not None
+    
+    @property
+    def position(self) -> int:
+        """Absolute position of the next sample to be captured"""
+        return self.ring.written
+    
+    def reader(self, position: Optional[int] = None, pre_roll: bool = False) -> AudioReader:
+        """
+        Create a read cursor
+        
+        Args:
+            position: Absolute start position (defaults to now)
+            pre_roll: Start voice.capture.pre_roll_ms earlier, so speech
+                that began just before the position isn't clipped
+        
+        Returns:
+            AudioReader
+        """
+        start = self.position if position is None else position
+        if pre_roll:
+            start -= self.pre_roll
+        return AudioReader(self.ring, start)
+    
+    def stats(self) -> Dict:
+        """
+        Get capture status
+        
+        Returns:
+            Dictionary with running flag, buffered seconds and stream errors
+        """
+        return {
+            "running": self.is_running(),
+            "buffered_seconds": round((self.ring.written - self.ring.oldest) / self.sample_rate, 1),
+            "stream_errors": self.status_errors
+        }
+
+
+# Global audio capture instance
+_audio_capture_instance = None
+
+
+def get_audio_capture() -> AudioCapture:
+    """Get the global audio capture instance"""
+    global _audio_capture_instance
+    if _audio_capture_instance is None:
+        _audio_capture_instance = AudioCapture()
+    return _audio_capture_instance
@@ -0,0 +1,233 @@
+"""
+Audio Encoding
+Turns recorded commands into compact upload payloads for online STT.
+"""
+
+import io
+import struct
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger, get_metrics
+
+logger = get_logger()
+
+# Upload size buckets in bytes (a few KB of Opus up to ~1 MB of long WAV)
+_SIZE_BUCKETS = (4096, 16384, 32768, 65536, 131072, 262144, 524288, 1048576)
+
+# File names tell the provider the container
+_FILE_NAMES = {"wav": "audio.wav", "flac": "audio.flac", "opus": "audio.ogg"}
+
+
+def to_pcm16(audio: np.ndarray) -> np.ndarray:
+    """
+    Get 16-bit PCM samples, without copying if they already are
+    
+    Args:
+        audio: int16 samples, or float samples in [-1, 1]
+    
+    Returns:
+        Contiguous little-endian int16 array
+    """
+    if audio.dtype == np.int16:
+        return np.ascontiguousarray(audio, dtype="<i2")
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+
+
+def encode_wav(pcm: np.ndarray, sample_rate: int) -> bytes:
+    """
+    Wrap 16-bit PCM in a WAV header
+    
+    The samples are copied once, straight from the array's memory into
+    the payload, with no intermediate file object or float conversion.
+    
+    Args:
+        pcm: int16 mono samples
+        sample_rate: Sample rate in Hz
+    
+    Returns:
+        WAV file bytes
+    """
+    data = memoryview(pcm).cast("B")
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data.nbytes, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data.nbytes
+    )
+    return b"".join((header, data))
+
+
+def encode_compressed(pcm: np.ndarray, sample_rate: int, codec: str) -> bytes:
+    """
+    Encode 16-bit PCM as FLAC or Ogg/Opus with libsndfile
+    
+    Args:
+        pcm: int16 mono samples
+        sample_rate: Sample rate in Hz
+        codec: flac or opus
+    
+    Returns:
+        Encoded file bytes
+    """
+    import soundfile as sf
+    
+    buffer = io.BytesIO()
+    if codec == "flac":
+        sf.write(buffer, pcm, sample_rate, format="FLAC", subtype="PCM_16")
+    else:
+        # Needs libsndfile 1.0.29+ built with Opus
+        sf.write(buffer, pcm, sample_rate, format="OGG", subtype="OPUS")
+    return buffer.getvalue()
+
+
+class EncodedAudio:
+    """An upload payload and what it cost to produce"""
+    
+    def __init__(self, data, codec: str, samples: int, sample_rate: int, encode_ms: float):
+        self.data = data
+        self.codec = codec
+        self.filename = _FILE_NAMES[codec]
+        self.duration = samples / sample_rate
+        self.encode_ms = encode_ms
+        # What soundfile's WAV writer produced for the same audio (16-bit PCM)
+        self.baseline_size = 44 + samples * 2
+    
+    @property
+    def size(self) -> int:
+        """Payload size in bytes"""
+        return len(self.data)
+
+
+class AudioEncoder:
+    """Picks the upload codec for the link speed and records what it saves"""
+    
+    def __init__(self):
+        """Initialize audio encoder"""
+        self.config = get_config()
+        self.metrics = get_metrics()
+        
+        self.codec = self.config.get("voice.stt.upload_codec", "auto")  # auto, wav, flac, opus
+        # None means a fast link: plain PCM costs nothing to encode
+        self.bandwidth_kbps = self.config.get("voice.stt.upload_bandwidth_kbps", None)
+        self.flac_below_kbps = self.config.get("voice.stt.flac_below_kbps", 2000)
+        self.opus_below_kbps = self.config.get("voice.stt.opus_below_kbps", 500)
+        # Codecs libsndfile turned out not to support on this machine
+        self.unsupported = set()
+        
+        self.upload_bytes = self.metrics.histogram(
+            "stt_upload_bytes",
+            "Size of audio uploaded for online STT",
+            ("codec",),
+            buckets=_SIZE_BUCKETS
+        )
+        self.upload_duration = self.metrics.histogram(
+            "stt_upload_seconds",
+            "Online STT request time by upload codec",
+            ("codec",)
+        )
+        
+        logger.info(f"[STT] Audio encoder initialized (codec: {self.codec}, "
+                    f"bandwidth: {self.bandwidth_kbps or 'unlimited'} kbps)")
+    
+    def choose_codec(self) -> str:
+        """
+        Pick the codec for the configured link
+        
+        16 kHz PCM is 256 kbps; FLAC roughly halves it losslessly, Opus
+        cuts it over tenfold but costs more CPU.
+        
+        Returns:
+            wav, flac or opus
+        """
+        codec = self.codec
+        if codec == "auto":
+            bandwidth = self.bandwidth_kbps
+            if bandwidth is None or bandwidth >= self.flac_below_kbps:
+                codec = "wav"
+            elif bandwidth >= self.opus_below_kbps:
+                codec = "flac"
+            else:
+                codec = "opus"
+        
+        # Fall back towards plain PCM if libsndfile lacks the codec
+        if codec == "opus" and "opus" in self.unsupported:
+            codec = "flac"
+        if codec == "flac" and "flac" in self.unsupported:
+            codec = "wav"
+        return codec
+    
+    def encode(self, audio: np.ndarray, sample_rate: int = 16000) -> EncodedAudio:
+        """
+        Encode audio for upload
+        
+        Args:
+            audio: int16 samples, or float samples in [-1, 1]
+            sample_rate: Sample rate in Hz
+        
+        Returns:
+            EncodedAudio
+        """
+        started = time.perf_counter()
+        pcm = to_pcm16(audio)
+        codec = self.choose_codec()
+        
+        data = None
+        while data is None and codec != "wav":
+            try:
+                data = encode_compressed(pcm, sample_rate, codec)
+            except Exception as e:
+                logger.warning(f"[STT_WARN] {codec} encoding unavailable, falling back: {e}")
+                self.unsupported.add(codec)
+                codec = self.choose_codec()
+        if data is None:
+            data = encode_wav(pcm, sample_rate)
+        
+        encode_ms = (time.perf_counter() - started) * 1000
+        return EncodedAudio(data, codec, len(pcm), sample_rate, encode_ms)
+    
+    def record_upload(self, encoded: EncodedAudio, seconds: float) -> Dict:
+        """
+        Record an upload's size and duration, and log what the codec saved
+        
+        Args:
+            encoded: The uploaded payload
+            seconds: Request duration (upload plus transcription)
+        
+        Returns:
+            Dictionary with codec, bytes, bytes_saved and the estimated
+            upload time saved at the configured bandwidth
+        """
+        self.upload_bytes.observe(encoded.size, codec=encoded.codec)
+        self.upload_duration.observe(seconds, codec=encoded.codec)
+        
+        saved = encoded.baseline_size - encoded.size
+        saved_ms: Optional[float] = None
+        if self.bandwidth_kbps:
+            saved_ms = round(saved * 8 / self.bandwidth_kbps - encoded.encode_ms, 1)
+        
+        logger.info(f"[STT] Uploaded {encoded.duration:.1f}s as {encoded.codec}: "
+                    f"{encoded.size / 1024:.1f} KB (WAV: {encoded.baseline_size / 1024:.1f} KB), "
+                    f"encode {encoded.encode_ms:.1f}ms, request {seconds * 1000:.0f}ms"
+                    + (f", ~{saved_ms:.0f}ms saved" if saved_ms is not None else ""))
+        return {
+            "codec": encoded.codec,
+            "bytes": encoded.size,
+            "bytes_saved": saved,
+            "upload_ms_saved": saved_ms
+        }
+
+
+# Global audio encoder instance
+_audio_encoder_instance = None
+
+
+def get_audio_encoder() -> AudioEncoder:
+    """Get the global audio encoder instance"""
+    global _audio_encoder_instance
+    if _audio_encoder_instance is None:
+        _audio_encoder_instance = AudioEncoder()
+    return _audio_encoder_instance
@@ -0,0 +1,228 @@
+"""
+Streaming STT
+Transcribes a command while it is still being spoken and publishes partial hypotheses.
+"""
+
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger, get_tracer
+from item_assistant.llm import get_intent_parser
+from item_assistant.ui.state import get_ui_state_manager, AssistantState
+from item_assistant.voice.audio_capture import AudioReader
+
+logger = get_logger()
+
+
+def _normalize_word(word: str) -> str:
+    """Lowercase a word and drop punctuation so "Chrome," matches "chrome\""""
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stable_prefix(previous: List[str], current: List[str]) -> List[str]:
+    """
+    Words at the start of two consecutive hypotheses that agree
+    
+    A word that survives being re-transcribed with more audio after it
+    rarely changes again (local agreement).
+    
+    Args:
+        previous: Words of the previous hypothesis
+        current: Words of the new hypothesis
+    
+    Returns:
+        The agreed words, as spelled in the new hypothesis
+    """
+    prefix = []
+    for before, after in zip(previous, current):
+        if _normalize_word(before) != _normalize_word(after):
+            break
+        prefix.append(after)
+    return prefix
+
+
+class StreamingTranscriber:
+    """
+    Re-transcribes the growing utterance on an interval from its own
+    capture cursor, while the VAD decides when the speaker is done
+    """
+    
+    def __init__(self, transcribe: Callable[[np.ndarray], Dict], reader: AudioReader, sample_rate: int):
+        """
+        Initialize streaming transcriber
+        
+        Args:
+            transcribe: Transcribes int16 audio, returning an STT result dict
+            reader: Capture cursor at the start of the utterance
+            sample_rate: Sample rate of the capture
+        """
+        self.config = get_config()
+        self.transcribe = transcribe
+        self.reader = reader
+        self.sample_rate = sample_rate
+        
+        self.interval = self.config.get("voice.stt.streaming.interval_ms", 800) / 1000
+        self.min_samples = int(self.config.get("voice.stt.streaming.min_audio_ms", 600) * sample_rate / 1000)
+        # Whisper sees at most 30 s; longer commands only get the final pass
+        self.max_samples = int(self.config.get("voice.stt.streaming.max_window_seconds", 30) * sample_rate)
+        self.final_wait = self.config.get("voice.stt.streaming.final_wait_ms", 1500) / 1000
+        self.prefetch_intent = self.config.get("voice.stt.streaming.prefetch_intent", True)
+        self.min_prefetch_words = self.config.get("voice.stt.streaming.min_prefetch_words", 2)
+        
+        self.ui_state = get_ui_state_manager()
+        
+        self.audio = np.zeros(0, dtype=np.int16)
+        self.words: List[str] = []
+        self.stable_words: List[str] = []
+        self.last_result: Optional[Dict] = None
+        self.last_covered = 0  # samples the last partial was computed over
+        self.in_flight: Optional[int] = None  # samples the running partial covers
+        self.partials = 0
+        self.prefetch_future = None
+        self.prefetched: Optional[str] = None
+        
+        self.lock = threading.Lock()
+        self.idle = threading.Event()
+        self.idle.set()
+        self.wakeup = threading.Event()
+        self.pause = threading.Event()
+        self.stop_event = threading.Event()
+        self.finished = False
+        self.thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start transcribing in the background"""
+        self.thread = threading.Thread(target=get_tracer().wrap(self._run),
+                                       name="stt-streaming", daemon=True)
+        self.thread.start()
+    
+    def _run(self):
+        """Background loop: pull new audio and re-transcribe it every interval"""
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            if self.stop_event.is_set():
+                return
+            paused = self.pause.is_set()
+            self.pause.clear()
+            
+            available = self.reader.available()
+            if available > 0:
+                chunk = self.reader.read(available, timeout=0)
+                if chunk is not None:
+                    self.audio = np.concatenate((self.audio, chunk))
+            
+            covered = len(self.audio)
+            if covered == self.last_covered and paused:
+                self._prefetch(" ".join(self.words))  # Nothing new since the last partial
+            if covered < self.min_samples or covered == self.last_covered:
+                continue
+            if covered > self.max_samples:
+                logger.debug("[STT] Utterance exceeds the streaming window, waiting for the final pass")
+                return
+            
+            self.in_flight = covered
+            self.idle.clear()
+            try:
+                result = self.transcribe(self.audio)
+            except Exception as e:
+                logger.debug(f"[STT] Partial transcription failed: {e}")
+                continue
+            finally:
+                self.in_flight = None
+                self.idle.set()
+            
+            if result.get("success"):
+                self._update(result, covered, paused)
+    
+    def poke(self):
+        """
+        The speaker paused: transcribe now instead of at the next interval,
+        and pre-parse the intent if the hypothesis looks complete
+        """
+        self.pause.set()
+        self.wakeup.set()
+    
+    def _update(self, result: Dict, covered: int, paused: bool = False):
+        """Record a new hypothesis, publish it and pre-parse it after a pause"""
+        text = result.get("text", "").strip()
+        words = text.split()
+        
+        with self.lock:
+            if self.finished:
+                return  # The final transcript is already out
+            agreed = stable_prefix(self.words, words)
+            grew = len(agreed) > len(self.stable_words)
+            if grew:
+                self.stable_words = agreed
+            self.words = words
+            self.last_result = result
+            self.last_covered = covered
+            self.partials += 1
+            stable = " ".join(self.stable_words)
+        
+        logger.info(f"[STT] Partial: '{text}' (stable: '{stable}')")
+        self.ui_state.update_state(AssistantState.LISTENING, user_text=text)
+        self.ui_state.publish_event("stt_partial", {
+            "text": text,
+            "stable": stable,
+            "audio_ms": round(covered * 1000 / self.sample_rate)
+        })
+        
+        if paused:
+            self._prefetch(text)
+    
+    def _prefetch(self, text: str):
+        """
+        Start a speculative intent parse of a full hypothesis on the shared
+        loop (one at a time)
+        
+        Only hypotheses heard before a pause are parsed: a prefix such as
+        "what is" would just hold the local LLM. Rule matches are skipped
+        since the final parse resolves them instantly, and the result is not
+        cached; the final parse joins it if the transcript is unchanged.
+        """
+        if not self.prefetch_intent or len(text.split()) < self.min_prefetch_words:
+            return
+        if text == self.prefetched:
+            return
+        if self.prefetch_future is not None and not self.prefetch_future.done():
+            return
+        parser = get_intent_parser()
+        rule_intent = parser.match_rules(text)
+        if rule_intent and rule_intent["confidence"] >= parser.rule_threshold:
+            return
+        # Imported here: core imports the voice package, which imports this module
+        from item_assistant.core.runtime import get_runtime
+        
+        logger.debug(f"[STT] Pre-parsing hypothesis at pause: '{text}'")
+        self.prefetched = text
+        self.prefetch_future = get_runtime().submit(parser.parse_async(text, speculative=True))
+    
+    def finish(self, speech_end: int) -> Optional[Dict]:
+        """
+        Stop streaming and hand back a partial that can serve as the final result
+        
+        Args:
+            speech_end: Samples from the utterance start to the end of
+                speech (the trailing silence adds nothing to the transcript)
+        
+        Returns:
+            The last partial if it covers all the speech, else None
+        """
+        self.stop_event.set()
+        self.wakeup.set()
+        # A partial already running over all the speech beats starting over
+        in_flight = self.in_flight
+        if in_flight is not None and in_flight >= speech_end:
+            self.idle.wait(self.final_wait)
+        
+        with self.lock:
+            self.finished = True
+            if self.last_result is not None and self.last_covered >= speech_end:
+                return dict(self.last_result, streamed=True, partials=self.partials)
+        return None
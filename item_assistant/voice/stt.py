@@ -3,19 +3,24 @@ Speech-to-Text (STT)
 OPTIMIZED FOR SPEED - 3s recording, synchronous blocking, Groq-first
 """
 
-import io
+import time
 import threading
 import sounddevice as sd
-import soundfile as sf
 import numpy as np
-import whisper
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 from groq import Groq
 
 from item_assistant.config import get_config
-from item_assistant.logging import get_logger
+from item_assistant.llm import get_health_monitor
+from item_assistant.logging import get_logger, get_metrics
+from item_assistant.voice.audio_capture import get_audio_capture
+from item_assistant.voice.vad import get_vad
+from item_assistant.voice.streaming_stt import StreamingTranscriber
+from item_assistant.voice.stt_engines import get_offline_stt_pool
+from item_assistant.voice.audio_encoding import get_audio_encoder, encode_wav
 
 logger = get_logger()
+metrics = get_metrics()
 
 
 class STT:
@@ -31,9 +36,24 @@ class STT:
         self.online_provider = "groq"
         self.languages = self.config.get("voice.stt.languages", ["hi", "en", "mr"])
         
-        # Initialize offline Whisper model (fallback only)
-        self.whisper_model = None
-        # Skip loading Whisper to save memory - only load if Groq fails
+        # Offline engines load in the background at startup so a network drop
+        # never waits on a cold model; each caller borrows its own engine.
+        # Machines short on memory can turn preload off: with Groq working
+        # they then load only once Groq fails or the internet probe does
+        self.offline = get_offline_stt_pool()
+        self.preload_offline = self.config.get("voice.stt.offline.preload", True)
+        self.health_monitor = get_health_monitor()
+        # Seconds to wait for a free (or still loading) offline engine
+        self.offline_timeout = self.config.get("voice.stt.offline.acquire_timeout_seconds", 60)
+        
+        # Partial transcripts while the user is still speaking
+        self.streaming = self.config.get("voice.stt.streaming.enabled", True)
+        # Partials run many times per utterance, so they stay on the local pool
+        # unless online partials are opted into (and then capped per utterance)
+        self.streaming_engine = self.config.get("voice.stt.streaming.engine", "local")  # local, online, auto
+        self.max_online_partials = self.config.get("voice.stt.streaming.max_online_partials", 3)
+        self.reuse_streamed_final = self.config.get("voice.stt.streaming.reuse_final", True)
+        self.partials_unavailable_logged = False
         
         # Initialize Groq client (primary)
         self.groq_client = None
@@ -46,10 +66,11 @@ class STT:
                 self._verify_groq_connection()
             except Exception as e:
                 logger.error(f"[STT_ERROR] Failed to initialize Groq STT: {e}")
-                self._load_whisper_model()  # Load fallback
         else:
-            logger.warning("[STT_WARN] No Groq API key - loading Whisper fallback")
-            self._load_whisper_model()
+            logger.warning("[STT_WARN] No Groq API key - using offline Whisper")
+        
+        if self.preload_offline or self.groq_client is None:
+            self.offline.preload()
         
         logger.info(f"[STT] STT initialized - OPTIMIZED (prefer: Groq)")
     
@@ -58,18 +79,12 @@ class STT:
         try:
             logger.info("[STT] Verifying Groq API connection...")
             # Try a simple test call
-            import io
-            import soundfile as sf
             # Create a tiny test audio
-            test_audio = np.zeros(16000, dtype=np.float32)  # 1 second of silence
-            audio_bytes = io.BytesIO()
-            sf.write(audio_bytes, test_audio, 16000, format='WAV')
-            audio_bytes.seek(0)
-            audio_bytes.name = "test.wav"
+            test_audio = np.zeros(16000, dtype=np.int16)  # 1 second of silence
             
             # Test the connection
             self.groq_client.audio.transcriptions.create(
-                file=audio_bytes,
+                file=("test.wav", encode_wav(test_audio, 16000)),
                 model="whisper-large-v3",
                 response_format="text"
             )
@@ -77,29 +92,34 @@ class STT:
         except Exception as e:
             logger.warning(f"[STT_WARN] Groq API test failed: {e}")
     
-    def _load_whisper_model(self):
-        """Load Whisper model for offline STT (fallback)"""
-        if self.whisper_model:
-            return  # Already loaded
-        try:
-            logger.info("[STT] Loading Whisper model: {self.offline_model_size}")
-            self.whisper_model = whisper.load_model(self.offline_model_size)
-            logger.info("[STT] Whisper model loaded successfully")
-        except Exception as e:
-            logger.error(f"[STT_ERROR] Failed to load Whisper model: {e}")
-            self.whisper_model = None
-    
-    def record_audio(self, duration: int = 3, sample_rate: int = 16000) -> np.ndarray:
+    def record_audio(self, duration: int = 3, sample_rate: int = 16000,
+                     start_position: Optional[int] = None) -> np.ndarray:
         """
         Record audio from microphone - OPTIMIZED: 3 seconds default
         
+        Reads from the shared capture ring when possible, so recording
+        starts without opening the device and includes a short pre-roll.
+        
         Args:
             duration: Recording duration (3s for faster response)
             sample_rate: Sample rate in Hz
+            start_position: Capture position to record from (e.g. the end
+                of the wake word); defaults to now
         
         Returns:
-            Audio data as numpy array
+            Audio data as numpy array (int16 from the capture ring, float32
+            when recorded directly)
         """
+        capture = get_audio_capture()
+        if capture.sample_rate == sample_rate and capture.start():
+            reader = capture.reader(start_position, pre_roll=True)
+            count = reader.available() + int(duration * sample_rate)
+            logger.info(f"[STT] Reading {count / sample_rate:.2f}s from the capture buffer...")
+            pcm = reader.read(count, timeout=duration + 2)
+            if pcm is not None:
+                return pcm
+            logger.warning("[STT_WARN] Capture stream stalled, recording directly")
+        
         logger.info(f"[STT] Starting audio capture ({duration}s at {sample_rate}Hz)...")
         try:
             audio = sd.rec(
@@ -116,39 +136,142 @@ class STT:
             logger.error(f"[STT_ERROR] Failed to record audio: {e}", exc_info=True)
             raise
     
+    def record_utterance(self, start_position: Optional[int] = None,
+                         language: Optional[str] = None) -> Tuple[Optional[np.ndarray], Optional[Dict]]:
+        """
+        Record one command, stopping when the speaker goes quiet
+        
+        With streaming enabled the utterance is transcribed in the background
+        while it is recorded; if the last partial already covers all the
+        speech it is returned as the transcription.
+        
+        Args:
+            start_position: Capture position the command starts at (e.g. the
+                end of the wake word); defaults to now
+            language: Language code for partial transcriptions
+        
+        Returns:
+            Tuple of (int16 audio from the capture ring, streamed
+            transcription or None). Audio is None if the shared capture isn't available
+            (callers then fall back to record_audio)
+        """
+        capture = get_audio_capture()
+        vad = get_vad()
+        if capture.sample_rate != vad.sample_rate or not capture.start():
+            return None, None
+        
+        reader = capture.reader(start_position, pre_roll=True)
+        streamer = None
+        if self.streaming and self._partials_available():
+            online_partials = [0]  # Groq partials sent for this utterance
+            streamer = StreamingTranscriber(
+                lambda audio: self.transcribe_partial(audio, language, online_partials),
+                capture.reader(reader.position),
+                capture.sample_rate
+            )
+            streamer.start()
+        
+        # A pause is the best moment for a partial: it may be the last one needed
+        pcm, info = vad.record(reader, lead_in=capture.pre_roll,
+                               on_pause=streamer.poke if streamer else None)
+        logger.info(f"[STT] Utterance ended ({info['reason']}): {info['duration_ms']}ms of audio, "
+                    f"waited {info['wait_ms']}ms")
+        
+        streamed = None
+        if streamer is not None:
+            length = len(pcm) if pcm is not None else 0
+            speech_end = length - int(info["trailing_silence_ms"] * capture.sample_rate / 1000)
+            streamed = streamer.finish(speech_end)
+        
+        if pcm is None:
+            return None, None
+        if not info["speech_detected"]:
+            logger.warning("[STT_WARN] No speech detected before timeout")
+            streamed = None
+        if streamed is not None and not self._same_engine_as_final(streamed):
+            streamed = None  # Partials came from a different engine than the final pass
+        if not self.reuse_streamed_final:
+            streamed = None
+        return pcm, streamed
+    
+    def _same_engine_as_final(self, result: Dict) -> bool:
+        """Check whether a result came from the engine transcribe() would use first"""
+        return (result.get("provider") == "groq-whisper") == (self.groq_client is not None)
+    
+    def _partials_online(self) -> bool:
+        """Check whether partials go to Groq (else the local pool)"""
+        if self.streaming_engine == "auto":
+            return self.groq_client is not None
+        return self.streaming_engine == "online"
+    
+    def _partials_available(self) -> bool:
+        """
+        Check whether the partial engine can run now
+        
+        Returns:
+            True if Groq is configured (online partials) or the local pool
+            is loaded (local partials); logs once when it isn't
+        """
+        if self._partials_online():
+            available = self.groq_client is not None
+        else:
+            available = self.offline.ready
+        
+        if available:
+            self.partials_unavailable_logged = False
+        elif not self.partials_unavailable_logged:
+            self.partials_unavailable_logged = True
+            engine = "Groq" if self._partials_online() else "offline Whisper"
+            logger.warning(f"[STT_WARN] Streaming partials need {engine}, which isn't available; "
+                           f"recording without them")
+        return available
+    
+    def transcribe_partial(self, audio: np.ndarray, language: Optional[str] = None,
+                           online_partials: Optional[List[int]] = None) -> Dict:
+        """
+        Transcribe an unfinished utterance for a partial hypothesis
+        
+        Uses a single engine (voice.stt.streaming.engine: local, online, or
+        auto for the one the final pass would use) and never falls back.
+        Online partials stop after voice.stt.streaming.max_online_partials
+        per utterance.
+        
+        Args:
+            audio: Audio recorded so far
+            language: Language code
+            online_partials: One-element counter of Groq partials already
+                sent for this utterance
+        
+        Returns:
+            Dictionary with transcription
+        """
+        if self._partials_online():
+            if online_partials is not None:
+                if online_partials[0] >= self.max_online_partials:
+                    return {"success": False, "error": "Online partial limit reached", "text": ""}
+                online_partials[0] += 1
+            return self.transcribe_online(audio, language)
+        if not self.offline.ready:
+            # Partials alone never load Whisper (see transcribe)
+            return {"success": False, "error": "Offline STT not loaded", "text": ""}
+        return self.transcribe_offline(audio, language)
+    
     def transcribe_offline(self, audio: np.ndarray, language: Optional[str] = None) -> Dict:
-        """Transcribe using offline Whisper (SLOW - fallback only)"""
+        """Transcribe using a pooled offline Whisper engine (fallback)"""
         logger.info("[STT] Attempting offline transcription with Whisper...")
-        if not self.whisper_model:
-            self._load_whisper_model()  # Lazy load if needed
-        
-        if not self.whisper_model:
-            logger.error("[STT_ERROR] Whisper model not loaded")
-            return {
-                "success": False,
-                "error": "Whisper model not loaded",
-                "text": ""
-            }
+        if not self.offline.ready:
+            logger.info("[STT] Offline model still loading, waiting for it...")
         
         try:
-            logger.info(f"[STT] Transcribing with Whisper (language: {language or 'auto'})...")
-            result = self.whisper_model.transcribe(
-                audio,
-                language=language,
-                fp16=False
-            )
+            logger.info(f"[STT] Transcribing offline (language: {language or 'auto'})...")
+            result = self.offline.transcribe(audio, language, timeout=self.offline_timeout)
             
-            text = result.get("text", "").strip()
-            detected_language = result.get("language", "unknown")
-            
-            logger.info(f"[STT] Whisper result: '{text}' (lang: {detected_language})")
-            
-            return {
-                "success": True,
-                "text": text,
-                "language": detected_language,
-                "provider": "whisper-offline"
-            }
+            if result.get("success"):
+                logger.info(f"[STT] Offline result: '{result['text']}' (lang: {result['language']}, "
+                            f"engine: {result['provider']})")
+            else:
+                logger.error(f"[STT_ERROR] {result.get('error')}")
+            return result
         
         except Exception as e:
             logger.error(f"[STT_ERROR] Offline transcription failed: {e}", exc_info=True)
@@ -170,22 +293,21 @@ class STT:
             }
         
         try:
-            # Convert to WAV format in memory
-            logger.info("[STT] Converting audio to WAV format...")
-            audio_bytes = io.BytesIO()
-            sf.write(audio_bytes, audio, 16000, format='WAV')
-            audio_bytes.seek(0)
-            audio_bytes.name = "audio.wav"
-            logger.info(f"[STT] WAV file created: {audio_bytes.getbuffer().nbytes} bytes")
+            # Encode for the link speed (PCM WAV, FLAC or Opus)
+            encoder = get_audio_encoder()
+            encoded = encoder.encode(audio, 16000)
+            logger.info(f"[STT] Encoded {encoded.codec}: {encoded.size} bytes in {encoded.encode_ms:.1f}ms")
             
             # Transcribe using Groq Whisper (VERY FAST)
             logger.info("[STT] Sending to Groq API (whisper-large-v3)...")
+            started = time.perf_counter()
             transcription = self.groq_client.audio.transcriptions.create(
-                file=audio_bytes,
+                file=(encoded.filename, encoded.data),
                 model="whisper-large-v3",
                 language=language,
                 response_format="text"  # Faster than JSON
             )
+            upload = encoder.record_upload(encoded, time.perf_counter() - started)
             
             text = transcription.strip() if isinstance(transcription, str) else transcription.text.strip()
             logger.info(f"[STT] Groq response received: '{text}'")
@@ -194,7 +316,8 @@ class STT:
                 "success": True,
                 "text": text,
                 "language": language or "auto",
-                "provider": "groq-whisper"
+                "provider": "groq-whisper",
+                "upload": upload
             }
         
         except Exception as e:
@@ -214,12 +337,17 @@ class STT:
             Dictionary with transcription
         """
         logger.info("[STT] Starting transcription process...")
+        internet = self.health_monitor.get("internet")
+        if internet is not None and not internet["available"]:
+            self.offline.preload()  # Groq is likely to fail; start loading now
+        
         # Always try Groq first unless forced offline
         if not force_offline and self.groq_client:
             logger.info("[STT] Trying Groq first...")
             result = self.transcribe_online(audio, language)
             
-            # Fallback to offline only if Groq completely fails
+            # Fallback to offline only if Groq completely fails (this loads
+            # the offline engine, which then stays warm for later failures)
             if not result.get("success"):
                 logger.warning("[STT_WARN] Groq failed, falling back to offline Whisper...")
                 result = self.transcribe_offline(audio, language)
@@ -230,7 +358,8 @@ class STT:
         logger.info(f"[STT] Transcription complete: success={result.get('success')}, provider={result.get('provider')}")
         return result
     
-    def listen_and_transcribe(self, duration: int = 3, language: Optional[str] = None) -> Dict:
+    def listen_and_transcribe(self, duration: Optional[int] = None, language: Optional[str] = None,
+                              start_position: Optional[int] = None) -> Dict:
         """
         Record and transcribe - SYNCHRONOUS (blocking)
         
@@ -239,17 +368,25 @@ class STT:
         so blocking here won't affect the wake word detector's continuous listening.
         
         Args:
-            duration: Recording duration (3s for speed)
+            duration: Fixed recording duration; None records until the
+                speaker stops (VAD end-pointing, voice.vad.*)
             language: Language code
+            start_position: Capture position the command starts at (optional)
         
         Returns:
             Dictionary with transcription result
         """
         try:
-            logger.info(f"[STT] Starting listen_and_transcribe (duration={duration}s)...")
+            logger.info(f"[STT] Starting listen_and_transcribe (duration={duration or 'until silence'})...")
             
             # Step 1: Record audio
-            audio = self.record_audio(duration)  # Blocks for 'duration' seconds
+            with metrics.stage("stt_record"):
+                audio, streamed = None, None
+                if duration is None and get_vad().enabled:
+                    # Blocks until trailing silence; partials are transcribed meanwhile
+                    audio, streamed = self.record_utterance(start_position, language)
+                if audio is None:
+                    audio = self.record_audio(duration or 3, start_position=start_position)
             if audio is None or len(audio) == 0:
                 logger.error("[STT_ERROR] No audio recorded")
                 return {
@@ -260,7 +397,13 @@ class STT:
             
             # Step 2: Transcribe
             logger.info("[STT] Recording complete, starting transcription...")
-            result = self.transcribe(audio, language)  # Blocks for 2-5 seconds (Groq API)
+            with metrics.stage("stt_transcribe") as labels:
+                if streamed is not None:
+                    logger.info("[STT] Last partial covers the whole utterance, skipping the final pass")
+                    result = streamed
+                else:
+                    result = self.transcribe(audio, language)  # Blocks for 2-5 seconds (Groq API)
+                labels["provider"] = result.get("provider", "")
             
             # Step 3: Log result
             if result.get("success"):
@@ -0,0 +1,315 @@
+"""
+Offline STT Engines
+Local Whisper backends behind one interface, kept loaded and warm in a small pool.
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+
+logger = get_logger()
+
+
+class OfflineEngine:
+    """A local speech-to-text model"""
+    
+    provider = "offline"
+    
+    def __init__(self, model_size: str):
+        """
+        Initialize engine (the model loads in load())
+        
+        Args:
+            model_size: Whisper model size (tiny, base, small, medium, ...)
+        """
+        self.model_size = model_size
+        self.model = None
+        self.load_seconds: Optional[float] = None
+    
+    def load(self):
+        """Load the model (slow; seconds to tens of seconds)"""
+        raise NotImplementedError
+    
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None) -> Dict:
+        """
+        Transcribe 16 kHz float32 audio
+        
+        Args:
+            audio: Audio samples in [-1, 1]
+            language: Language code (None to auto-detect)
+        
+        Returns:
+            Dictionary with text and language
+        """
+        raise NotImplementedError
+
+
+class WhisperEngine(OfflineEngine):
+    """Reference openai-whisper (PyTorch; fp32 on CPU, fp16 on GPU)"""
+    
+    provider = "whisper-offline"
+    
+    def __init__(self, model_size: str, device: str = "cpu"):
+        """
+        Initialize openai-whisper engine
+        
+        Args:
+            model_size: Whisper model size
+            device: cpu or cuda
+        """
+        super().__init__(model_size)
+        self.device = device
+    
+    def load(self):
+        """Load the openai-whisper model"""
+        import whisper
+        
+        started = time.perf_counter()
+        self.model = whisper.load_model(self.model_size, device=self.device)
+        self.load_seconds = time.perf_counter() - started
+    
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None) -> Dict:
+        """Transcribe with openai-whisper"""
+        result = self.model.transcribe(audio, language=language, fp16=self.device != "cpu")
+        return {
+            "text": result.get("text", "").strip(),
+            "language": result.get("language", "unknown")
+        }
+
+
+class FasterWhisperEngine(OfflineEngine):
+    """CTranslate2 Whisper (faster-whisper), int8-quantized on CPU by default"""
+    
+    provider = "faster-whisper-offline"
+    
+    def __init__(self, model_size: str, device: str = "cpu", compute_type: str = "int8",
+                 cpu_threads: int = 0, beam_size: int = 1):
+        """
+        Initialize faster-whisper engine
+        
+        Args:
+            model_size: Whisper model size or a local CTranslate2 model path
+            device: cpu or cuda
+            compute_type: int8, int8_float16, float16, float32
+            cpu_threads: Threads per model (0 lets CTranslate2 decide)
+            beam_size: 1 is greedy decoding, the fastest
+        """
+        super().__init__(model_size)
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+    
+    def load(self):
+        """Load the CTranslate2 model (downloaded on first use unless a path is given)"""
+        from faster_whisper import WhisperModel
+        
+        started = time.perf_counter()
+        self.model = WhisperModel(self.model_size, device=self.device,
+                                  compute_type=self.compute_type, cpu_threads=self.cpu_threads)
+        self.load_seconds = time.perf_counter() - started
+    
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None) -> Dict:
+        """Transcribe with faster-whisper"""
+        segments, info = self.model.transcribe(audio, language=language, beam_size=self.beam_size)
+        # Segments are generated lazily; joining them runs the decoder
+        text = " ".join(segment.text.strip() for segment in segments)
+        return {"text": text.strip(), "language": info.language}
+
+
+def faster_whisper_available() -> bool:
+    """Check whether the faster-whisper package is installed"""
+    try:
+        import faster_whisper  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_engine(backend: str, model_size: str, device: str = "cpu",
+                  compute_type: str = "int8", cpu_threads: int = 0, beam_size: int = 1) -> OfflineEngine:
+    """
+    Create an (unloaded) offline engine
+    
+    Args:
+        backend: auto (faster-whisper if installed, else whisper), faster_whisper or whisper
+        model_size: Whisper model size
+        device: cpu or cuda
+        compute_type: faster-whisper quantization
+        cpu_threads: faster-whisper threads per model
+        beam_size: faster-whisper beam size
+    
+    Returns:
+        OfflineEngine
+    """
+    if backend == "auto":
+        backend = "faster_whisper" if faster_whisper_available() else "whisper"
+    if backend == "faster_whisper":
+        return FasterWhisperEngine(model_size, device, compute_type, cpu_threads, beam_size)
+    return WhisperEngine(model_size, device)
+
+
+class OfflineEnginePool:
+    """
+    Loads offline engines in the background and lends them out one caller
+    at a time, so a network drop never waits on a cold model load
+    """
+    
+    def __init__(self):
+        """Initialize engine pool (nothing loads until preload())"""
+        self.config = get_config()
+        
+        self.model_size = self.config.get("voice.stt.offline_model", "base")
+        self.backend = self.config.get("voice.stt.offline.backend", "auto")  # auto, faster_whisper, whisper
+        self.device = self.config.get("voice.stt.offline.device", "cpu")
+        self.compute_type = self.config.get("voice.stt.offline.compute_type", "int8")
+        self.cpu_threads = self.config.get("voice.stt.offline.cpu_threads", 0)
+        self.beam_size = self.config.get("voice.stt.offline.beam_size", 1)
+        self.pool_size = max(1, self.config.get("voice.stt.offline.pool_size", 1))
+        self.warmup = self.config.get("voice.stt.offline.warmup", True)
+        
+        self.engines: List[OfflineEngine] = []
+        self.idle: "queue.Queue[OfflineEngine]" = queue.Queue()
+        self.loaded = threading.Event()
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[str] = None
+    
+    @property
+    def ready(self) -> bool:
+        """True once at least one engine is loaded"""
+        return bool(self.engines)
+    
+    def preload(self) -> threading.Thread:
+        """
+        Start loading engines in the background (once, or again after a
+        load that ended with no engine, e.g. a failed model download)
+        
+        Returns:
+            The loader thread
+        """
+        with self.lock:
+            failed = self.thread is not None and not self.thread.is_alive() and not self.engines
+            if failed:
+                logger.info(f"[STT] Retrying offline STT load (last error: {self.error})")
+                self.error = None
+                self.loaded.clear()
+            if self.thread is None or failed:
+                self.thread = threading.Thread(target=self._load_all, name="stt-offline-preload", daemon=True)
+                self.thread.start()
+            return self.thread
+    
+    def _load_all(self):
+        """Loader thread: load and warm each engine, lending it out as soon as it's ready"""
+        for index in range(self.pool_size):
+            engine = create_engine(self.backend, self.model_size, self.device,
+                                   self.compute_type, self.cpu_threads, self.beam_size)
+            try:
+                engine.load()
+                if self.warmup:
+                    # The first decode allocates buffers and picks kernels
+                    engine.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"[STT_ERROR] Failed to load offline STT model: {e}")
+                break
+            
+            self.engines.append(engine)
+            self.idle.put(engine)
+            self.loaded.set()
+            logger.info(f"[STT] Offline engine {index + 1}/{self.pool_size} ready "
+                        f"({engine.provider}, {self.model_size}, loaded in {engine.load_seconds:.1f}s)")
+        
+        self.loaded.set()  # Wake waiters even if nothing loaded
+    
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None) -> Iterator[Optional[OfflineEngine]]:
+        """
+        Borrow a loaded engine, loading the pool first if needed
+        
+        Args:
+            timeout: Seconds to wait for a load or a free engine
+        
+        Yields:
+            An engine for exclusive use, or None if none became available
+        """
+        self.preload()
+        engine = None
+        if self.loaded.wait(timeout) and self.engines:
+            try:
+                engine = self.idle.get(timeout=timeout)
+            except queue.Empty:
+                engine = None
+        try:
+            yield engine
+        finally:
+            if engine is not None:
+                self.idle.put(engine)
+    
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None,
+                   timeout: Optional[float] = None) -> Dict:
+        """
+        Transcribe with a pooled engine
+        
+        Args:
+            audio: 16 kHz audio (float32, or int16 straight from capture)
+            language: Language code
+            timeout: Seconds to wait for an engine
+        
+        Returns:
+            STT result dict (success, text, language, provider)
+        """
+        if audio.dtype == np.int16:
+            audio = audio.astype(np.float32) / 32768.0
+        
+        with self.acquire(timeout) as engine:
+            if engine is None:
+                return {
+                    "success": False,
+                    "error": self.error or "Offline STT model not loaded",
+                    "text": ""
+                }
+            result = engine.transcribe(audio, language)
+        
+        return {
+            "success": True,
+            "text": result["text"],
+            "language": result["language"],
+            "provider": engine.provider
+        }
+    
+    def stats(self) -> Dict:
+        """
+        Get pool status
+        
+        Returns:
+            Dictionary with backend, model, loaded and idle engine counts
+        """
+        engine = self.engines[0] if self.engines else None
+        return {
+            "backend": engine.provider if engine else self.backend,
+            "model": self.model_size,
+            "loaded": len(self.engines),
+            "idle": self.idle.qsize(),
+            "load_seconds": round(engine.load_seconds, 2) if engine else None,
+            "error": self.error
+        }
+
+
+# Global offline engine pool instance
+_offline_pool_instance = None
+
+
+def get_offline_stt_pool() -> OfflineEnginePool:
+    """Get the global offline STT engine pool instance"""
+    global _offline_pool_instance
+    if _offline_pool_instance is None:
+        _offline_pool_instance = OfflineEnginePool()
+    return _offline_pool_instance
@@ -3,13 +3,69 @@ Text-to-Speech (TTS)
 Converts text to speech using pyttsx3 for offline multi-language support.
 """
 
+import queue
+import re
+import threading
 import pyttsx3
-from typing import Optional
+from typing import Optional, List, Tuple
 
 from item_assistant.config import get_config
-from item_assistant.logging import get_logger
+from item_assistant.logging import get_logger, get_metrics
 
 logger = get_logger()
+metrics = get_metrics()
+
+# Sentence end: terminal punctuation followed by whitespace, or a line break
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?;:])\s+|\n+')
+
+
+class SentenceStreamer:
+    """Speaks streamed LLM output one sentence at a time as it arrives"""
+    
+    def __init__(self, tts: "TTS", min_chars: int = 12):
+        """
+        Initialize sentence streamer
+        
+        Args:
+            tts: TTS engine used to speak completed sentences
+            min_chars: Shortest fragment worth speaking on its own
+        """
+        self.tts = tts
+        self.min_chars = min_chars
+        self.buffer = ""
+        self.spoken: List[str] = []
+    
+    def feed(self, chunk: str):
+        """
+        Add a text fragment, speaking any sentences it completes
+        
+        Args:
+            chunk: Next fragment of generated text
+        """
+        self.buffer += chunk
+        
+        # Find the last sentence boundary that leaves a long enough sentence
+        cut = 0
+        for match in _SENTENCE_BOUNDARY.finditer(self.buffer):
+            if len(self.buffer[:match.start()].strip()) >= self.min_chars:
+                cut = match.end()
+        
+        if cut:
+            self._speak(self.buffer[:cut])
+            self.buffer = self.buffer[cut:]
+    
+    def flush(self):
+        """Speak whatever text remains in the buffer"""
+        if self.buffer.strip():
+            self._speak(self.buffer)
+        self.buffer = ""
+    
+    def _speak(self, text: str):
+        """Speak a completed piece of text"""
+        text = text.strip()
+        if text:
+            self.spoken.append(text)
+            self.tts.speak(text, wait=False)
 
 
 class TTS:
@@ -26,10 +82,34 @@ class TTS:
         self.volume = self.config.get("voice.tts.volume", 0.9)
         self.language = self.config.get("voice.tts.language", "en")
         
-        # Initialize pyttsx3 engine
+        # pyttsx3 is not thread-safe: one worker thread creates the engine
+        # and plays every utterance, in the order speak() queued them
         self.engine = None
+        self.queue: "queue.Queue[Tuple[str, threading.Event]]" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
         if self.enabled:
-            self._initialize_engine()
+            ready = threading.Event()
+            self.thread = threading.Thread(target=self._worker, args=(ready,), name="tts", daemon=True)
+            self.thread.start()
+            ready.wait()
+    
+    def _worker(self, ready: threading.Event):
+        """Worker thread: initialize the engine, then speak queued text"""
+        self._initialize_engine()
+        ready.set()
+        if not self.engine:
+            return
+        
+        while True:
+            text, done = self.queue.get()
+            try:
+                self.engine.say(text)
+                with metrics.stage("tts"):
+                    self.engine.runAndWait()
+            except Exception as e:
+                logger.error(f"TTS speaking failed: {e}")
+            finally:
+                done.set()
     
     def _initialize_engine(self):
         """Initialize pyttsx3 engine"""
@@ -75,27 +155,28 @@ class TTS:
             logger.error(f"Failed to list voices: {e}")
             return []
     
-    def speak(self, text: str, wait: bool = True):
+    def speak(self, text: str, wait: bool = True) -> threading.Event:
         """
         Speak text
         
         Args:
             text: Text to speak
             wait: Wait for speech to complete
+        
+        Returns:
+            Event that is set once the text has been spoken (or dropped)
         """
+        done = threading.Event()
         if not self.engine or not self.enabled:
             logger.warning("TTS not enabled or initialized")
-            return
+            done.set()
+            return done
         
-        try:
-            logger.info(f"Speaking: '{text}'")
-            self.engine.say(text)
-            
-            if wait:
-                self.engine.runAndWait()
-        
-        except Exception as e:
-            logger.error(f"TTS speaking failed: {e}")
+        logger.info(f"Speaking: '{text}'")
+        self.queue.put((text, done))
+        if wait:
+            done.wait()
+        return done
     
     def speak_async(self, text: str):
         """
@@ -106,8 +187,24 @@ class TTS:
         """
         self.speak(text, wait=False)
     
+    def sentence_streamer(self) -> SentenceStreamer:
+        """
+        Create a streamer that speaks text fragments sentence by sentence
+        
+        Returns:
+            SentenceStreamer bound to this engine
+        """
+        return SentenceStreamer(self)
+    
     def stop(self):
-        """Stop current speech"""
+        """Stop current speech and drop anything still queued"""
+        while True:
+            try:
+                _, done = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            done.set()
+        
         if self.engine:
             try:
                 self.engine.stop()
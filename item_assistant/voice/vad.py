@@ -0,0 +1,306 @@
+"""
+Voice Activity Detection
+Ends command recording after trailing silence instead of after a fixed duration.
+"""
+
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from item_assistant.config import get_config
+from item_assistant.logging import get_logger
+from item_assistant.voice.audio_capture import AudioReader
+
+logger = get_logger()
+
+
+class EnergyVAD:
+    """
+    Baseline detector: frame energy against an adaptive noise floor, with
+    the zero-crossing rate used to reject quiet hiss
+    """
+    
+    def __init__(self, energy_ratio: float = 3.0, min_rms: float = 200.0, max_zcr: float = 0.35):
+        """
+        Initialize energy VAD
+        
+        Args:
+            energy_ratio: How far above the noise floor speech must be
+            min_rms: Absolute int16 RMS below which nothing counts as speech
+            max_zcr: Zero crossings per sample above which a quiet frame is noise
+        """
+        self.energy_ratio = energy_ratio
+        self.min_rms = min_rms
+        self.max_zcr = max_zcr
+        self.noise_floor: Optional[float] = None
+    
+    def is_speech(self, frame: np.ndarray) -> bool:
+        """
+        Classify one frame
+        
+        Args:
+            frame: int16 samples
+        
+        Returns:
+            True if the frame contains speech
+        """
+        samples = frame.astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples * samples)))
+        zcr = float(np.mean(np.signbit(samples[1:]) != np.signbit(samples[:-1])))
+        
+        if self.noise_floor is None:
+            self.noise_floor = rms
+        threshold = max(self.noise_floor * self.energy_ratio, self.min_rms)
+        # Loud frames are speech whatever their ZCR; quiet high-ZCR frames are hiss
+        speech = rms > threshold and (zcr < self.max_zcr or rms > threshold * 2)
+        
+        if not speech:
+            # Follow a falling floor at once, a rising one slowly
+            self.noise_floor = rms if rms < self.noise_floor else 0.95 * self.noise_floor + 0.05 * rms
+        return speech
+
+
+class WebRtcVAD:
+    """WebRTC's GMM voice detector (needs the webrtcvad package)"""
+    
+    def __init__(self, sample_rate: int, aggressiveness: int = 2):
+        """
+        Initialize WebRTC VAD
+        
+        Args:
+            sample_rate: 8000, 16000, 32000 or 48000
+            aggressiveness: 0 (least) to 3 (most aggressive at filtering non-speech)
+        """
+        import webrtcvad
+        
+        self.sample_rate = sample_rate
+        self.vad = webrtcvad.Vad(aggressiveness)
+    
+    def is_speech(self, frame: np.ndarray) -> bool:
+        """Classify one 10, 20 or 30 ms int16 frame"""
+        return self.vad.is_speech(frame.tobytes(), self.sample_rate)
+
+
+class SileroVAD:
+    """Silero-style neural detector loaded from a local TorchScript file"""
+    
+    # The model consumes fixed windows of 512 samples at 16 kHz
+    FRAME_LENGTH = 512
+    
+    def __init__(self, sample_rate: int, model_path: str, threshold: float = 0.5):
+        """
+        Initialize Silero VAD
+        
+        Args:
+            sample_rate: 16000
+            model_path: Path to the TorchScript model (no download at runtime)
+            threshold: Speech probability above which a frame is speech
+        """
+        import torch
+        
+        self.torch = torch
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.model = torch.jit.load(model_path, map_location="cpu")
+        self.model.eval()
+    
+    def is_speech(self, frame: np.ndarray) -> bool:
+        """Classify one 512-sample int16 frame"""
+        audio = self.torch.from_numpy(frame.astype(np.float32) / 32768.0)
+        with self.torch.no_grad():
+            probability = self.model(audio, self.sample_rate).item()
+        return probability > self.threshold
+
+
+class EndPointer:
+    """Decides from per-frame speech flags when an utterance is over"""
+    
+    def __init__(self, frame_ms: float, trailing_silence_ms: int, min_duration_ms: int,
+                 max_duration_ms: int, no_speech_timeout_ms: int, speech_start_ms: int):
+        """
+        Initialize end-pointer
+        
+        Args:
+            frame_ms: Duration of one frame
+            trailing_silence_ms: Silence after speech that ends the utterance
+            min_duration_ms: Never stop before this much audio
+            max_duration_ms: Always stop after this much audio
+            no_speech_timeout_ms: Give up if speech hasn't started by then
+            speech_start_ms: Consecutive speech needed to count as onset
+                (ignores clicks and single noisy frames)
+        """
+        self.frame_ms = frame_ms
+        self.trailing_silence_ms = trailing_silence_ms
+        self.min_duration_ms = min_duration_ms
+        self.max_duration_ms = max_duration_ms
+        self.no_speech_timeout_ms = no_speech_timeout_ms
+        self.speech_start_ms = speech_start_ms
+        
+        self.elapsed_ms = 0.0
+        self.speech_run_ms = 0.0
+        self.silence_ms = 0.0
+        self.speech_started = False
+        self.reason: Optional[str] = None
+    
+    def update(self, speech: bool, can_start: bool = True) -> bool:
+        """
+        Feed the next frame's classification
+        
+        Args:
+            speech: Whether the frame contains speech
+            can_start: False for pre-roll frames, which may hold the tail of
+                the wake word and must not count as the command starting
+        
+        Returns:
+            True when recording should stop (reason is then set)
+        """
+        self.elapsed_ms += self.frame_ms
+        
+        if speech:
+            self.speech_run_ms += self.frame_ms
+            self.silence_ms = 0.0
+            if can_start and not self.speech_started and self.speech_run_ms >= self.speech_start_ms:
+                self.speech_started = True
+        else:
+            self.speech_run_ms = 0.0
+            self.silence_ms += self.frame_ms
+        
+        if self.elapsed_ms >= self.max_duration_ms:
+            self.reason = "max_duration"
+        elif not self.speech_started and self.elapsed_ms >= self.no_speech_timeout_ms:
+            self.reason = "no_speech"
+        elif (self.speech_started and self.silence_ms >= self.trailing_silence_ms
+              and self.elapsed_ms >= self.min_duration_ms):
+            self.reason = "silence"
+        return self.reason is not None
+
+
+class VoiceActivityDetector:
+    """Records one utterance from the capture ring, stopping at end of speech"""
+    
+    def __init__(self, sample_rate: Optional[int] = None):
+        """
+        Initialize voice activity detector
+        
+        Args:
+            sample_rate: Sample rate of the frames it will see (defaults to
+                the capture rate)
+        """
+        self.config = get_config()
+        self.sample_rate = sample_rate or self.config.get("voice.capture.sample_rate", 16000)
+        
+        self.enabled = self.config.get("voice.vad.enabled", True)
+        self.frame_ms = self.config.get("voice.vad.frame_ms", 30)
+        self.trailing_silence_ms = self.config.get("voice.vad.trailing_silence_ms", 700)
+        self.min_duration_ms = self.config.get("voice.vad.min_duration_ms", 600)
+        self.max_duration_ms = self.config.get("voice.vad.max_duration_ms", 10000)
+        self.no_speech_timeout_ms = self.config.get("voice.vad.no_speech_timeout_ms", 5000)
+        self.speech_start_ms = self.config.get("voice.vad.speech_start_ms", 90)
+        self.pause_ms = self.config.get("voice.vad.pause_ms", 200)
+        
+        self.backend_name = self.config.get("voice.vad.backend", "energy")  # energy, webrtc, silero
+        self.backend = self._create_backend(self.backend_name)
+        self.frame_length = int(self.sample_rate * self.frame_ms / 1000)
+        if isinstance(self.backend, SileroVAD):
+            self.frame_length = SileroVAD.FRAME_LENGTH
+        
+        logger.info(f"[VAD] Voice activity detector initialized (backend: {self.backend_name}, "
+                    f"trailing silence: {self.trailing_silence_ms}ms)")
+    
+    def _create_backend(self, name: str):
+        """Create the configured detector, falling back to the energy baseline"""
+        try:
+            if name == "webrtc":
+                return WebRtcVAD(self.sample_rate, self.config.get("voice.vad.webrtc_aggressiveness", 2))
+            if name == "silero":
+                return SileroVAD(
+                    self.sample_rate,
+                    self.config.get("voice.vad.silero_model_path", "models/silero_vad.jit"),
+                    self.config.get("voice.vad.silero_threshold", 0.5)
+                )
+        except Exception as e:
+            logger.warning(f"[VAD] Could not load '{name}' VAD, using energy baseline: {e}")
+            self.backend_name = "energy"
+        
+        return EnergyVAD(
+            energy_ratio=self.config.get("voice.vad.energy_ratio", 3.0),
+            min_rms=self.config.get("voice.vad.min_rms", 200.0)
+        )
+    
+    def _end_pointer(self) -> EndPointer:
+        """Fresh end-pointer for one utterance"""
+        return EndPointer(
+            frame_ms=self.frame_length * 1000 / self.sample_rate,
+            trailing_silence_ms=self.trailing_silence_ms,
+            min_duration_ms=self.min_duration_ms,
+            max_duration_ms=self.max_duration_ms,
+            no_speech_timeout_ms=self.no_speech_timeout_ms,
+            speech_start_ms=self.speech_start_ms
+        )
+    
+    def record(self, reader: AudioReader, lead_in: int = 0,
+               on_pause: Optional[Callable[[], None]] = None) -> Tuple[Optional[np.ndarray], Dict]:
+        """
+        Read frames until the speaker stops
+        
+        Frames that are already buffered (e.g. audio since the wake word)
+        are processed immediately, so recording ends as soon as trailing
+        silence is seen rather than after a fixed time.
+        
+        Args:
+            reader: Capture cursor positioned at the start of the command
+            lead_in: Leading samples that are pre-roll, not the command
+            on_pause: Called when the speaker has been quiet for
+                voice.vad.pause_ms (the utterance may be about to end)
+        
+        Returns:
+            Tuple of (int16 audio or None if capture stalled, info dict with
+            reason, duration_ms, speech_detected and trailing_silence_ms)
+        """
+        end_pointer = self._end_pointer()
+        paused = False
+        frames = []
+        frame_timeout = max(1.0, self.frame_length / self.sample_rate * 4)
+        started = time.perf_counter()
+        
+        while True:
+            frame = reader.read(self.frame_length, timeout=frame_timeout)
+            if frame is None:
+                end_pointer.reason = "capture_stalled"
+                break
+            frames.append(frame)
+            
+            can_start = len(frames) * self.frame_length > lead_in
+            if end_pointer.update(self.backend.is_speech(frame), can_start):
+                break
+            
+            if end_pointer.silence_ms == 0:
+                paused = False
+            elif (on_pause and not paused and end_pointer.speech_started
+                  and end_pointer.silence_ms >= self.pause_ms):
+                paused = True
+                on_pause()
+        
+        info = {
+            "reason": end_pointer.reason,
+            "duration_ms": round(end_pointer.elapsed_ms),
+            "speech_detected": end_pointer.speech_started,
+            "trailing_silence_ms": round(end_pointer.silence_ms),
+            "wait_ms": round((time.perf_counter() - started) * 1000)
+        }
+        if not frames:
+            return None, info
+        return np.concatenate(frames), info
+
+
+# Global VAD instance
+_vad_instance = None
+
+
+def get_vad() -> VoiceActivityDetector:
+    """Get the global voice activity detector instance"""
+    global _vad_instance
+    if _vad_instance is None:
+        _vad_instance = VoiceActivityDetector()
+    return _vad_instance
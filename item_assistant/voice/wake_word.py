@@ -4,15 +4,16 @@ Listens for wake words using Picovoice Porcupine.
 FIXED: Continuous listening without stopping after detection
 """
 
-import struct
-import pyaudio
+import time
 import pvporcupine
 from typing import Optional, Callable
 
 from item_assistant.config import get_config
-from item_assistant.logging import get_logger
+from item_assistant.logging import get_logger, get_metrics, get_tracer
+from item_assistant.voice.audio_capture import get_audio_capture
 
 logger = get_logger()
+metrics = get_metrics()
 
 
 class WakeWordDetector:
@@ -36,9 +37,11 @@ class WakeWordDetector:
         
         # Porcupine instance
         self.porcupine = None
-        self.audio_stream = None
-        self.pa = None
+        self.capture = get_audio_capture()
         self.is_listening = False
+        # Capture position at the end of the last detected wake word, so the
+        # command recording can start right there
+        self.last_wake_position: Optional[int] = None
         
         if self.enabled and self.access_key:
             self._initialize_porcupine()
@@ -74,17 +77,16 @@ class WakeWordDetector:
             logger.warning("[WARN] Already listening")
             return
         
+        if self.porcupine.sample_rate != self.capture.sample_rate:
+            logger.error(f"[ERROR] Porcupine needs {self.porcupine.sample_rate}Hz audio, "
+                         f"capture is {self.capture.sample_rate}Hz")
+            return
+        
         try:
-            # Initialize PyAudio
-            self.pa = pyaudio.PyAudio()
-            
-            self.audio_stream = self.pa.open(
-                rate=self.porcupine.sample_rate,
-                channels=1,
-                format=pyaudio.paInt16,
-                input=True,
-                frames_per_buffer=self.porcupine.frame_length
-            )
+            # Shared microphone stream; STT reads the same ring buffer
+            if not self.capture.start():
+                return
+            reader = self.capture.reader()
             
             self.is_listening = True
             logger.info("[LISTEN] CONTINUOUS LISTENING MODE ACTIVE")
@@ -94,13 +96,13 @@ class WakeWordDetector:
             frame_count = 0
             while self.is_listening:
                 try:
-                    pcm = self.audio_stream.read(
-                        self.porcupine.frame_length,
-                        exception_on_overflow=False
-                    )
-                    pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
+                    pcm = reader.read(self.porcupine.frame_length, timeout=1.0)
+                    if pcm is None:
+                        continue  # No audio yet; re-check is_listening
                     
+                    started = time.perf_counter()
                     keyword_index = self.porcupine.process(pcm)
+                    metrics.observe_stage("wake_word", time.perf_counter() - started)
                     
                     # Log every 1000 frames to show continuous listening
                     frame_count += 1
@@ -111,14 +113,18 @@ class WakeWordDetector:
                         keywords = ['porcupine', 'picovoice', 'bumblebee']
                         detected_word = keywords[keyword_index] if keyword_index < len(keywords) else "unknown"
                         logger.info(f"[WAKE] WAKE DETECTED: '{detected_word}' (frame #{frame_count})")
+                        self.last_wake_position = reader.position
                         
                         # Trigger callback but KEEP LISTENING
                         if self.on_wake_word:
                             # Run callback in separate thread to not block listening
                             logger.info("[CALLBACK] Wake word callback thread starting...")
                             import threading
+                            # The detection starts the command's trace; the callback thread continues it
+                            with get_tracer().span("wake_word", keyword=detected_word):
+                                callback = get_tracer().wrap(self.on_wake_word)
                             callback_thread = threading.Thread(
-                                target=self.on_wake_word,
+                                target=callback,
                                 daemon=True
                             )
                             callback_thread.start()
@@ -127,10 +133,6 @@ class WakeWordDetector:
                         # CRITICAL: Don't stop listening! Continue the loop immediately
                         logger.info("[LISTEN] Continuing to listen for next wake word...")
                     
-                except IOError as e:
-                    # Handle audio buffer overflow gracefully
-                    logger.debug(f"[AUDIO] Audio buffer issue (continuing): {e}")
-                    continue
                 except Exception as e:
                     logger.error(f"[LOOP_ERROR] Error in detection loop: {e}")
                     continue
@@ -142,23 +144,8 @@ class WakeWordDetector:
             self.stop_listening()
     
     def stop_listening(self):
-        """Stop listening for wake word"""
+        """Stop listening for wake word (the shared capture stream stays open)"""
         self.is_listening = False
-        
-        if self.audio_stream:
-            try:
-                self.audio_stream.close()
-            except:
-                pass
-            self.audio_stream = None
-        
-        if self.pa:
-            try:
-                self.pa.terminate()
-            except:
-                pass
-            self.pa = None
-        
         logger.info("[STOP] Stopped listening")
     
     def cleanup(self):
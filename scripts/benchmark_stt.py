@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Offline STT Benchmark
+Compares load time and real-time factor (RTF) of local Whisper engines on this machine.
+
+RTF = transcription time / audio duration; below 1.0 is faster than real time.
+
+Usage:
+    python scripts/benchmark_stt.py --audio command.wav
+    python scripts/benchmark_stt.py --sizes tiny base small --backends whisper faster_whisper
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from item_assistant.voice.stt_engines import create_engine, faster_whisper_available  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def load_audio(path):
+    """Load a clip as 16 kHz mono float32 (or 5 s of quiet noise without one)"""
+    if not path:
+        print("No --audio given: using 5s of low-level noise (times decoding, not accuracy)")
+        return (np.random.default_rng(0).normal(0, 0.01, SAMPLE_RATE * 5)).astype(np.float32)
+    
+    import soundfile as sf
+    
+    audio, rate = sf.read(path, dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    if rate != SAMPLE_RATE:
+        # Linear resampling is plenty for timing purposes
+        positions = np.arange(0, len(audio), rate / SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+def benchmark(backend, size, audio, args):
+    """Load one engine and time a warm-up run plus repeated transcriptions"""
+    engine = create_engine(backend, size, args.device, args.compute_type, args.threads, args.beam_size)
+    engine.load()
+    
+    started = time.perf_counter()
+    engine.transcribe(audio, args.language)
+    first = time.perf_counter() - started
+    
+    timings = []
+    text = ""
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        text = engine.transcribe(audio, args.language)["text"]
+        timings.append(time.perf_counter() - started)
+    
+    duration = len(audio) / SAMPLE_RATE
+    return {
+        "engine": engine.provider,
+        "size": size,
+        "load": engine.load_seconds,
+        "first_rtf": first / duration,
+        "rtf": float(np.median(timings)) / duration,
+        "text": text
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local Whisper engines")
+    parser.add_argument("--audio", help="WAV/FLAC clip to transcribe (ideally a typical command)")
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "base", "small"], help="Model sizes")
+    parser.add_argument("--backends", nargs="+", default=None,
+                        help="whisper and/or faster_whisper (default: every installed backend)")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8", help="faster-whisper quantization")
+    parser.add_argument("--threads", type=int, default=0, help="faster-whisper CPU threads (0 = default)")
+    parser.add_argument("--beam-size", type=int, default=1)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs after the warm-up")
+    args = parser.parse_args()
+    
+    backends = args.backends or (["faster_whisper", "whisper"] if faster_whisper_available() else ["whisper"])
+    audio = load_audio(args.audio)
+    print(f"Audio: {len(audio) / SAMPLE_RATE:.1f}s, device: {args.device}, runs: {args.runs}")
+    print()
+    
+    results = []
+    for backend in backends:
+        for size in args.sizes:
+            print(f"Benchmarking {backend} / {size}...", flush=True)
+            try:
+                results.append(benchmark(backend, size, audio, args))
+            except Exception as e:
+                print(f"  failed: {e}")
+    
+    print()
+    print(f"{'engine':<24} {'size':<8} {'load s':>7} {'cold RTF':>9} {'warm RTF':>9}  text")
+    print("-" * 80)
+    for r in sorted(results, key=lambda r: r["rtf"]):
+        print(f"{r['engine']:<24} {r['size']:<8} {r['load']:>7.1f} {r['first_rtf']:>9.3f} "
+              f"{r['rtf']:>9.3f}  {r['text'][:40]}")
+    
+    if results:
+        best = min(results, key=lambda r: r["rtf"])
+        print()
+        print(f"Fastest: {best['engine']} / {best['size']} "
+              f"(set voice.stt.offline_model: \"{best['size']}\" and voice.stt.offline.backend)")
+
+
+if __name__ == "__main__":
+    main()